@@ -0,0 +1,125 @@
+import logging
+import os
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Any, Callable, List, Tuple
+
+sys.path.append(os.getcwd())
+from experiments.synthetic_wtp_file import WARSAW_SIZE, generate_wtp_file
+from src.core.database_file_parser import *
+
+# Times every stage of parsing a synthetic WTP data file, in the order in which database builder runs them, at multiples
+# of Warsaw size. Stages which read lines section are measured both as one pass (get_raw_data_of_lines) and as separate
+# passes used before it. File is read from memory map, like database builder does. get_raw_data_of_lines is also measured
+# on file opened in text mode, which decodes the whole LL section.
+# Each size is parsed in a new process, so peak RSS of one size does not hide peak RSS of another.
+# Peak RSS after a stage is the peak of whole process so far, so it grows only when the stage needed more memory than
+# all previous ones. Pages of memory map which were read are counted in RSS too.
+
+SCALES = [1, 5, 20]
+BASE_FRACTION = 1.0
+
+StageResult = Tuple[str, float, int, int]
+
+
+def get_peak_rss() -> int:
+    """Peak resident set size of this process in kilobytes"""
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak_rss // 1024 if sys.platform == "darwin" else peak_rss
+
+
+def run_stage(results: List[StageResult], name: str, stage: Callable[[], Any], count_rows: Callable[[Any], int]) -> Any:
+    start = time.perf_counter()
+    output = stage()
+    duration = time.perf_counter() - start
+    results.append((name, duration, count_rows(output), get_peak_rss()))
+    return output
+
+
+def benchmark_file(file_path: str) -> List[StageResult]:
+    """Parse <file_path> stage by stage and return (stage name, seconds, rows, peak RSS in kB) of each stage"""
+    results = []
+    section_index = run_stage(results, "build_section_index", lambda: build_section_index(file_path), len)
+
+    with open(file_path, "r", encoding="cp1250") as text_handle, map_data_file(file_path) as handle:
+        day_type_data, index = run_stage(results, "get_raw_data_day_type",
+                                         lambda: get_raw_data_day_type(handle, 0, section_index), lambda x: len(x[0]))
+        day_line_index = index
+        stop_complex_data, index = run_stage(results, "get_raw_data_stop_complex",
+                                             lambda: get_raw_data_stop_complex(handle, index, section_index), lambda x: len(x[0]))
+        stop_data, index = run_stage(results, "get_raw_data_stop",
+                                     lambda: get_raw_data_stop(handle, index, section_index), lambda x: len(x[0]))
+        town_data, index = run_stage(results, "get_raw_data_town",
+                                     lambda: get_raw_data_town(handle, index, section_index), lambda x: len(x[0]))
+        lines_index = index
+
+        # Rows of get_raw_data_of_lines are rows of all tables it generates
+        lines_data = run_stage(results, "get_raw_data_of_lines",
+                               lambda: get_raw_data_of_lines(handle, lines_index, stop_data, section_index),
+                               lambda x: sum(len(x[table]) for table in [0, 1, 2, 3, 5]))
+        variant_data, line_data, _, course_data, course_dict, stop_course_data, _ = lines_data
+        run_stage(results, "get_raw_data_of_lines (text mode)",
+                  lambda: get_raw_data_of_lines(text_handle, lines_index, stop_data, section_index),
+                  lambda x: sum(len(x[table]) for table in [0, 1, 2, 3, 5]))
+
+        legacy_variant_data, _, _ = run_stage(results, "get_raw_variant_and_line_data",
+                                              lambda: get_raw_variant_and_line_data(handle, lines_index, section_index),
+                                              lambda x: len(x[0]) + len(x[1]))
+        stops_list, special_variants = get_foreign_keys_for_stop_variant(stop_data, legacy_variant_data)
+        run_stage(results, "get_raw_data_stop_variant",
+                  lambda: get_raw_data_stop_variant(handle, stops_list, special_variants, lines_index, section_index),
+                  lambda x: len(x[0]))
+        legacy_course_data, _ = run_stage(results, "get_raw_data_course",
+                                          lambda: get_raw_data_course(handle, lines_index, section_index), lambda x: len(x[0]))
+        legacy_course_dict = get_dict_for_stop_course(legacy_course_data)
+        run_stage(results, "get_raw_data_stop_course",
+                  lambda: get_raw_data_stop_course(handle, lines_index, legacy_course_dict, stop_data, section_index),
+                  lambda x: len(x[0]))
+
+        line_data, _ = parse_line_data(line_data)
+        lines_list = prepare_line_list(line_data)
+        run_stage(results, "get_raw_data_day_line",
+                  lambda: get_raw_data_day_line(handle, day_line_index, lines_list, section_index), lambda x: len(x[0]))
+        stop_data, variant_data, _ = change_stop_and_variant_places(stop_data, variant_data)
+        run_stage(results, "reduce_stop_course_data",
+                  lambda: reduce_stop_course_data(stop_course_data, course_data, course_dict, lines_list), len)
+        run_stage(results, "get_stop_neighbours", lambda: get_stop_neighbours(stop_data), len)
+    return results
+
+
+def benchmark_scale(scale: float) -> Tuple[int, List[StageResult]]:
+    """Generate file of <scale> times Warsaw size and benchmark parsing it. Returns size of file in bytes and results."""
+    with tempfile.TemporaryDirectory() as folder:
+        file_path = os.path.join(folder, "wtp.txt")
+        generate_wtp_file(file_path, WARSAW_SIZE.scaled(scale))
+        return os.path.getsize(file_path), benchmark_file(file_path)
+
+
+def test_parser_scaling(scales: List[float] = SCALES, base_fraction: float = BASE_FRACTION):
+    for scale in scales:
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as executor:
+            file_size, results = executor.submit(benchmark_scale, scale * base_fraction).result()
+
+        logging.info(f"{scale * base_fraction:g}x Warsaw size, file {file_size / 2 ** 20:.1f} MiB")
+        for name, duration, rows, peak_rss in results:
+            throughput = rows / duration if duration > 0 else float("inf")
+            logging.info(f"{name:>34}: {duration:8.3f}s {rows:>10} rows {throughput:>12.0f} rows/s "
+                         f"peak RSS {peak_rss / 1024:8.1f} MiB")
+
+
+def main():
+    logging.basicConfig(format="[%(asctime)s->%(levelname)s->%(module)s" +
+                               "->%(funcName)s]: %(message)s",
+                        datefmt="%H:%M:%S",
+                        level=logging.INFO)
+
+    base_fraction = float(sys.argv[1]) if len(sys.argv) > 1 else BASE_FRACTION
+    test_parser_scaling(SCALES, base_fraction)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import List, Tuple
+
+sys.path.append(os.getcwd())
+from src.core.constants import DEFAULT_DATABASE_RECORDING_FILE
+from src.core.database_backends import get_default_backend, set_default_backend
+from src.core.database_recording import RecordingBackend, ReplayBackend
+
+# Benchmarks routing on recorded database. Without arguments routes are calculated on recording made before, once for every
+# simulated round trip latency, each time in a new process, because models are singletons which cache data.
+# With "record" argument routes are calculated on the default database (chosen by PA_DATABASE_BACKEND environment variable)
+# and all queries are recorded, so the benchmark can be run later without database.
+
+LATENCIES = [0.0, 0.001, 0.005, 0.02]
+START_TIME = 15 * 60 * 60 + 20 * 60  # 15:20:00
+# Routes between locations, which work on any data, also on synthetic one
+ROUTES = [
+    ((52.235106638456045, 21.008875045093827), (52.243435656851894, 21.003204483997035)),
+    ((52.21559260459384, 20.860595574905474), (52.27577771225344, 20.865421960582022)),
+    ((52.25, 20.95), (52.20, 21.05)),
+]
+
+RouteResult = Tuple[int, float, float, int]
+
+
+def calculate_routes() -> List[RouteResult]:
+    """Calculate all routes with models connected to the default backend. Returns (steps, seconds, database seconds, queries)"""
+    from src.lib.a_star_navigation import AStarNav
+    from src.models.line_model import LineModel
+    from src.models.nav_data_model import NavDataModel
+    from src.models.stop_model import StopModel
+
+    stop_model = StopModel()
+    stop_model.get_all_stops()
+    nav_data_model = NavDataModel(stop_model, LineModel())
+    results = []
+    for start, end in ROUTES:
+        navigation = AStarNav(nav_data_model)
+        start_time = time.perf_counter()
+        path = navigation.calculate_whole_route(START_TIME, start, end)
+        duration = time.perf_counter() - start_time
+        database_time = navigation.last_search_database_time
+        results.append((len(path), duration, database_time.seconds, database_time.query_count))
+    return results
+
+
+def replay_routes(recording_file: str, latency: float) -> List[RouteResult]:
+    set_default_backend(ReplayBackend(recording_file, latency))
+    return calculate_routes()
+
+
+def test_record_routes(recording_file: str = DEFAULT_DATABASE_RECORDING_FILE):
+    backend = RecordingBackend(get_default_backend(), recording_file)
+    set_default_backend(backend)
+    calculate_routes()
+    backend.save()
+
+
+def test_replay_routes(recording_file: str = DEFAULT_DATABASE_RECORDING_FILE, latencies: List[float] = LATENCIES):
+    for latency in latencies:
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as executor:
+            results = executor.submit(replay_routes, recording_file, latency).result()
+
+        logging.info(f"Round trip latency {latency * 1000:g}ms")
+        for index, (steps, duration, database_seconds, query_count) in enumerate(results):
+            logging.info(f"route {index}: {steps:>3} steps {duration:8.3f}s, database {database_seconds:8.3f}s "
+                         f"({database_seconds / max(duration, 1e-9):4.0%}) in {query_count:>5} queries")
+
+
+def main():
+    logging.basicConfig(format="[%(asctime)s->%(levelname)s->%(module)s" +
+                               "->%(funcName)s]: %(message)s",
+                        datefmt="%H:%M:%S",
+                        level=logging.INFO)
+
+    arguments = [argument for argument in sys.argv[1:] if argument != "record"]
+    recording_file = arguments[0] if arguments else DEFAULT_DATABASE_RECORDING_FILE
+    if "record" in sys.argv[1:]:
+        test_record_routes(recording_file)
+    else:
+        test_replay_routes(recording_file)
+
+
+if __name__ == "__main__":
+    main()
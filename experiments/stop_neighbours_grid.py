@@ -0,0 +1,122 @@
+import logging
+import random
+import statistics
+import time
+from typing import Tuple
+from src.lib.geodesic import ground_distance
+from src.core.database_file_parser import get_stop_neighbours
+from src.core.database_file_parser_types import StopParsedData, StopNeighbourParsedData
+from src.core.database_creator_errors import StopIDOutOfRange
+
+# Compares get_stop_neighbours (grid based) with the old implementation, which compared every stop with every other stop
+# and searched all stops again for each stop without location. Stops are synthetic and spread over Warsaw area,
+# some of them without location, so both implementations must also agree on approximated locations.
+
+STOP_COUNTS = [250, 500, 1000, 2000]
+STOPS_PER_COMPLEX = 4
+MISSING_LOCATION_PROBABILITY = 0.05
+WARSAW_BOUNDS = ((52.05, 52.40), (20.80, 21.30))
+LEGACY_TIME_LIMIT = 60.0
+
+
+def legacy_get_stop_neighbours(data: StopParsedData, walk_distance=250, min_neighbours=5) -> StopNeighbourParsedData:
+    """get_stop_neighbours as it was before the grid was introduced"""
+    STOP_ID = 0
+    STOP_COMPLEX_ID = 2
+    LATITUDE = 3
+    LONGITUDE = 4
+    def approximate_location(stop_complex_id: int) -> Tuple[float, float]:
+        if stop_complex_id < 0:
+            raise StopIDOutOfRange()
+        all_lat = []
+        all_long = []
+        for stop_data in data:
+            if stop_data[STOP_COMPLEX_ID] == stop_complex_id and stop_data[LATITUDE] is not None:
+                all_lat.append(stop_data[LATITUDE])
+                all_long.append(stop_data[LONGITUDE])
+        if len(all_lat) == 0:
+            return approximate_location(stop_complex_id-1)
+        return statistics.mean(all_lat), statistics.mean(all_long)
+
+    all_neighbours = []
+    for stop_data in data:
+        stop_neighbours = []
+        dist_data = []
+
+        if stop_data[LATITUDE]:
+            stop_lat, stop_long = stop_data[LATITUDE], stop_data[LONGITUDE]
+        else:
+            stop_lat, stop_long = approximate_location(stop_data[STOP_COMPLEX_ID])
+
+        for neighbour_data in data:
+
+            if neighbour_data[STOP_ID] == stop_data[STOP_ID]:
+                continue
+
+            if neighbour_data[LATITUDE]:
+                neigh_lat, neigh_long = neighbour_data[LATITUDE], neighbour_data[LONGITUDE]
+            else:
+                neigh_lat, neigh_long = approximate_location(neighbour_data[STOP_COMPLEX_ID])
+
+            distance = ground_distance((stop_lat, stop_long), (neigh_lat, neigh_long))
+            if distance <= walk_distance:
+                stop_neighbours.append((neighbour_data[STOP_ID], distance))
+            dist_data.append((neighbour_data[STOP_ID], distance))
+
+        if len(stop_neighbours) < min_neighbours:
+            stop_neighbours = sorted(dist_data, key= lambda x: x[1])[:min_neighbours]
+
+        for neighbour in stop_neighbours:
+            all_neighbours.append((stop_data[STOP_ID], neighbour[0], round(neighbour[1], 6)))
+
+    return all_neighbours
+
+
+def generate_stops(stop_count: int, seed: int = 0) -> StopParsedData:
+    rng = random.Random(seed)
+    (min_lat, max_lat), (min_lng, max_lng) = WARSAW_BOUNDS
+    stops = []
+    for complex_id in range(1, stop_count // STOPS_PER_COMPLEX + 1):
+        complex_lat, complex_lng = rng.uniform(min_lat, max_lat), rng.uniform(min_lng, max_lng)
+        for stop_number in range(1, STOPS_PER_COMPLEX + 1):
+            if rng.random() < MISSING_LOCATION_PROBABILITY:
+                lat, lng = None, None
+            else:
+                lat, lng = complex_lat + rng.uniform(-0.001, 0.001), complex_lng + rng.uniform(-0.001, 0.001)
+            stops.append([complex_id * 100 + stop_number, f"{stop_number:02}", complex_id, lat, lng, "Ulica", "Kierunek"])
+    return stops
+
+
+def test_stop_neighbours_grid():
+    for stop_count in STOP_COUNTS:
+        stops = generate_stops(stop_count)
+
+        start = time.time()
+        neighbours = get_stop_neighbours(stops)
+        grid_time = time.time() - start
+
+        start = time.time()
+        legacy_neighbours = legacy_get_stop_neighbours(stops)
+        legacy_time = time.time() - start
+
+        # Order of neighbours at the same distance (e.g. stops approximated to the same location) is not defined
+        assert sorted(neighbours) == sorted(legacy_neighbours)
+        logging.info(f"{len(stops)} stops, {len(neighbours)} neighbours: grid {grid_time * 1000:.1f}ms, "
+                     f"all pairs {legacy_time * 1000:.1f}ms ({legacy_time / grid_time:.1f}x)")
+
+        if legacy_time > LEGACY_TIME_LIMIT:
+            logging.info("Skipping bigger sets of stops, all pairs implementation is too slow")
+            break
+
+
+def main():
+    logging.basicConfig(format="[%(asctime)s->%(levelname)s->%(module)s" +
+                               "->%(funcName)s]: %(message)s",
+                        datefmt="%H:%M:%S",
+                        level=logging.INFO)
+
+    test_stop_neighbours_grid()
+
+
+if __name__ == "__main__":
+    main()
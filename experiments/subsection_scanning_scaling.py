@@ -0,0 +1,112 @@
+import logging
+import time
+from typing import List, Tuple, Union
+from src.core.database_file_parser import iter_subsections
+
+# Compares scanning all LW and WK subsections of a synthetic LL section with the old slicing implementation of
+# get_raw_lines_of_text (which copied the rest of the section on every call) and with iter_subsections (cursor based).
+# Section is enlarged by repeating the same line block, so time per line block should stay flat for a linear scan.
+
+SCALES = [1, 2, 4, 8, 16]
+BASE_LINE_BLOCKS = 100
+VARIANTS_PER_LINE = 4
+STOPS_PER_VARIANT = 25
+COURSES_PER_LINE = 20
+LEGACY_TIME_LIMIT = 20.0
+
+
+def legacy_get_raw_lines_of_text(section_name: str, text_lines: List[str], start_index=0) -> Union[Tuple[List[str], int], None]:
+    """get_raw_lines_of_text as it was before iter_subsections was introduced"""
+    start_string = "*" + section_name
+    end_string = "#" + section_name
+    data = []
+    for index, line in enumerate(text_lines[start_index:]):
+        if start_string in line:
+            index += start_index + 1
+            while True:
+                line = text_lines[index]
+                if end_string in line:
+                    return data, index
+                data.append(line)
+                index += 1
+
+
+def generate_line_block(line_number: int) -> List[str]:
+    block = [f"   Linia: {line_number:>3}  - LINIA AUTOBUSOWA\n"]
+    for variant in range(VARIANTS_PER_LINE):
+        block.append("      *TR  5\n")
+        block.append(f"         TP-{variant:04} ,       Banacha,         --  ==>  Annopol,       --       Kier. A   Poz. 0\n")
+        block.append(f"            *LW  {STOPS_PER_VARIANT}\n")
+        for stop in range(STOPS_PER_VARIANT):
+            block.append(f"                                               r {100101 + stop}  Gocławek,        -- 01      | 0| 0|\n")
+        block.append("            #LW\n")
+        block.append("      #TR\n")
+    block.append(f"      *WK {COURSES_PER_LINE * STOPS_PER_VARIANT}\n")
+    for course in range(COURSES_PER_LINE):
+        for stop in range(STOPS_PER_VARIANT):
+            block.append(f"         TP-0000/DP/06.{course:02}__  {100101 + stop} DP  6.{course:02}\n")
+    block.append("      #WK\n")
+    return block
+
+
+def generate_ll_section(n_of_line_blocks: int) -> List[str]:
+    text_lines = []
+    for line_number in range(n_of_line_blocks):
+        text_lines += generate_line_block(line_number)
+    return text_lines
+
+
+def scan_legacy(text_lines: List[str]) -> int:
+    found = 0
+    for section_name in ("LW", "WK"):
+        index = 0
+        while True:
+            raw_data = legacy_get_raw_lines_of_text(section_name, text_lines, start_index=index)
+            if not raw_data:
+                break
+            _, index = raw_data
+            found += 1
+    return found
+
+
+def scan_with_cursor(text_lines: List[str]) -> int:
+    found = 0
+    for section_name in ("LW", "WK"):
+        for _ in iter_subsections(section_name, text_lines):
+            found += 1
+    return found
+
+
+def test_subsection_scanning_scaling():
+    legacy_enabled = True
+    for scale in SCALES:
+        n_of_line_blocks = BASE_LINE_BLOCKS * scale
+        text_lines = generate_ll_section(n_of_line_blocks)
+
+        start = time.perf_counter()
+        found = scan_with_cursor(text_lines)
+        cursor_time = time.perf_counter() - start
+        logging.info(f"{scale:>2}x ({len(text_lines)} lines, {found} subsections) iter_subsections: "
+                     f"{cursor_time * 1000:.1f}ms, {cursor_time / n_of_line_blocks * 1e6:.1f}us per line block")
+
+        if legacy_enabled:
+            start = time.perf_counter()
+            legacy_found = scan_legacy(text_lines)
+            legacy_time = time.perf_counter() - start
+            assert legacy_found == found
+            logging.info(f"{scale:>2}x ({len(text_lines)} lines, {found} subsections) legacy slicing:   "
+                         f"{legacy_time * 1000:.1f}ms, {legacy_time / n_of_line_blocks * 1e6:.1f}us per line block")
+            legacy_enabled = legacy_time < LEGACY_TIME_LIMIT / 4
+
+
+def main():
+    logging.basicConfig(format="[%(asctime)s->%(levelname)s->%(module)s" +
+                               "->%(funcName)s]: %(message)s",
+                        datefmt="%H:%M:%S",
+                        level=logging.INFO)
+
+    test_subsection_scanning_scaling()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,327 @@
+import logging
+import math
+import random
+import sys
+from dataclasses import dataclass, replace
+from datetime import date
+from typing import Dict, List, Tuple
+
+# Generator of synthetic WTP data files. Generated file has all sections which are in real data files
+# (TY, KA, KD, ZA, ZP/PR, SM and LL with TR/LW/RP/WK), with columns in the same places, so it can be parsed by database_file_parser.
+# Sizes are configurable, WARSAW_SIZE is roughly the size of real Warsaw data file.
+
+# Stop complex ID has 4 digits and number of stop within complex has 2 digits in data file
+MAX_STOP_COMPLEXES = 9999
+MAX_STOPS_PER_COMPLEX = 99
+WARSAW_CENTER = (52.23, 21.01)
+# Half of the side of the square in which stops of WARSAW_SIZE file are placed
+WARSAW_RADIUS_DEGREES = (0.2, 0.3)
+FIRST_DATE_ORDINAL = 738480  # 2022-11-21
+DAY_TYPES = [("DP", "DZIEŃ POWSZEDNI"), ("SB", "SOBOTA"), ("NI", "NIEDZIELA")]
+WEEK_DAY_TYPES = [("D1", "PONIEDZIAŁEK"), ("D2", "WTOREK"), ("D3", "ŚRODA"), ("D4", "CZWARTEK"),
+                  ("D5", "PIĄTEK"), ("D6", "SOBOTA"), ("D7", "NIEDZIELA")]
+LINE_TYPES = ["LINIA TRAMWAJOWA", "LINIA AUTOBUSOWA", "LINIA NOCNA", "LINIA STREFOWA"]
+STREETS = ["Grochowska", "Marszałkowska", "Puławska", "Wolska", "Górczewska", "Modlińska", "Radzymińska",
+           "Grójecka", "Żwirki i Wigury", "Aleje Jerozolimskie", "Świętokrzyska", "Targowa", "Wał Miedzeszyński"]
+FIRST_COURSE_MINUTE = 4 * 60 + 30
+LAST_COURSE_MINUTE = 23 * 60 + 30
+
+
+@dataclass
+class WtpFileConfig:
+    """Sizes of generated data file."""
+    stop_complexes: int = 1900
+    stops_per_complex: int = 4
+    towns: int = 50
+    lines: int = 300
+    basic_variants_per_line: int = 4
+    special_variants_per_line: int = 2
+    stops_per_variant: int = 25
+    courses_per_day_type: int = 60
+    days: int = 30
+    # Whether RP sections have timetables of stops (TD, WG, OD and OP subsections), like in real data files.
+    # Database does not use them, but they are a big part of real files
+    departure_tables: bool = True
+    seed: int = 0
+
+    def scaled(self, factor: float) -> "WtpFileConfig":
+        """
+        Returns config of a data file <factor> times bigger: with <factor> times more stops and lines.
+        Stop complexes are limited by width of their IDs, so above that limit complexes get more stops.
+        """
+        stops = round(self.stop_complexes * self.stops_per_complex * factor)
+        stop_complexes = min(max(round(self.stop_complexes * factor), 1), MAX_STOP_COMPLEXES)
+        stops_per_complex = min(math.ceil(stops / stop_complexes), MAX_STOPS_PER_COMPLEX)
+        return replace(self, stop_complexes=stop_complexes, stops_per_complex=stops_per_complex,
+                       lines=max(round(self.lines * factor), 1))
+
+    def area_factor(self) -> float:
+        """
+        Returns how many times the side of area of stops is bigger than in WARSAW_SIZE, so that density of stops is the same
+        """
+        return math.sqrt(self.stop_complexes * self.stops_per_complex / (WARSAW_SIZE.stop_complexes * WARSAW_SIZE.stops_per_complex))
+
+
+WARSAW_SIZE = WtpFileConfig()
+
+
+def fixed_width_line(fields: Dict[int, str]) -> str:
+    """
+    Returns line of text with each value of <fields> written from its key column, ended with new line
+    """
+    line = []
+    for column, text in sorted(fields.items()):
+        line += [" "] * (column - len(line))
+        line[column:column + len(text)] = list(text)
+    return "".join(line) + "\n"
+
+
+def date_str(day: int) -> str:
+    return date.fromordinal(FIRST_DATE_ORDINAL + day).isoformat()
+
+
+def line_name(line_index: int) -> str:
+    return str(line_index + 1)
+
+
+def time_str(minutes: int) -> str:
+    return f"{minutes // 60}.{minutes % 60:02}"
+
+
+class WtpFileGenerator:
+    """Generates content of a synthetic data file described by WtpFileConfig"""
+
+    def __init__(self, config: WtpFileConfig):
+        self._config = config
+        self._rng = random.Random(config.seed)
+        self._towns = [(f"{chr(ord('A') + index // 26)}{chr(ord('A') + index % 26)}", f"MIEJSCOWOŚĆ {index + 1}")
+                       for index in range(config.towns)]
+        self._stops = self._generate_stops()
+        self._stop_ids = sorted(self._stops)
+
+    def _generate_stops(self) -> Dict[int, Tuple[int, float, float, str]]:
+        """
+        Returns dict of stops: stop_id -> (complex_id, latitude, longitude, street)
+        """
+        config = self._config
+        area_factor = config.area_factor()
+        lat_radius, lng_radius = WARSAW_RADIUS_DEGREES[0] * area_factor, WARSAW_RADIUS_DEGREES[1] * area_factor
+        stops = {}
+        for complex_id in range(1, config.stop_complexes + 1):
+            lat = WARSAW_CENTER[0] + self._rng.uniform(-lat_radius, lat_radius)
+            lng = WARSAW_CENTER[1] + self._rng.uniform(-lng_radius, lng_radius)
+            street = self._rng.choice(STREETS)
+            for stop_number in range(1, config.stops_per_complex + 1):
+                stops[complex_id * 100 + stop_number] = (complex_id, lat + self._rng.uniform(-0.0008, 0.0008),
+                                                         lng + self._rng.uniform(-0.0008, 0.0008), street)
+        return stops
+
+    def _route(self) -> List[int]:
+        """
+        Returns stops of a variant: a walk from a random stop, each time to one of the closest not visited complexes
+        """
+        config = self._config
+        route = [self._rng.choice(self._stop_ids)]
+        for _ in range(config.stops_per_variant - 1):
+            complex_id = self._stops[route[-1]][0]
+            next_complex = min(max(complex_id + self._rng.randint(-3, 3), 1), config.stop_complexes)
+            route.append(next_complex * 100 + self._rng.randint(1, config.stops_per_complex))
+        return route
+
+    def write(self, stream) -> None:
+        self._write_day_types(stream)
+        self._write_calendar(stream)
+        self._write_day_lines(stream)
+        self._write_stop_complexes(stream)
+        self._write_stops(stream)
+        self._write_towns(stream)
+        self._write_lines(stream)
+
+    def _write_day_types(self, stream) -> None:
+        day_types = WEEK_DAY_TYPES + DAY_TYPES
+        stream.write(f"*TY  {len(day_types)}\n")
+        for day_type_id, name in day_types:
+            stream.write(f"   {day_type_id}   {name}\n")
+        stream.write("#TY\n")
+
+    def _write_calendar(self, stream) -> None:
+        stream.write(f"*KA  {self._config.days}\n")
+        for day in range(self._config.days):
+            stream.write(f"   {date_str(day)}   1   {self._day_type_of(day)}\n")
+        stream.write("#KA\n")
+
+    def _day_type_of(self, day: int) -> str:
+        week_day = (FIRST_DATE_ORDINAL + day) % 7
+        return "NI" if week_day == 0 else "SB" if week_day == 6 else "DP"
+
+    def _write_day_lines(self, stream) -> None:
+        config = self._config
+        stream.write(f"*KD  {config.days}\n")
+        for day in range(config.days):
+            stream.write(f"   {date_str(day)}  {config.lines}\n")
+            for line_index in range(config.lines):
+                stream.write(fixed_width_line({3: f"{line_name(line_index):>6}", 12: self._day_type_of(day)}))
+        stream.write("#KD\n")
+
+    def _write_stop_complexes(self, stream) -> None:
+        config = self._config
+        stream.write(f"*ZA  {config.stop_complexes}\n")
+        for complex_id in range(1, config.stop_complexes + 1):
+            town_id, town_name = self._town_of(complex_id)
+            stream.write(fixed_width_line({3: f"{complex_id:04}", 10: f"Zespół {complex_id},", 46: town_id, 50: town_name}))
+        stream.write("#ZA\n")
+
+    def _town_of(self, complex_id: int) -> Tuple[str, str]:
+        # most of complexes are in Warsaw, which has no ID in SM section
+        if complex_id % 10 or not self._towns:
+            return "--", "WARSZAWA"
+        return self._towns[complex_id // 10 % len(self._towns)]
+
+    def _write_stops(self, stream) -> None:
+        config = self._config
+        stream.write(f"*ZP  {config.stop_complexes}\n")
+        for complex_id in range(1, config.stop_complexes + 1):
+            town_id, town_name = self._town_of(complex_id)
+            stream.write(fixed_width_line({4: f"{complex_id:04}", 11: f"Zespół {complex_id},", 44: town_id, 48: town_name}))
+            stream.write(f"      *PR  {config.stops_per_complex}\n")
+            for stop_number in range(1, config.stops_per_complex + 1):
+                stop_id = complex_id * 100 + stop_number
+                _, lat, lng, street = self._stops[stop_id]
+                stream.write(fixed_width_line({9: f"{stop_id:06}", 18: "2", 25: "Ul./Pl.:", 34: f"{street},", 68: "Kier.:",
+                                               75: f"Zespół {complex_id % config.stop_complexes + 1},",
+                                               109: "Y=", 112: f"{lat:.6f}", 126: "X=", 129: f"{lng:.6f}", 143: "Pu=0"}))
+                stream.write(fixed_width_line({12: "L", 15: "2", 18: "- stały:", 40: "114   121"}))
+            stream.write("      #PR\n")
+        stream.write("#ZP\n")
+
+    def _write_towns(self, stream) -> None:
+        stream.write(f"*SM  {len(self._towns)}\n")
+        for town_id, name in self._towns:
+            stream.write(f"   {town_id}   {name}\n")
+        stream.write("#SM\n")
+
+    def _write_lines(self, stream) -> None:
+        config = self._config
+        stream.write(f"*LL  {config.lines}\n")
+        for line_index in range(config.lines):
+            self._write_line_block(stream, line_index)
+        stream.write("#LL\n")
+
+    def _write_line_block(self, stream, line_index: int) -> None:
+        config = self._config
+        line = line_name(line_index)
+        stream.write(f"   Linia:{line:>4}  - {LINE_TYPES[line_index % len(LINE_TYPES)]}\n")
+
+        routes = {}
+        for variant_index in range(config.basic_variants_per_line):
+            routes[f"TP-{variant_index:04}"] = self._route()
+        for variant_index in range(config.special_variants_per_line):
+            routes[f"TD-{variant_index:04}"] = self._route()
+
+        variants = list(routes)
+        courses = []
+        for day_type, _ in DAY_TYPES:
+            for course_index in range(config.courses_per_day_type):
+                start = FIRST_COURSE_MINUTE + (LAST_COURSE_MINUTE - FIRST_COURSE_MINUTE) * course_index // config.courses_per_day_type
+                courses.append((variants[course_index % len(variants)], day_type, start))
+
+        for variant_index, variant in enumerate(variants[:config.basic_variants_per_line]):
+            variant_courses = [(day_type, start) for course_variant, day_type, start in courses if course_variant == variant]
+            self._write_variant(stream, variant, variant_index, routes[variant], variant_courses)
+
+        wk_lines = []
+        for variant, day_type, start in courses:
+            course_id = f"{variant}/{day_type}/{start // 60:02}.{start % 60:02}".ljust(17, "_")
+            minute = start
+            for stop_id in routes[variant]:
+                wk_lines.append(fixed_width_line({9: course_id, 28: f"{stop_id:06}", 35: day_type, 37: f"{time_str(minute):>6}"}))
+                minute += self._rng.randint(1, 3)
+        stream.write(f"      *WK  {len(wk_lines)}\n")
+        stream.writelines(wk_lines)
+        stream.write("      #WK\n")
+
+    def _write_variant(self, stream, variant: str, variant_index: int, route: List[int], courses: List[Tuple[str, int]]) -> None:
+        first_complex = self._stops[route[0]][0]
+        last_complex = self._stops[route[-1]][0]
+        stream.write("      *TR  1\n")
+        stream.write(fixed_width_line({9: f"{variant:<8},", 25: f"Zespół {first_complex},", 57: "--", 61: "==>",
+                                       66: f"Zespół {last_complex},", 99: "--", 107: "Kier.", 113: "AB"[variant_index % 2],
+                                       117: "Poz.", 122: str(variant_index // 2 % 10)}))
+        stream.write(f"            *LW  {len(route)}\n")
+        previous_street = None
+        for order, stop_id in enumerate(route):
+            complex_id, _, _, street = self._stops[stop_id]
+            fields = {47: "r", 49: f"{stop_id:06}", 57: f"Zespół {complex_id},", 89: f"-- {stop_id % 100:02}",
+                      100: f"|{order:>2}|{order:>2}|"}
+            if street != previous_street:
+                fields[15] = f"{street},"
+                previous_street = street
+            if order % 7 == 3:
+                fields[96] = "NŻ"
+            stream.write(fixed_width_line(fields))
+        stream.write("            #LW\n")
+        if self._config.departure_tables:
+            self._write_departure_tables(stream, route, courses)
+        else:
+            stream.write("            *RP  1\n")
+            stream.write(fixed_width_line({15: f"{route[0]:06}", 24: "Zespół", 40: "DP  5.10  5.40  6.10"}))
+            stream.write("            #RP\n")
+        stream.write("      #TR\n")
+
+    def _write_departure_tables(self, stream, route: List[int], courses: List[Tuple[str, int]]) -> None:
+        """
+        Writes timetable of each stop of variant: departures grouped by hours (WG) and listed one by one (OD)
+        """
+        day_types = dict(DAY_TYPES)
+        stream.write(f"            *RP  {len(route)}\n")
+        for order, stop_id in enumerate(route):
+            complex_id = self._stops[stop_id][0]
+            stream.write(fixed_width_line({15: f"{stop_id:06}", 24: f"Zespół {complex_id},", 57: "--", 60: "Y= 52.000000"}))
+            stream.write(f"               *TD  {len(day_types)}\n")
+            for day_type, day_type_name in day_types.items():
+                departures = sorted(start + 2 * order for course_day_type, start in courses if course_day_type == day_type)
+                hours = {}
+                for departure in departures:
+                    hours.setdefault(departure // 60, []).append(departure % 60)
+                stream.write(fixed_width_line({18: day_type, 22: day_type_name}))
+                stream.write(f"                  *WG  {len(hours)}\n")
+                for hour, minutes in hours.items():
+                    stream.write(fixed_width_line({21: "G", 24: f"{len(minutes):>2}", 28: f"{hour:>2}:",
+                                                   33: "".join(f"{minute:02}   " for minute in minutes)}))
+                stream.write("                  #WG\n")
+                stream.write(f"                  *OD  {len(departures)}\n")
+                for departure in departures:
+                    stream.write(fixed_width_line({21: f"{time_str(departure):>5}", 28: f"Kurs do: Zespół {complex_id}"}))
+                stream.write("                  #OD\n")
+            stream.write("               #TD\n")
+            stream.write("               *OP  1\n")
+            stream.write(fixed_width_line({18: "Rozkład ważny od dnia 2022-11-21"}))
+            stream.write("               #OP\n")
+        stream.write("            #RP\n")
+
+
+def generate_wtp_file(file_path: str, config: WtpFileConfig = WARSAW_SIZE) -> None:
+    """
+    Writes synthetic data file described by <config> into <file_path>, in the same encoding as real data files
+    """
+    with open(file_path, "w", encoding="cp1250") as stream:
+        WtpFileGenerator(config).write(stream)
+
+
+def main():
+    logging.basicConfig(format="[%(asctime)s->%(levelname)s->%(module)s" +
+                               "->%(funcName)s]: %(message)s",
+                        datefmt="%H:%M:%S",
+                        level=logging.INFO)
+
+    if len(sys.argv) not in (2, 3):
+        logging.error("Usage: python -m experiments.synthetic_wtp_file <output_file> [scale]")
+        return
+    scale = float(sys.argv[2]) if len(sys.argv) == 3 else 1.0
+    config = WARSAW_SIZE.scaled(scale)
+    logging.info(f"Generating {config}")
+    generate_wtp_file(sys.argv[1], config)
+
+
+if __name__ == "__main__":
+    main()
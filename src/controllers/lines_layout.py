@@ -4,7 +4,9 @@ import logging
 from src.models.user_config_model import UserConfigModel
 from src.models.line_model import Line, Route, LineModel
 from src.models.stop_model import StopComplex, Stop, StopModel
+from src.models.departure_model import DepartureModel
 from src.core.controller import Controller
+from src.core.connection_pool import thread_connection
 from src.views.ui_lines_layout import Ui_LinesLayoutUI
 from PySide6.QtWidgets import QWidget, QCompleter, QApplication, QHBoxLayout, QVBoxLayout, QPushButton, QLabel, QScrollArea, QTabWidget, QGroupBox, QGridLayout
 from PySide6.QtCore import QStringListModel, Qt, QThread
@@ -24,7 +26,8 @@ class LinesLayoutDownload(QThread):
         self.lines = None
 
     def run(self) -> None:
-        self.lines = self._line_model._get_all_lines()
+        with thread_connection():
+            self.lines = self._line_model._get_all_lines()
 
 
 class LinesLayout(Controller, QWidget):
@@ -86,7 +89,8 @@ class RoutesLayoutDownload(QThread):
         self.route_types = None
 
     def run(self) -> None:
-        self.line_routes, self.route_types = self._line_model._get_line_routes(self._line.line_id)
+        with thread_connection():
+            self.line_routes, self.route_types = self._line_model._get_line_routes(self._line.line_id)
 
 
 class RoutesLayout(Controller, QWidget):
@@ -145,6 +149,17 @@ class Street:
 
 
 
+class DeparturesPreload(QThread):
+    def __init__(self, departure_model: DepartureModel, stop_ids):
+        super().__init__()
+        self._departure_model = departure_model
+        self._stop_ids = stop_ids
+
+    def run(self) -> None:
+        with thread_connection():
+            self._departure_model.preload(self._stop_ids)
+
+
 class StopsLayout(Controller, QWidget):
 
     def __init__(self, main_window, parent=None):
@@ -161,6 +176,9 @@ class StopsLayout(Controller, QWidget):
 
     def _create_stops_table(self, route):
         self._route = route
+        # Departures of all stops of route are downloaded in one query, so their timetables open without waiting
+        self._preload_thread = DeparturesPreload(DepartureModel(), [stop.stop_id for stop in route.stops])
+        self._preload_thread.start()
         self.scroll = QScrollArea() # Scroll Area which contains the widgets, set as the centralWidget
         self.widget = QWidget() # Widget that contains the collection of Vertical Box
         self._vertical_layout = QVBoxLayout() # The Vertical Box that contains the Horizontal Boxes of labels and buttons
@@ -196,15 +214,16 @@ class StopsLayout(Controller, QWidget):
 
 
 class TimeTableLayoutDownload(QThread):
-    def __init__(self, stop_model: StopModel, route, stop):
+    def __init__(self, departure_model: DepartureModel, route, stop):
         super().__init__()
-        self._stop_model = stop_model
+        self._departure_model = departure_model
         self.time_departures = None
         self._route = route
         self._stop = stop
         
     def run(self) -> None:
-        self.time_departures = self._stop_model.get_time_departures_from_stop_of_route(self._route, self._stop.stop_id)
+        with thread_connection():
+            self.time_departures = self._departure_model.get_departures(self._stop.stop_id, self._route.variant_id)
 
 
 class TimeTableLayout(Controller, QWidget):
@@ -219,9 +238,9 @@ class TimeTableLayout(Controller, QWidget):
         self._ui.setupUi(self)
         # Models
         self._user_config = UserConfigModel.get_instance()
-        self._stop_model = StopModel()
-        
-        self._download_thread = TimeTableLayoutDownload(self._stop_model, route, stop)
+        self._departure_model = DepartureModel()
+
+        self._download_thread = TimeTableLayoutDownload(self._departure_model, route, stop)
         self._download_thread.finished.connect(self._on_init_data_download_complete)
         self._download_thread.start()
 
@@ -235,10 +254,7 @@ class TimeTableLayout(Controller, QWidget):
         self.widget = QWidget() # Widget that contains the collection of Vertical Box
         self._grid_layout = QGridLayout() # The Grid Layout that contains the Boxes of labels
 
-        time_departures = self._download_thread.time_departures
-        time_departures_integers = sorted([int(t) for t in time_departures])
-        time_departures = time_departures_integers
-        time_departures = self.to_matrix(time_departures, 5)
+        time_departures = self.to_matrix(self._download_thread.time_departures, 5)
 
         for i in range(len(time_departures)):
             for j in range(5):
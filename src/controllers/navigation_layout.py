@@ -8,6 +8,8 @@ from src.lib.navigation_steps import GoOnFoot, StartAtNode, TakeTransit
 from src.models.stop_model import StopComplex, Stop, StopModel, STOP_COMPLEX_OBJECT_TYPE, STOP_OBJECT_TYPE
 from src.models.line_model import LineModel, NavRoute
 from src.core.controller import Controller
+from src.controllers.search_completer import SearchCompleter
+from src.core.connection_pool import thread_connection
 from src.views.ui_navigation_layout import Ui_WidgetNavigation
 from PySide6.QtWidgets import QWidget, QCompleter, QApplication, QTreeWidgetItem, QMenu, QInputDialog, QMessageBox, QListWidgetItem
 from PySide6.QtCore import QStringListModel, Qt, QThread, QTime, QSize
@@ -78,8 +80,10 @@ class NavigationLayoutDownload(QThread):
         self.variant_stops = None
 
     def run(self) -> None:
-        self.stops = self._stop_model.get_all_stops()
-        self._line_model.all_lines_routes = self._line_model._get_all_lines_routes()
+        with thread_connection():
+            self.stops = self._stop_model.get_all_stops()
+            self._stop_model.prepare_search(with_complexes=False)
+            self._line_model.all_lines_routes = self._line_model._get_all_lines_routes()
 
 
 
@@ -94,7 +98,8 @@ class NavStepsDownload(QThread):
 
     def run(self) -> None:
         midnight_time = datetime.combine(date.min, datetime.min.time())
-        self.nav_steps = self._astar_model.calculate_whole_route((self._selected_time - midnight_time).seconds, self._object_id_start, self._object_id_end)
+        with thread_connection():
+            self.nav_steps = self._astar_model.calculate_whole_route((self._selected_time - midnight_time).seconds, self._object_id_start, self._object_id_end)
 
 
 
@@ -125,20 +130,9 @@ class NavigationLayout(Controller, QWidget):
         self._current_route = None
 
         self._current_stop: Stop = None
-        self._stop_complex_names_qmodel = QStringListModel()
-        stop_identifiers = [stop.readable_identifier for stop in self._download_thread.stops]
-
-        self._stop_complex_names_qmodel.setStringList(stop_identifiers)
-
-        self._search_bar1_completer = QCompleter()
-        self._search_bar1_completer.setModel(self._stop_complex_names_qmodel)
-        self._search_bar1_completer.setCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
-        self._search_bar1_completer.setFilterMode(Qt.MatchFlag.MatchContains)
-
-        self._search_bar2_completer = QCompleter()
-        self._search_bar2_completer.setModel(self._stop_complex_names_qmodel)
-        self._search_bar2_completer.setCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
-        self._search_bar2_completer.setFilterMode(Qt.MatchFlag.MatchContains)
+        search_stops = functools.partial(self._stop_model.search, with_complexes=False)
+        self._search_bar1_completer = SearchCompleter(search_stops, self)
+        self._search_bar2_completer = SearchCompleter(search_stops, self)
 
         self._ui.timeEdit.setTime(QTime.currentTime())
 
@@ -152,8 +146,8 @@ class NavigationLayout(Controller, QWidget):
         self.setEnabled(True)
 
     def _ui_finalize(self):
-        self._ui.searchBar1.setCompleter(self._search_bar1_completer)
-        self._ui.searchBar2.setCompleter(self._search_bar2_completer)
+        self._search_bar1_completer.attach(self._ui.searchBar1)
+        self._search_bar2_completer.attach(self._ui.searchBar2)
         self._reload_favourites()
         self._reload_fav_button()
 
@@ -0,0 +1,33 @@
+from typing import Callable, List
+from PySide6.QtCore import QStringListModel
+from PySide6.QtWidgets import QCompleter, QLineEdit
+
+
+class SearchCompleter(QCompleter):
+    """
+    Completer which asks a search function for suggestions every time user edits the text, instead of filtering a list
+    of all possible suggestions. Suggestions are shown in the order in which they were returned.
+    """
+
+    def __init__(self, search: Callable[[str], List[str]], parent=None):
+        """
+        :param search: function returning suggestions for text typed by user, best first
+        """
+        super().__init__(parent)
+        self._search = search
+        self._suggestions_qmodel = QStringListModel(self)
+        self.setModel(self._suggestions_qmodel)
+        # Suggestions already match the text, they do not have to begin with it
+        self.setCompletionMode(QCompleter.CompletionMode.UnfilteredPopupCompletion)
+
+    def attach(self, line_edit: QLineEdit):
+        line_edit.setCompleter(self)
+        line_edit.textEdited.connect(self._on_text_edited)
+
+    def _on_text_edited(self, text: str):
+        suggestions = self._search(text)
+        self._suggestions_qmodel.setStringList(suggestions)
+        if suggestions:
+            self.complete()
+        else:
+            self.popup().hide()
@@ -6,6 +6,8 @@ from PySide6.QtGui import QAction
 from src.models.user_config_model import UserConfigModel
 from src.models.stop_model import Stop, StopComplex, StopModel, STOP_COMPLEX_OBJECT_TYPE, STOP_OBJECT_TYPE
 from src.core.controller import Controller
+from src.controllers.search_completer import SearchCompleter
+from src.core.connection_pool import thread_connection
 from src.views.ui_stop_layout import Ui_WidgetStopComplex
 from src.core.constants import DEFAULT_LOC_WARSAW
 from PySide6.QtWidgets import QWidget, QCompleter, QApplication, QTreeWidgetItem, QListWidgetItem, QMenu, QInputDialog, \
@@ -74,10 +76,12 @@ class ComplexesAndStopsDownload(QThread):
         self.complexes = None
 
     def run(self) -> None:
-        self.complexes = self._stop_model.get_complexes()
-        logging.info("Complex download complete")
-        self.stops = self._stop_model.get_all_stops()
-        logging.info("Stops download complete")
+        with thread_connection():
+            self.complexes = self._stop_model.get_complexes()
+            logging.info("Complex download complete")
+            self.stops = self._stop_model.get_all_stops()
+            logging.info("Stops download complete")
+            self._stop_model.prepare_search()
 
 
 class StationLayout(Controller, QWidget):
@@ -101,17 +105,7 @@ class StationLayout(Controller, QWidget):
         self._current_complex: StopComplex = None
         self._fav_menu = None
 
-        self._stop_complex_names_qmodel = QStringListModel()
-        stop_identifiers = [stop.readable_identifier for stop in self._download_thread.stops]
-        complex_identifiers = [complex.readable_identifier for complex in self._download_thread.complexes]
-
-        self._stop_complex_names_qmodel.setStringList(stop_identifiers + complex_identifiers)
-        #####
-
-        self._search_bar_completer = QCompleter()
-        self._search_bar_completer.setModel(self._stop_complex_names_qmodel)
-        self._search_bar_completer.setCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
-        self._search_bar_completer.setFilterMode(Qt.MatchFlag.MatchContains)
+        self._search_bar_completer = SearchCompleter(self._stop_model.search, self)
 
         self._ui_finalize()
         self._set_up_triggers()
@@ -152,7 +146,7 @@ class StationLayout(Controller, QWidget):
 
 
     def _ui_finalize(self):
-        self._ui.leSearchBar.setCompleter(self._search_bar_completer)
+        self._search_bar_completer.attach(self._ui.leSearchBar)
         self._reload_favourites()
         self._reload_fav_button()
 
@@ -0,0 +1,166 @@
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, List
+from src.core.database_backends import DatabaseBackend, get_default_backend
+
+# Connections to database shared by all models of the process. Each thread checks out one connection and uses it
+# for all its queries, until it releases it or ends, so connections are never used by two threads at once.
+# Download workers (QThreads) release their connection at the end of run() by thread_connection() context manager.
+
+DEFAULT_POOL_MIN_SIZE = 1
+DEFAULT_POOL_MAX_SIZE = 8
+DEFAULT_POOL_TIMEOUT = 30.0
+
+
+class ConnectionPoolTimeoutError(Exception):
+    """
+    An error which occurs when all connections of the pool were checked out for longer than the timeout
+    """
+    def __init__(self, max_size: int, timeout: float) -> None:
+        super().__init__(f"All {max_size} database connections are in use, none was released in {timeout}s")
+
+
+class ConnectionPool:
+    """
+    Pool of connections to one database, checked out per thread
+    """
+
+    def __init__(self, backend: DatabaseBackend, min_size: int = DEFAULT_POOL_MIN_SIZE, max_size: int = DEFAULT_POOL_MAX_SIZE,
+                 timeout: float = DEFAULT_POOL_TIMEOUT):
+        """
+        :param backend: database to which connections are opened
+        :param min_size: number of connections opened at once and kept open when they are idle
+        :param max_size: maximum number of open connections
+        :param timeout: how many seconds a thread waits for a connection when all of them are checked out
+        """
+        if not 0 <= min_size <= max_size or max_size < 1:
+            raise ValueError(f"Invalid pool size: min {min_size}, max {max_size}")
+        self._backend = backend
+        self._min_size = min_size
+        self._max_size = max_size
+        self._timeout = timeout
+        self._condition = threading.Condition()
+        self._idle: List = []
+        self._checked_out: Dict[threading.Thread, object] = {}
+        self._size = 0
+
+        for _ in range(min_size):
+            self._idle.append(self._open())
+
+    @property
+    def backend(self) -> DatabaseBackend:
+        return self._backend
+
+    @property
+    def size(self) -> int:
+        """Number of open connections"""
+        return self._size
+
+    @property
+    def idle_count(self) -> int:
+        return len(self._idle)
+
+    def _open(self):
+        connection = self._backend.connect()
+        self._size += 1
+        logging.info(f"Opened database connection {self._size} of at most {self._max_size}")
+        return connection
+
+    def _discard(self, connection) -> None:
+        self._size -= 1
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def _reclaim_from_ended_threads(self) -> None:
+        for thread in [thread for thread in self._checked_out if not thread.is_alive()]:
+            self._idle.append(self._checked_out.pop(thread))
+
+    def acquire(self):
+        """
+        Checks out a connection for the current thread. A thread which already has one gets the same connection.
+        Idle connections are checked by a ping before they are given out and replaced when they are broken.
+        :return: connection of the current thread
+        """
+        thread = threading.current_thread()
+        with self._condition:
+            if thread in self._checked_out:
+                return self._checked_out[thread]
+
+            while True:
+                self._reclaim_from_ended_threads()
+                while self._idle:
+                    connection = self._idle.pop()
+                    if self._backend.is_healthy(connection):
+                        self._checked_out[thread] = connection
+                        return connection
+                    logging.warning("Database connection is broken, replacing it")
+                    self._discard(connection)
+
+                if self._size < self._max_size:
+                    connection = self._open()
+                    self._checked_out[thread] = connection
+                    return connection
+
+                if not self._condition.wait(self._timeout):
+                    raise ConnectionPoolTimeoutError(self._max_size, self._timeout)
+
+    def release(self) -> None:
+        """
+        Returns the connection of the current thread to the pool. It is closed when more than the minimum number of connections is open.
+        """
+        with self._condition:
+            connection = self._checked_out.pop(threading.current_thread(), None)
+            if connection is None:
+                return
+            if self._size > self._min_size:
+                self._discard(connection)
+            else:
+                self._idle.append(connection)
+            self._condition.notify()
+
+    def close(self) -> None:
+        """
+        Closes all idle connections. Checked out connections are closed when they are released.
+        """
+        with self._condition:
+            self._min_size = 0
+            while self._idle:
+                self._discard(self._idle.pop())
+
+
+_pools: Dict[DatabaseBackend, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_connection_pool(backend: DatabaseBackend = None, min_size: int = DEFAULT_POOL_MIN_SIZE,
+                        max_size: int = DEFAULT_POOL_MAX_SIZE) -> ConnectionPool:
+    """
+    Returns the process-wide pool of connections to the backend, creating it on first use
+    :param backend: database, by default the one returned by get_default_backend()
+    :param min_size: minimum size of the pool, used only when the pool is created
+    :param max_size: maximum size of the pool, used only when the pool is created
+    :return: connection pool
+    """
+    if backend is None:
+        backend = get_default_backend()
+    with _pools_lock:
+        if backend not in _pools:
+            _pools[backend] = ConnectionPool(backend, min_size, max_size)
+        return _pools[backend]
+
+
+@contextmanager
+def thread_connection(backend: DatabaseBackend = None):
+    """
+    Checks out a connection for the current thread and releases it at the end, to be used in run() of download workers
+    :param backend: database, by default the one returned by get_default_backend()
+    """
+    pool = get_connection_pool(backend)
+    connection = pool.acquire()
+    try:
+        yield connection
+    finally:
+        pool.release()
@@ -1,3 +1,8 @@
 DEFAULT_DATA_FOLDER = "./data"
 DEFAULT_USER_CONFIG_FILE = DEFAULT_DATA_FOLDER + "/user_config.conf"
+DEFAULT_PARSED_DATA_FOLDER = DEFAULT_DATA_FOLDER + "/parsed_data"
+DEFAULT_SQLITE_DATABASE_FILE = DEFAULT_DATA_FOLDER + "/database.sqlite"
+DEFAULT_SLOW_QUERY_LOG_FILE = DEFAULT_DATA_FOLDER + "/slow_queries.log"
+DEFAULT_REFERENCE_DATA_FOLDER = DEFAULT_DATA_FOLDER + "/reference_data"
+DEFAULT_DATABASE_RECORDING_FILE = DEFAULT_DATA_FOLDER + "/database_recording.pickle.gz"
 DEFAULT_LOC_WARSAW = (52.23202234742001, 21.00711554322202)
\ No newline at end of file
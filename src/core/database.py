@@ -1,32 +1,198 @@
-import oracledb
+import time
+from typing import Iterable, Iterator, Dict, Any, Callable, List
+from src.core.database_backends import DatabaseBackend
+from src.core.connection_pool import ConnectionPool, get_connection_pool
+from src.core.query_statistics import record_query, estimate_row_size, get_calling_method
 
-_HOST = "ora4.ii.pw.edu.pl"
-_SERVICE_NAME = "pdb1.ii.pw.edu.pl"
-_PORT = 1521
-_DSN = oracledb.makedsn(_HOST, _PORT, service_name=_SERVICE_NAME)
+# Number of rows fetched from database in one round trip by iter_rows()
+DEFAULT_FETCH_ARRAY_SIZE = 1000
+
+
+class InstrumentedCursor:
+    """
+    Cursor which records every statement in query statistics: time spent in execute and in all fetches, number and size
+    of fetched rows and the method which executed it. Statement is recorded when all its rows are fetched, when the next
+    statement is executed or when the cursor is closed or dropped. Other attributes are those of the wrapped cursor.
+    """
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self._sql = None
+        self._caller = None
+        self._seconds = 0.0
+        self._rows = 0
+        self._bytes = 0
+
+    @property
+    def wrapped_cursor(self):
+        return self._cursor
+
+    def __getattr__(self, name: str):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self._cursor, name)
+
+    def __setattr__(self, name: str, value) -> None:
+        # Settings like arraysize belong to the wrapped cursor
+        if name.startswith("_"):
+            super().__setattr__(name, value)
+        else:
+            setattr(self._cursor, name, value)
+
+    def _start(self, sql: str) -> None:
+        self._finish()
+        self._sql = sql
+        self._caller = get_calling_method()
+        self._seconds = 0.0
+        self._rows = 0
+        self._bytes = 0
+
+    def _add_fetched(self, rows, seconds: float) -> None:
+        self._seconds += seconds
+        self._rows += len(rows)
+        self._bytes += sum(estimate_row_size(row) for row in rows)
+
+    def _finish(self) -> None:
+        if self._sql is not None:
+            record_query(self._sql, self._seconds, self._rows, self._bytes, self._caller)
+            self._sql = None
+
+    def execute(self, sql: str, parameters=None) -> "InstrumentedCursor":
+        self._start(sql)
+        start = time.perf_counter()
+        try:
+            self._cursor.execute(sql, parameters if parameters is not None else {})
+        finally:
+            self._seconds += time.perf_counter() - start
+        return self
+
+    def executemany(self, sql: str, rows) -> "InstrumentedCursor":
+        self._start(sql)
+        start = time.perf_counter()
+        try:
+            self._cursor.executemany(sql, rows)
+        finally:
+            self._seconds += time.perf_counter() - start
+            self._finish()
+        return self
+
+    def fetchone(self):
+        start = time.perf_counter()
+        row = self._cursor.fetchone()
+        self._add_fetched([] if row is None else [row], time.perf_counter() - start)
+        if row is None:
+            self._finish()
+        return row
+
+    def fetchmany(self, size: int = None) -> List:
+        start = time.perf_counter()
+        rows = self._cursor.fetchmany(self._cursor.arraysize if size is None else size)
+        self._add_fetched(rows, time.perf_counter() - start)
+        if not rows:
+            self._finish()
+        return rows
+
+    def fetchall(self) -> List:
+        start = time.perf_counter()
+        rows = self._cursor.fetchall()
+        self._add_fetched(rows, time.perf_counter() - start)
+        self._finish()
+        return rows
+
+    def __iter__(self) -> Iterator:
+        while rows := self.fetchmany():
+            yield from rows
+
+    def close(self) -> None:
+        self._finish()
+        self._cursor.close()
+
+    def __del__(self):
+        try:
+            self._finish()
+        except Exception:
+            pass
 
 
 class Database:
     """
-    Cursor access to the Z14 database
+    Cursor access to the Z14 database. Connections are borrowed from the process-wide connection pool,
+    so creating a Database does not open a connection.
+    Queries should pass values as named bind parameters (:name) instead of formatting them into SQL, so that statement text
+    stays the same and connections reuse statements they already prepared.
+    Time, rows and bytes fetched by all queries are recorded in query statistics, because cursors are instrumented.
     """
 
-    def __init__(self):
-        self._connection = oracledb.connect(user='z14', password="dn7xv3", dsn=_DSN)
+    def __init__(self, backend: DatabaseBackend = None):
+        """
+        :param backend: database to connect to, by default the one returned by get_default_backend()
+        """
+        self._pool: ConnectionPool = get_connection_pool(backend)
+
+    @property
+    def backend(self) -> DatabaseBackend:
+        return self._pool.backend
 
     @property
-    def cursor(self):
-        return self._connection.cursor()
+    def cursor(self) -> InstrumentedCursor:
+        return InstrumentedCursor(self._pool.acquire().cursor())
+
+    def execute(self, sql: str, parameters: Dict[str, Any] = None) -> InstrumentedCursor:
+        """
+        Executes sql with bind parameters
+        :param sql: sql statement with named bind parameters
+        :param parameters: values of bind parameters
+        :return: cursor with results, the query is recorded when all rows are fetched or the cursor is closed or dropped
+        """
+        return self.cursor.execute(sql, parameters)
+
+    def id_list(self, name: str) -> str:
+        """
+        :param name: name of bind parameter
+        :return: subquery selecting IDs of list bound as parameter <name> by id_list_value()
+        """
+        return self.backend.id_list_subquery(name)
+
+    def id_list_value(self, ids: Iterable[int]):
+        """
+        :param ids: integer IDs
+        :return: value of bind parameter used in subquery returned by id_list()
+        """
+        return self.backend.id_list_value(self._pool.acquire(), ids)
+
+    def iter_rows(self, sql: str, parameters: Dict[str, Any] = None, map_to: Callable = None,
+                  arraysize: int = DEFAULT_FETCH_ARRAY_SIZE, prefetchrows: int = None) -> Iterator:
+        """
+        Yields results of a sql select while they are fetched, so only one batch of <arraysize> rows is held in memory
+        :param sql: sql select
+        :param parameters: values of bind parameters of sql
+        :param map_to: type to map each row to, rows are yielded as tuples if it is None
+        :param arraysize: number of rows fetched in one round trip
+        :param prefetchrows: number of rows returned together with the result of the query, if the database supports it
+        :return: iterator of rows
+        """
+        # Cursor measures only time spent in database, not time of processing of yielded rows by the caller
+        cur = self.cursor
+        cur.arraysize = arraysize
+        if prefetchrows is not None and hasattr(cur, "prefetchrows"):
+            cur.prefetchrows = prefetchrows
+        try:
+            cur.execute(sql, parameters)
+            while rows := cur.fetchmany(arraysize):
+                if map_to is None:
+                    yield from rows
+                else:
+                    for row in rows:
+                        yield map_to(*row)
+        finally:
+            cur.close()
 
-    def simple_type_mapping(self, sql: str, map_to):
+    def simple_type_mapping(self, sql: str, map_to, parameters: Dict[str, Any] = None):
         """
         Converts the results of a sql select to a list of elements of 'map_to' type
         :param sql: sql select
         :param map_to: type to map to
+        :param parameters: values of bind parameters of sql
         :return: list
         """
-        out = []
-        cur = self.cursor.execute(sql)
-        for row in cur.fetchall():
-            out.append(map_to(*row))
-        return out
+        return list(self.iter_rows(sql, parameters, map_to))
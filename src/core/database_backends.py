@@ -0,0 +1,377 @@
+import json
+import math
+import os
+import re
+import sqlite3
+import weakref
+from abc import ABC, abstractmethod
+from typing import List, Iterable
+
+import oracledb
+from src.core.constants import DEFAULT_SQLITE_DATABASE_FILE, DEFAULT_DATABASE_RECORDING_FILE
+
+# Databases which can hold data of application. Oracle database is the shared remote one, SQLite database is a local file
+# with the same tables, which lets application work offline. Backend used by Database class is chosen by environment variable
+# DATABASE_BACKEND_VARIABLE ("oracle", "sqlite" or "replay" of a recording made by database_recording module)
+# or by set_default_backend() function.
+
+DATABASE_BACKEND_VARIABLE = "PA_DATABASE_BACKEND"
+SQLITE_DATABASE_FILE_VARIABLE = "PA_SQLITE_DATABASE_FILE"
+DATABASE_RECORDING_FILE_VARIABLE = "PA_DATABASE_RECORDING_FILE"
+
+_HOST = "ora4.ii.pw.edu.pl"
+_SERVICE_NAME = "pdb1.ii.pw.edu.pl"
+_PORT = 1521
+_USER = "z14"
+_PASSWORD = "dn7xv3"
+
+# Number of prepared statements kept by each connection, so repeated queries with bind parameters are not parsed again
+STATEMENT_CACHE_SIZE = 64
+
+# Version stamp of data, which also has to be created in databases built before it existed
+SQLITE_DATASET_VERSION_TABLE = """CREATE TABLE IF NOT EXISTS Dataset_Version(
+    Version TEXT NOT NULL PRIMARY KEY
+    )"""
+
+# Tables of database in SQLite dialect, in order in which they can be created. Identity columns are INTEGER PRIMARY KEY
+# columns, which SQLite fills itself when NULL is inserted. Foreign keys of Oracle tables are declared inline.
+SQLITE_SCHEMA = [
+    """CREATE TABLE Town(
+    TOWN_ID TEXT NOT NULL PRIMARY KEY,
+    TOWN_NAME TEXT NOT NULL
+    )""",
+    """CREATE TABLE Place(
+    Place_ID INTEGER NOT NULL PRIMARY KEY,
+    Place_Name TEXT NOT NULL
+    )""",
+    """CREATE TABLE Stop_Complex(
+    STOP_COMPLEX_ID INTEGER NOT NULL PRIMARY KEY,
+    NAME TEXT NOT NULL,
+    TOWN_ID TEXT NOT NULL REFERENCES Town(TOWN_ID)
+    )""",
+    """CREATE TABLE Stop(
+    STOP_ID INTEGER NOT NULL PRIMARY KEY,
+    STOP_NUMBER TEXT NOT NULL,
+    STOP_COMPLEX_ID INTEGER NOT NULL REFERENCES Stop_Complex(STOP_COMPLEX_ID) ON DELETE CASCADE,
+    LATITUDE REAL,
+    LONGITUDE REAL,
+    STREET INTEGER REFERENCES Place(Place_ID),
+    DIRECTION INTEGER REFERENCES Place(Place_ID)
+    )""",
+    """CREATE TABLE LINE_TYPE(
+    TYPE_ID INTEGER NOT NULL PRIMARY KEY,
+    TYPE_NAME TEXT NOT NULL
+    )""",
+    """CREATE TABLE LINE(
+    LINE_ID TEXT NOT NULL PRIMARY KEY,
+    LINE_TYPE_ID INTEGER NOT NULL REFERENCES LINE_TYPE(TYPE_ID)
+    )""",
+    """CREATE TABLE Variant(
+    Variant_ID INTEGER PRIMARY KEY,
+    Line_ID TEXT NOT NULL REFERENCES Line(Line_ID),
+    Variant_name TEXT NOT NULL,
+    Direction TEXT CHECK (Direction IN ('A', 'B')),
+    Dir_level INTEGER,
+    Dir_description INTEGER REFERENCES Place(Place_ID),
+    Is_basic INTEGER NOT NULL CHECK (Is_basic IN (0, 1))
+    )""",
+    """CREATE TABLE Day_Type(
+    DAY_TYPE_ID TEXT NOT NULL PRIMARY KEY,
+    DAY_TYPE_NAME TEXT NOT NULL
+    )""",
+    """CREATE TABLE Course(
+    Course_ID INTEGER PRIMARY KEY,
+    Variant_ID INTEGER NOT NULL REFERENCES Variant(Variant_ID),
+    Day_Type_ID TEXT NOT NULL REFERENCES Day_Type(DAY_TYPE_ID),
+    Start_time INTEGER NOT NULL
+    )""",
+    """CREATE TABLE Stop_Course(
+    SC_ID INTEGER PRIMARY KEY,
+    Course_ID INTEGER NOT NULL REFERENCES Course(Course_ID),
+    Stop_ID INTEGER NOT NULL REFERENCES Stop(Stop_ID),
+    Departure_time INTEGER,
+    Chunk INTEGER
+    )""",
+    """CREATE TABLE Stop_Neighbour(
+    SN_ID INTEGER PRIMARY KEY,
+    Stop_ID INTEGER NOT NULL REFERENCES Stop(Stop_ID),
+    Neighbour_ID INTEGER NOT NULL REFERENCES Stop(Stop_ID),
+    Distance REAL NOT NULL
+    )""",
+    """CREATE TABLE Stop_Variant(
+    SV_ID INTEGER PRIMARY KEY,
+    Variant_ID INTEGER NOT NULL REFERENCES Variant(Variant_ID),
+    Variant_Order INTEGER NOT NULL,
+    Stop_ID INTEGER NOT NULL REFERENCES Stop(Stop_ID),
+    On_request INTEGER CHECK (On_request IN (0, 1)),
+    Zone_number INTEGER CHECK (Zone_number IN (1, 2))
+    )""",
+    """CREATE TABLE Day_Line(
+    DL_ID INTEGER PRIMARY KEY,
+    Day TEXT,
+    Line_ID TEXT NOT NULL REFERENCES Line(Line_ID),
+    Day_Type_ID TEXT REFERENCES Day_Type(DAY_TYPE_ID)
+    )""",
+    SQLITE_DATASET_VERSION_TABLE,
+    # Oracle creates indexes only for primary keys too, but there every query is dominated by network round trip
+    "CREATE INDEX Stop_Course_Chunk_IX ON Stop_Course(Chunk)",
+    "CREATE INDEX Stop_Course_Course_IX ON Stop_Course(Course_ID)",
+    "CREATE INDEX Stop_Course_Stop_IX ON Stop_Course(Stop_ID)",
+    "CREATE INDEX Course_Variant_IX ON Course(Variant_ID)",
+    "CREATE INDEX Variant_Line_IX ON Variant(Line_ID, Variant_name)",
+    "CREATE INDEX Stop_Variant_Variant_IX ON Stop_Variant(Variant_ID)",
+    "CREATE INDEX Stop_Neighbour_Stop_IX ON Stop_Neighbour(Stop_ID)",
+]
+
+SQLITE_TABLES = ["Dataset_Version", "Day_Line", "Stop_Variant", "Stop_Neighbour", "Stop_Course", "Course", "Day_Type", "Variant",
+                 "LINE", "LINE_TYPE", "Stop", "Stop_Complex", "Place", "Town"]
+
+# Oracle-only constructs used by database builder and their SQLite equivalents, applied in this order
+_SQLITE_REWRITES = [
+    # DELETE ... AND ROWNUM = 1 deletes only one of equal rows
+    (re.compile(r"^\s*DELETE FROM (\w+) WHERE (.*?)\s+AND ROWNUM = 1\s*$", re.IGNORECASE | re.DOTALL),
+     r"DELETE FROM \1 WHERE rowid = (SELECT rowid FROM \1 WHERE \2 LIMIT 1)"),
+    (re.compile(r"get_variant_id_by_line_and_var_name\(\s*(:\d+)\s*,\s*(:\d+)\s*\)", re.IGNORECASE),
+     r"(SELECT Variant_ID FROM Variant WHERE Line_ID = \1 AND Variant_name = \2)"),
+    (re.compile(r"to_date\(\s*(:\d+)\s*,\s*'YYYY-MM-DD'\s*\)", re.IGNORECASE), r"\1"),
+    # DECODE(column, value, 1, 0) = 1 compares NULL values as equal
+    (re.compile(r"DECODE\(\s*(\w+)\s*,\s*(:\d+)\s*,\s*1\s*,\s*0\s*\)\s*=\s*1", re.IGNORECASE), r"\1 IS \2"),
+    (re.compile(r"VALUES\s*\(\s*DEFAULT\b", re.IGNORECASE), "VALUES(NULL"),
+    (re.compile(r"\bNVL\(", re.IGNORECASE), "IFNULL("),
+    # Numbered binds :1 are written as ?1, which SQLite binds by position
+    (re.compile(r"(?<![\w:]):(\d+)\b"), r"?\1"),
+]
+
+
+class DatabaseBackend(ABC):
+    """
+    Database in which data of application is stored
+    """
+
+    @abstractmethod
+    def connect(self):
+        """
+        Opens a new connection to the database
+        :return: DB-API connection
+        """
+
+    def is_healthy(self, connection) -> bool:
+        """
+        Checks by a round trip whether connection can still be used
+        :param connection: connection opened by connect()
+        :return: True if database answered
+        """
+        try:
+            connection.ping()
+            return True
+        except Exception:
+            return False
+
+    @abstractmethod
+    def id_list_subquery(self, name: str) -> str:
+        """
+        SQL subquery selecting IDs from list bound as parameter <name>, so that lists of any length use the same statement
+        :param name: name of bind parameter
+        :return: subquery to be used like "column IN (subquery)"
+        """
+
+    @abstractmethod
+    def id_list_value(self, connection, ids: Iterable[int]):
+        """
+        Converts IDs into value of parameter used by id_list_subquery()
+        :param connection: connection on which statement will be executed
+        :param ids: integer IDs
+        :return: value to bind
+        """
+
+
+class OracleBackend(DatabaseBackend):
+    """
+    Remote Oracle database of the Z14 team
+    """
+
+    def __init__(self, user: str = _USER, password: str = _PASSWORD, dsn: str = None):
+        self._user = user
+        self._password = password
+        self._dsn = dsn if dsn is not None else oracledb.makedsn(_HOST, _PORT, service_name=_SERVICE_NAME)
+        self._number_list_types = weakref.WeakKeyDictionary()
+
+    def connect(self):
+        connection = oracledb.connect(user=self._user, password=self._password, dsn=self._dsn)
+        connection.stmtcachesize = STATEMENT_CACHE_SIZE
+        return connection
+
+    def id_list_subquery(self, name: str) -> str:
+        return f"SELECT COLUMN_VALUE FROM TABLE(:{name})"
+
+    def id_list_value(self, connection, ids: Iterable[int]):
+        # Type of collection is looked up once per connection, it costs a round trip
+        if connection not in self._number_list_types:
+            self._number_list_types[connection] = connection.gettype("SYS.ODCINUMBERLIST")
+        return self._number_list_types[connection].newobject(list(ids))
+
+
+class SQLiteBackend(DatabaseBackend):
+    """
+    Local SQLite database file with the same tables as Oracle database
+    """
+
+    def __init__(self, database_file: str = DEFAULT_SQLITE_DATABASE_FILE):
+        self._database_file = database_file
+
+    @property
+    def database_file(self) -> str:
+        return self._database_file
+
+    def connect(self) -> "SQLiteConnection":
+        if self._database_file != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self._database_file)), exist_ok=True)
+        # Connection pool gives a connection to different threads over time, but never to two threads at once
+        connection = sqlite3.connect(self._database_file, check_same_thread=False, cached_statements=STATEMENT_CACHE_SIZE)
+        connection.execute("PRAGMA foreign_keys = ON")
+        register_missing_functions(connection)
+        return SQLiteConnection(connection)
+
+    def id_list_subquery(self, name: str) -> str:
+        return f"SELECT value FROM json_each(:{name})"
+
+    def id_list_value(self, connection, ids: Iterable[int]) -> str:
+        return json.dumps([int(id) for id in ids])
+
+
+class SQLiteConnection:
+    """
+    Connection to SQLite database, whose cursors accept SQL written for Oracle database by database builder
+    """
+
+    def __init__(self, connection: sqlite3.Connection):
+        self._connection = connection
+
+    def cursor(self) -> "SQLiteCursor":
+        return SQLiteCursor(self, self._connection.cursor())
+
+    def commit(self) -> None:
+        self._connection.commit()
+
+    def ping(self) -> None:
+        self._connection.execute("SELECT 1")
+
+    def rollback(self) -> None:
+        self._connection.rollback()
+
+    def close(self) -> None:
+        self._connection.close()
+
+
+class SQLiteCursor:
+    """
+    Cursor of SQLite database, which rewrites Oracle-only SQL by adapt_sql_to_sqlite() before executing it
+    """
+
+    def __init__(self, connection: SQLiteConnection, cursor: sqlite3.Cursor):
+        self.connection = connection
+        self._cursor = cursor
+
+    def execute(self, sql: str, parameters=()) -> "SQLiteCursor":
+        self._cursor.execute(adapt_sql_to_sqlite(sql), parameters)
+        return self
+
+    def executemany(self, sql: str, rows) -> "SQLiteCursor":
+        self._cursor.executemany(adapt_sql_to_sqlite(sql), rows)
+        return self
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def fetchmany(self, size: int = None):
+        return self._cursor.fetchmany(self._cursor.arraysize if size is None else size)
+
+    @property
+    def arraysize(self) -> int:
+        return self._cursor.arraysize
+
+    @arraysize.setter
+    def arraysize(self, size: int) -> None:
+        self._cursor.arraysize = size
+
+    def fetchall(self) -> List:
+        return self._cursor.fetchall()
+
+    def close(self) -> None:
+        self._cursor.close()
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    @property
+    def rowcount(self) -> int:
+        return self._cursor.rowcount
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+
+def adapt_sql_to_sqlite(sql: str) -> str:
+    """
+    Rewrites constructs of Oracle SQL used by database builder (DEFAULT identity values, to_date(), NVL(), DECODE(), ROWNUM,
+    get_variant_id_by_line_and_var_name() function and :1 binds) into SQLite SQL. Portable SQL is not changed.
+    :param sql: SQL statement written for Oracle database
+    :return: SQL statement for SQLite database
+    """
+    for pattern, replacement in _SQLITE_REWRITES:
+        sql = pattern.sub(replacement, sql)
+    return sql
+
+
+def register_missing_functions(connection: sqlite3.Connection) -> None:
+    """
+    Registers floor() function used by models, if SQLite was compiled without math functions
+    :param connection: SQLite connection
+    """
+    try:
+        connection.execute("SELECT floor(0.5)")
+    except sqlite3.OperationalError:
+        connection.create_function("floor", 1, lambda x: None if x is None else math.floor(x), deterministic=True)
+
+
+def create_sqlite_tables(cursor: SQLiteCursor) -> None:
+    """
+    Drops all tables of SQLite database and creates new, empty ones
+    :param cursor: cursor of SQLite database
+    """
+    for table in SQLITE_TABLES:
+        cursor.execute(f"DROP TABLE IF EXISTS {table}")
+    for statement in SQLITE_SCHEMA:
+        cursor.execute(statement)
+
+
+_default_backend: DatabaseBackend = None
+
+
+def get_default_backend() -> DatabaseBackend:
+    """
+    Backend set by set_default_backend() or, if none was set, chosen by DATABASE_BACKEND_VARIABLE environment variable
+    :return: backend used by Database objects created without a backend
+    """
+    global _default_backend
+    if _default_backend is None:
+        backend_name = os.environ.get(DATABASE_BACKEND_VARIABLE, "oracle").lower()
+        if backend_name == "sqlite":
+            _default_backend = SQLiteBackend(os.environ.get(SQLITE_DATABASE_FILE_VARIABLE, DEFAULT_SQLITE_DATABASE_FILE))
+        elif backend_name == "replay":
+            # database_recording module builds on this one
+            from src.core.database_recording import ReplayBackend
+            _default_backend = ReplayBackend(os.environ.get(DATABASE_RECORDING_FILE_VARIABLE, DEFAULT_DATABASE_RECORDING_FILE))
+        else:
+            _default_backend = OracleBackend()
+    return _default_backend
+
+
+def set_default_backend(backend: DatabaseBackend = None) -> None:
+    """
+    Sets backend used by Database objects created without a backend
+    :param backend: backend or None to choose it by environment variable again
+    """
+    global _default_backend
+    _default_backend = backend
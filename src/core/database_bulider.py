@@ -1,11 +1,20 @@
 import sys
 import os
+import logging
+import uuid
+from itertools import islice
+from typing import Iterable, Union
 
 sys.path.append(os.getcwd())
-import oracledb
 from src.core.database_file_parser import *
+from src.core.database_backends import OracleBackend, SQLiteBackend, SQLiteCursor, SQLITE_DATASET_VERSION_TABLE, create_sqlite_tables
+from src.core.constants import DEFAULT_PARSED_DATA_FOLDER
 from src.core.database_creator_errors import FileNotGivenError
+from src.core.parsed_data_cache import get_file_hash, load_parsed_data, save_parsed_data, load_database_state, save_database_state, remove_database_state
+from src.core.database_diff import DatabaseDiff, TableDiff, align_place_ids, get_database_diff
 
+# Number of rows passed to a single executemany() call when rows are streamed from data file
+INSERT_BATCH_SIZE = 10000
 
 
 def create_stop_complex_table(cursor) -> None:
@@ -583,7 +592,155 @@ def insert_day_line_data_into_table(cursor, day_line_data: DayLineParsedData) ->
     """
     cursor.executemany("INSERT INTO Day_Line VALUES(DEFAULT, to_date(:1, 'YYYY-MM-DD'), :2, :3)", day_line_data)
 
-def build_whole_database(cursor, database_file: str) -> None:
+def is_sqlite_cursor(cursor) -> bool:
+    """Check whether cursor is connected to SQLite database, also when it is instrumented by Database.
+
+    Args:
+        cursor : Cursor holding database connection.
+
+    Returns:
+        bool: True for SQLite cursor.
+    """
+    return isinstance(getattr(cursor, "wrapped_cursor", cursor), SQLiteCursor)
+
+def create_dataset_version_table(cursor) -> None:
+    """Create table Dataset_Version, which holds a single version stamp of data in database. The stamp is changed by every build or update of database,
+    so applications can tell whether reference data they cached locally is still current.
+    Unlike other tables, this table is kept if it already exists, because databases built before it existed are updated too.
+
+    Args:
+        cursor : Cursor holding database connection.
+    """
+    if is_sqlite_cursor(cursor):
+        cursor.execute(SQLITE_DATASET_VERSION_TABLE)
+        return
+
+    create_dataset_version = """BEGIN
+        EXECUTE IMMEDIATE 'CREATE TABLE Dataset_Version(
+        Version VARCHAR2(32) NOT NULL CONSTRAINT Dataset_Version_PK PRIMARY KEY
+        )';
+    EXCEPTION
+        WHEN OTHERS THEN
+            IF SQLCODE != -955 THEN
+                RAISE;
+            END IF;
+    END;"""
+
+    cursor.execute(create_dataset_version)
+
+def read_dataset_version(cursor) -> Union[str, None]:
+    """Read version stamp of data in database.
+
+    Args:
+        cursor : Cursor holding database connection.
+
+    Returns:
+        Union[str, None]: version stamp or None if database has no stamp (e.g. it was built before Dataset_Version table existed).
+    """
+    try:
+        cursor.execute("SELECT Version FROM Dataset_Version")
+        versions = cursor.fetchall()
+    except Exception as error:
+        logging.info(f"Database has no dataset version ({error})")
+        return None
+    return versions[0][0] if len(versions) == 1 else None
+
+def write_dataset_version(cursor) -> str:
+    """Replace version stamp of data in database with a new, unique one. It should be called in the same transaction which changes data.
+
+    Args:
+        cursor : Cursor holding database connection.
+
+    Returns:
+        str: new version stamp.
+    """
+    version = uuid.uuid4().hex
+    cursor.execute("DELETE FROM Dataset_Version")
+    cursor.execute("INSERT INTO Dataset_Version VALUES(:1)", [version])
+    return version
+
+def parse_database_file(database_file: str, workers: int = 1) -> ParsedDatabaseData:
+    """Generate data of all tables of database from WTP data file.
+
+    Args:
+        database_file (str): Address of WTP data file. File must be properly formatted: file must be divided into sections
+        and must have all required sections of data in it.
+        workers (int, optional): Number of processes which will parse lines section of data file. Defaults to 1.
+
+    Returns:
+        ParsedDatabaseData: Data which will be inserted into all tables of database.
+    """
+    section_index = load_section_index(database_file)
+
+    with map_data_file(database_file) as file_handle:
+
+        working_index = 0
+
+        day_type_data, working_index = get_raw_data_day_type(file_handle, working_index, section_index)
+        day_line_working_index = working_index
+
+        stop_complex_data, working_index = get_raw_data_stop_complex(file_handle, working_index, section_index)
+
+        stop_data, working_index = get_raw_data_stop(file_handle, working_index, section_index)
+
+        town_data, working_index = get_raw_data_town(file_handle, working_index, section_index)
+
+        variant_data, line_data, stop_variant_data, course_data, course_dict, stop_course_data, _ = get_raw_data_of_lines(file_handle, working_index, stop_data, section_index, workers)
+        line_data, line_type_data = parse_line_data(line_data)
+
+        lines_list = prepare_line_list(line_data)
+
+        day_line_data, _ = get_raw_data_day_line(file_handle, day_line_working_index, lines_list, section_index)
+
+        stop_data, variant_data, place_data = change_stop_and_variant_places(stop_data, variant_data)
+
+        stop_course_data = reduce_stop_course_data(stop_course_data, course_data, course_dict, lines_list)
+        log_stop_course_reduction_report(get_stop_course_reduction_report(course_data, lines_list))
+
+        stop_neighbour_data = get_stop_neighbours(stop_data)
+
+    return ParsedDatabaseData(
+        place_data=place_data,
+        town_data=town_data,
+        day_type_data=day_type_data,
+        stop_complex_data=stop_complex_data,
+        stop_data=stop_data,
+        line_type_data=line_type_data,
+        line_data=line_data,
+        variant_data=variant_data,
+        stop_neighbour_data=stop_neighbour_data,
+        stop_variant_data=stop_variant_data,
+        course_data=course_data,
+        stop_course_data=stop_course_data,
+        day_line_data=day_line_data
+    )
+
+def get_parsed_data(database_file: str, workers: int = 1, use_cache: bool = True, cache_folder: str = DEFAULT_PARSED_DATA_FOLDER) -> ParsedDatabaseData:
+    """Get data of all tables of database generated from WTP data file. If <use_cache> is True and this data file was already parsed by
+    the same version of parser, data is loaded from cache instead of parsing the file again. Newly parsed data is saved into cache.
+
+    Args:
+        database_file (str): Address of WTP data file.
+        workers (int, optional): Number of processes which will parse lines section of data file. Defaults to 1.
+        use_cache (bool, optional): whether cached data may be used and saved. Defaults to True.
+
+    Returns:
+        ParsedDatabaseData: Data which will be inserted into all tables of database.
+    """
+    if not use_cache:
+        return parse_database_file(database_file, workers)
+
+    file_hash = get_file_hash(database_file)
+    parsed_data = load_parsed_data(file_hash, cache_folder)
+    if parsed_data is not None:
+        logging.info("Using cached data, data file will not be parsed")
+        return parsed_data
+
+    parsed_data = parse_database_file(database_file, workers)
+    save_parsed_data(file_hash, parsed_data, cache_folder)
+    return parsed_data
+
+def build_whole_database(cursor, database_file: str, workers: int = 1, use_cache: bool = True, cache_folder: str = DEFAULT_PARSED_DATA_FOLDER) -> None:
     """Generate whole database, by removing old data and tables, creataing new tables, generating new data into database and then inserting new data into new database
     (in that order).
 
@@ -591,7 +748,121 @@ def build_whole_database(cursor, database_file: str) -> None:
         cursor : Cursor holding database connection.
         database_file (str): Address of WTP data file from which data will be used in database. File must be properly formatted: file must be divided into sections
         and must have all required sections of data in it.
+        workers (int, optional): Number of processes which will parse lines section of data file. Defaults to 1.
+        use_cache (bool, optional): whether data parsed from the same data file before may be used. Defaults to True.
+        cache_folder (str, optional): folder where parsed data and data of database are saved. Defaults to DEFAULT_PARSED_DATA_FOLDER.
+    """
+
+    old_dataset_version = read_dataset_version(cursor)
+    create_all_tables(cursor)
+
+    parsed_data = get_parsed_data(database_file, workers, use_cache, cache_folder)
+
+    insert_place_data_into_table(cursor, parsed_data.place_data)
+    insert_town_data_into_databse(cursor, parsed_data.town_data)
+    insert_day_type_data_into_databse(cursor, parsed_data.day_type_data)
+    insert_stop_complex_data_into_database(cursor, parsed_data.stop_complex_data)
+    insert_stop_data_into_database(cursor, parsed_data.stop_data)
+    insert_data_into_line_type_table(cursor, parsed_data.line_type_data)
+    insert_data_into_line_table(cursor, parsed_data.line_data)
+    insert_variant_data_into_table(cursor, parsed_data.variant_data)
+    insert_data_into_stop_neighbour(cursor, parsed_data.stop_neighbour_data)
+    insert_data_into_stop_variant(cursor, parsed_data.stop_variant_data)
+    insert_data_into_course_table(cursor, parsed_data.course_data)
+    insert_stop_course_data_into_table(cursor, parsed_data.stop_course_data)
+    insert_day_line_data_into_table(cursor, parsed_data.day_line_data)
+
+    dataset_version = write_dataset_version(cursor)
+    cursor.connection.commit()
+    save_database_state(dataset_version, parsed_data, cache_folder)
+    remove_database_state(old_dataset_version, cache_folder)
+
+def stream_whole_database(cursor, database_file: str, batch_size: int = INSERT_BATCH_SIZE) -> None:
+    """Generate whole database like build_whole_database() function does, but insert rows of Stop_Variant, Course and Stop_Course tables
+    in batches of <batch_size> rows while they are read from data file, so data of these tables is never held in memory as a whole.
+    Lines section is read more than once. Cache of parsed data is not used and data of database is not saved,
+    so the next update of database will build whole database, because there is no saved data for its new version stamp.
+
+    Args:
+        cursor : Cursor holding database connection.
+        database_file (str): Address of WTP data file from which data will be used in database.
+        batch_size (int, optional): Number of rows inserted by one executemany() call. Defaults to INSERT_BATCH_SIZE.
+    """
+    remove_database_state(read_dataset_version(cursor))
+    create_all_tables(cursor)
+
+    section_index = load_section_index(database_file)
+    with map_data_file(database_file) as file_handle:
+        day_type_data, working_index = get_raw_data_day_type(file_handle, 0, section_index)
+        day_line_working_index = working_index
+        stop_complex_data, working_index = get_raw_data_stop_complex(file_handle, working_index, section_index)
+        stop_data, working_index = get_raw_data_stop(file_handle, working_index, section_index)
+        town_data, lines_working_index = get_raw_data_town(file_handle, working_index, section_index)
+
+        variant_data, line_data, _ = get_raw_variant_and_line_data(file_handle, lines_working_index, section_index)
+        stops_list, special_variants_list = get_foreign_keys_for_stop_variant(stop_data, variant_data)
+        line_data, line_type_data = parse_line_data(line_data)
+        lines_list = prepare_line_list(line_data)
+        day_line_data, _ = get_raw_data_day_line(file_handle, day_line_working_index, lines_list, section_index)
+
+        normalized_stop_data, normalized_variant_data, place_data = change_stop_and_variant_places(stop_data, variant_data)
+
+        insert_place_data_into_table(cursor, place_data)
+        insert_town_data_into_databse(cursor, town_data)
+        insert_day_type_data_into_databse(cursor, day_type_data)
+        insert_stop_complex_data_into_database(cursor, stop_complex_data)
+        insert_stop_data_into_database(cursor, normalized_stop_data)
+        insert_data_into_line_type_table(cursor, line_type_data)
+        insert_data_into_line_table(cursor, line_data)
+        insert_variant_data_into_table(cursor, normalized_variant_data)
+        insert_data_into_stop_neighbour(cursor, get_stop_neighbours(normalized_stop_data))
+        insert_day_line_data_into_table(cursor, day_line_data)
+
+        insert_in_batches(cursor, insert_data_into_stop_variant,
+                          iter_stop_variant_rows(file_handle, stops_list, special_variants_list, lines_working_index, section_index), batch_size)
+
+        # Courses are needed to number and reduce rows of Stop_Course, so only rows of Stop_Course are streamed
+        course_data, _ = get_raw_data_course(file_handle, lines_working_index, section_index)
+        course_dict = get_dict_for_stop_course(course_data)
+        insert_in_batches(cursor, insert_data_into_course_table, course_data, batch_size)
+
+        courses_in_most_common_day_type = get_courses_in_most_common_day_type(course_data, course_dict, lines_list)
+        log_stop_course_reduction_report(get_stop_course_reduction_report(course_data, lines_list))
+        stop_course_rows = iter_stop_course_rows(file_handle, lines_working_index, course_dict, stop_data, section_index)
+        insert_in_batches(cursor, insert_stop_course_data_into_table, filter_stop_course_rows(stop_course_rows, courses_in_most_common_day_type), batch_size)
+
+    write_dataset_version(cursor)
+    cursor.connection.commit()
+
+def insert_in_batches(cursor, insert_function, rows: Iterable, batch_size: int = INSERT_BATCH_SIZE) -> int:
+    """Insert rows into table by <insert_function>, passing at most <batch_size> rows at once.
+
+    Args:
+        cursor : Cursor holding database connection.
+        insert_function : function which inserts a list of rows into table, like insert_stop_course_data_into_table().
+        rows (Iterable): rows of table, for example yielded by iter_stop_course_rows() function.
+        batch_size (int, optional): Number of rows inserted by one call of <insert_function>. Defaults to INSERT_BATCH_SIZE.
+
+    Returns:
+        int: number of inserted rows.
+    """
+    rows = iter(rows)
+    inserted_rows = 0
+    while batch := list(islice(rows, batch_size)):
+        insert_function(cursor, batch)
+        inserted_rows += len(batch)
+    return inserted_rows
+
+def create_all_tables(cursor) -> None:
+    """Drop all tables of database and create new, empty ones, together with functions used while inserting data.
+    SQLite database gets the same tables from create_sqlite_tables() function, because Oracle DDL is not portable.
+
+    Args:
+        cursor : Cursor holding database connection.
     """
+    if is_sqlite_cursor(cursor):
+        create_sqlite_tables(cursor)
+        return
 
     drop_constraints(cursor)
 
@@ -608,68 +879,143 @@ def build_whole_database(cursor, database_file: str) -> None:
     create_stop_neighbour_table(cursor)
     create_stop_variant_table(cursor)
     create_day_line_table(cursor)
+    create_dataset_version_table(cursor)
 
     create_get_variant_id_by_line_and_var_name_function(cursor)
 
-    with open(database_file, "r", encoding="cp1250") as file_handle:
-
-        working_index = 0
-
-        day_type_data, working_index = get_raw_data_day_type(file_handle, working_index)
-        day_line_working_index = working_index
-
-        stop_complex_data, working_index = get_raw_data_stop_complex(file_handle, working_index)
-
-        stop_data, working_index = get_raw_data_stop(file_handle, working_index)
-
-        town_data, working_index = get_raw_data_town(file_handle, working_index)
-
-        variant_data, line_data, _ = get_raw_variant_and_line_data(file_handle, working_index)
-        line_data, line_type_data = parse_line_data(line_data)
-
-        lines_list = prepare_line_list(line_data)
-
-        day_line_data, _ = get_raw_data_day_line(file_handle, day_line_working_index, lines_list)
-
-        stop_data, variant_data, place_data = change_stop_and_variant_places(stop_data, variant_data)
+def update_database(cursor, database_file: str, workers: int = 1, cache_folder: str = DEFAULT_PARSED_DATA_FOLDER) -> None:
+    """Update database to data from new WTP data file, by applying only differences between data of this file and data inserted by the last build
+    or update of this database. All changes are made in one transaction, so database is never empty or partially updated for its readers.
+    Data of the last build is found by version stamp of database, so data saved for another database is never used.
+    If data of this database is unknown (or was generated by another version of parser), whole database is built instead.
 
-        sv_stop_data, sv_variant_data = get_foreign_keys_for_stop_variant(stop_data, variant_data)
-        stop_variant_data, _ = get_raw_data_stop_variant(file_handle, sv_stop_data, sv_variant_data, working_index)
-
-        course_data, _ = get_raw_data_course(file_handle, working_index)
+    Args:
+        cursor : Cursor holding database connection.
+        database_file (str): Address of WTP data file from which data will be used in database.
+        workers (int, optional): Number of processes which will parse lines section of data file. Defaults to 1.
+        cache_folder (str, optional): folder where parsed data and data of database are saved. Defaults to DEFAULT_PARSED_DATA_FOLDER.
+    """
+    old_dataset_version = read_dataset_version(cursor)
+    old_data = load_database_state(old_dataset_version, cache_folder)
+    if old_data is None:
+        logging.warning("Data of this database is unknown, differences can not be applied, building whole database")
+        build_whole_database(cursor, database_file, workers, cache_folder=cache_folder)
+        return
+
+    new_data = align_place_ids(old_data, get_parsed_data(database_file, workers, cache_folder=cache_folder))
+    database_diff = get_database_diff(old_data, new_data)
+    if database_diff.is_empty():
+        logging.info("Data file does not change database")
+        return
+
+    logging.info(f"Updating database: {len(database_diff.changed_lines)} lines and {len(database_diff.changed_neighbour_stops)} stop neighbourhoods changed")
+    apply_database_diff(cursor, database_diff)
+    dataset_version = write_dataset_version(cursor)
+
+    cursor.connection.commit()
+    save_database_state(dataset_version, new_data, cache_folder)
+    remove_database_state(old_dataset_version, cache_folder)
+
+def apply_database_diff(cursor, database_diff: DatabaseDiff) -> None:
+    """Insert, update and delete rows of database according to <database_diff>. Rows are changed in order which keeps all foreign keys valid:
+    parent rows are inserted before and deleted after their child rows.
 
-        course_dict = get_dict_for_stop_course(course_data)
+    Args:
+        cursor : Cursor holding database connection.
+        database_diff (DatabaseDiff): Changes generated by get_database_diff() function.
+    """
+    insert_and_update_rows(cursor, "Town", ["TOWN_ID", "TOWN_NAME"], 1, database_diff.town, insert_town_data_into_databse)
+    insert_and_update_rows(cursor, "Place", ["Place_ID", "Place_Name"], 1, database_diff.place, insert_place_data_into_table)
+    insert_and_update_rows(cursor, "Day_Type", ["DAY_TYPE_ID", "DAY_TYPE_NAME"], 1, database_diff.day_type, insert_day_type_data_into_databse)
+    insert_and_update_rows(cursor, "Stop_Complex", ["STOP_COMPLEX_ID", "NAME", "TOWN_ID"], 1, database_diff.stop_complex, insert_stop_complex_data_into_database)
+    insert_and_update_rows(cursor, "Stop", ["STOP_ID", "STOP_NUMBER", "STOP_COMPLEX_ID", "LATITUDE", "LONGITUDE", "STREET", "DIRECTION"], 1,
+                           database_diff.stop, insert_stop_data_into_database)
+    insert_and_update_rows(cursor, "Line_Type", ["TYPE_ID", "TYPE_NAME"], 1, database_diff.line_type, insert_data_into_line_type_table)
+    insert_and_update_rows(cursor, "Line", ["LINE_ID", "LINE_TYPE_ID"], 1, database_diff.line, insert_data_into_line_table)
+    insert_and_update_rows(cursor, "Variant", ["Line_ID", "Variant_name", "Direction", "Dir_level", "Dir_description", "Is_basic"], 2,
+                           database_diff.variant, insert_variant_data_into_table)
+
+    changed_lines = [(line_id, ) for line_id in database_diff.changed_lines]
+    cursor.executemany("""DELETE FROM Stop_Course WHERE Course_ID IN
+    (SELECT Course_ID FROM Course WHERE Variant_ID IN (SELECT Variant_ID FROM Variant WHERE Line_ID = :1))""", changed_lines)
+    cursor.executemany("DELETE FROM Course WHERE Variant_ID IN (SELECT Variant_ID FROM Variant WHERE Line_ID = :1)", changed_lines)
+    cursor.executemany("DELETE FROM Stop_Variant WHERE Variant_ID IN (SELECT Variant_ID FROM Variant WHERE Line_ID = :1)", changed_lines)
+    cursor.executemany("""DELETE FROM Day_Line WHERE Day = to_date(:1, 'YYYY-MM-DD') AND Line_ID = :2
+    AND DECODE(Day_Type_ID, :3, 1, 0) = 1 AND ROWNUM = 1""", database_diff.day_line.deleted)
+    cursor.executemany("DELETE FROM Stop_Neighbour WHERE Stop_ID = :1", [(stop_id, ) for stop_id in database_diff.changed_neighbour_stops])
+    delete_rows(cursor, "Variant", ["Line_ID", "Variant_name"], database_diff.variant)
+
+    # Courses are inserted with explicit IDs, so that rows of Stop_Course can refer to them
+    cursor.execute("SELECT NVL(MAX(Course_ID), 0) FROM Course")
+    first_course_id, = cursor.fetchone()
+    course_data = [[first_course_id + index] + list(course) for index, course in enumerate(database_diff.course_data, 1)]
+    stop_course_data = [[first_course_id + stop_course[0]] + list(stop_course[1:]) for stop_course in database_diff.stop_course_data]
+
+    insert_data_into_stop_variant(cursor, database_diff.stop_variant_data)
+    cursor.executemany("""INSERT INTO Course VALUES(:1, get_variant_id_by_line_and_var_name(:2,:3),:4,:5)""", course_data)
+    insert_stop_course_data_into_table(cursor, stop_course_data)
+    insert_day_line_data_into_table(cursor, database_diff.day_line.inserted)
+    insert_data_into_stop_neighbour(cursor, database_diff.stop_neighbour_data)
 
-        stop_course_data, working_index = get_raw_data_stop_course(file_handle, working_index, course_dict, stop_data)
+    delete_rows(cursor, "Line", ["LINE_ID"], database_diff.line)
+    delete_rows(cursor, "Line_Type", ["TYPE_ID"], database_diff.line_type)
+    delete_rows(cursor, "Stop", ["STOP_ID"], database_diff.stop)
+    delete_rows(cursor, "Stop_Complex", ["STOP_COMPLEX_ID"], database_diff.stop_complex)
+    delete_rows(cursor, "Place", ["Place_ID"], database_diff.place)
+    delete_rows(cursor, "Day_Type", ["DAY_TYPE_ID"], database_diff.day_type)
+    delete_rows(cursor, "Town", ["TOWN_ID"], database_diff.town)
 
-        stop_course_data = reduce_stop_course_data(stop_course_data, course_data, course_dict, lines_list)
+def insert_and_update_rows(cursor, table_name: str, columns: List[str], key_count: int, table_diff: TableDiff, insert_function) -> None:
+    """Insert new rows into table and update its changed rows.
 
-        stop_neighbour_data = get_stop_neighbours(stop_data)
+    Args:
+        cursor : Cursor holding database connection.
+        table_name (str): name of table.
+        columns (List[str]): names of columns of table, in order of values in rows. Columns of key are the first <key_count> columns.
+        key_count (int): number of columns in key of table.
+        table_diff (TableDiff): changes of table, generated by get_database_diff() function.
+        insert_function : function which inserts rows into this table.
+    """
+    insert_function(cursor, table_diff.inserted)
 
-        file_handle.close()
-
-    insert_place_data_into_table(cursor, place_data)
-    insert_town_data_into_databse(cursor, town_data)
-    insert_day_type_data_into_databse(cursor, day_type_data)
-    insert_stop_complex_data_into_database(cursor, stop_complex_data)
-    insert_stop_data_into_database(cursor, stop_data)
-    insert_data_into_line_type_table(cursor, line_type_data)
-    insert_data_into_line_table(cursor, line_data)
-    insert_variant_data_into_table(cursor, variant_data)
-    insert_data_into_stop_neighbour(cursor, stop_neighbour_data)
-    insert_data_into_stop_variant(cursor, stop_variant_data)
-    insert_data_into_course_table(cursor, course_data)
-    insert_stop_course_data_into_table(cursor, stop_course_data)
-    insert_day_line_data_into_table(cursor, day_line_data)
+    if not table_diff.updated:
+        return
+    value_columns = columns[key_count:]
+    set_clause = ", ".join(f"{column} = :{index}" for index, column in enumerate(value_columns, 1))
+    where_clause = " AND ".join(f"{column} = :{index}" for index, column in enumerate(columns[:key_count], len(value_columns) + 1))
+    rows = [list(row[key_count:]) + list(row[:key_count]) for row in table_diff.updated]
+    cursor.executemany(f"UPDATE {table_name} SET {set_clause} WHERE {where_clause}", rows)
 
+def delete_rows(cursor, table_name: str, key_columns: List[str], table_diff: TableDiff) -> None:
+    """Delete rows which are no longer in table.
 
-    connection.commit()
+    Args:
+        cursor : Cursor holding database connection.
+        table_name (str): name of table.
+        key_columns (List[str]): names of columns which are the key of table.
+        table_diff (TableDiff): changes of table, generated by get_database_diff() function.
+    """
+    where_clause = " AND ".join(f"{column} = :{index}" for index, column in enumerate(key_columns, 1))
+    cursor.executemany(f"DELETE FROM {table_name} WHERE {where_clause}", table_diff.deleted)
 
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
+    # --sqlite[=<file>] builds local SQLite database (DEFAULT_SQLITE_DATABASE_FILE by default) instead of Oracle database
+    sqlite_arguments = [argument for argument in sys.argv[1:] if argument.startswith("--sqlite")]
+    arguments = [argument for argument in sys.argv[1:] if argument not in ("--diff", "--stream") and argument not in sqlite_arguments]
+    if len(arguments) not in (1, 2):
         raise FileNotGivenError()
-
-    dsn = oracledb.makedsn("ora4.ii.pw.edu.pl", 1521, service_name="pdb1.ii.pw.edu.pl")
-    connection = oracledb.connect(user='z14', password="dn7xv3", dsn=dsn)
+    workers = int(arguments[1]) if len(arguments) == 2 else 1
+
+    if sqlite_arguments:
+        _, _, sqlite_file = sqlite_arguments[0].partition("=")
+        backend = SQLiteBackend(sqlite_file) if sqlite_file else SQLiteBackend()
+    else:
+        backend = OracleBackend()
+    connection = backend.connect()
     cursor = connection.cursor()
-    build_whole_database(cursor, sys.argv[1])
\ No newline at end of file
+    if "--diff" in sys.argv:
+        update_database(cursor, arguments[0], workers)
+    elif "--stream" in sys.argv:
+        stream_whole_database(cursor, arguments[0])
+    else:
+        build_whole_database(cursor, arguments[0], workers)
\ No newline at end of file
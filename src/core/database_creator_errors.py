@@ -30,4 +30,10 @@ class StopIDOutOfRange(Exception):
     """An error which occurs in get_stop_neighbours() function, when you cannot approximate
     location of stop (using stop complexes with lower ID), due to lack of data."""
     def __init__(self) -> None:
-        super().__init__("Aprroximation of location to stop complex with lower ID failed - lack of data.")
\ No newline at end of file
+        super().__init__("Aprroximation of location to stop complex with lower ID failed - lack of data.")
+
+class StopLocationNotFoundError(Exception):
+    """An error which occurs when a course calls at stops whose location is not given in data file,
+    so chunks of its rows in Stop_Course table cannot be computed."""
+    def __init__(self, stop_ids) -> None:
+        super().__init__(f"Courses call at stops without location: {', '.join(str(stop_id) for stop_id in stop_ids)}")
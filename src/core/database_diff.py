@@ -0,0 +1,236 @@
+from dataclasses import dataclass, field
+from typing import List, Tuple, Dict, Any, Set
+from src.core.database_file_parser_types import *
+
+# Comparison of data parsed from two WTP data files, used to update database without rebuilding it.
+# Tables with natural keys are compared row by row. Stop_Variant, Course and Stop_Course are compared line by line:
+# all their rows of a line are replaced when anything in that line changes, because courses have no natural key.
+
+PLACE_ID_INDEX = 0
+PLACE_NAME_INDEX = 1
+STOP_PLACE_INDEXES = [5, 6]
+VARIANT_PLACE_INDEXES = [4]
+LINE_ID_INDEX = 0
+VARIANT_NAME_INDEX = 1
+STOP_COURSE_COURSE_INDEX = 0
+STOP_ID_INDEX = 0
+
+
+@dataclass
+class TableDiff:
+    """Rows which must be inserted, updated and deleted to change one table. Deleted rows are given by their keys."""
+    inserted: List[Any] = field(default_factory=list)
+    updated: List[Any] = field(default_factory=list)
+    deleted: List[Tuple] = field(default_factory=list)
+
+    def is_empty(self) -> bool:
+        return not (self.inserted or self.updated or self.deleted)
+
+
+@dataclass
+class DatabaseDiff:
+    """Changes which turn database built from old data into database built from new data."""
+    place: TableDiff
+    town: TableDiff
+    day_type: TableDiff
+    stop_complex: TableDiff
+    stop: TableDiff
+    line_type: TableDiff
+    line: TableDiff
+    variant: TableDiff
+    # Lines whose rows in Stop_Variant, Course and Stop_Course are replaced by rows below.
+    # Course indexes in <stop_course_data> refer to positions (counted from 1) in <course_data>.
+    changed_lines: List[str]
+    stop_variant_data: StopVaraintParsedData
+    course_data: CourseParsedData
+    stop_course_data: StopCourseParsedData
+    # Day_Line rows have no natural key, so whole rows are inserted and deleted
+    day_line: TableDiff
+    # Stops whose rows in Stop_Neighbour are replaced by <stop_neighbour_data>
+    changed_neighbour_stops: List[int]
+    stop_neighbour_data: StopNeighbourParsedData
+
+    def is_empty(self) -> bool:
+        return all(table_diff.is_empty() for table_diff in [self.place, self.town, self.day_type, self.stop_complex, self.stop,
+                                                            self.line_type, self.line, self.variant, self.day_line]) \
+            and not self.changed_lines and not self.changed_neighbour_stops
+
+
+def diff_table(old_rows: List[Any], new_rows: List[Any], key_indexes: List[int]) -> TableDiff:
+    """Compare two versions of a table with a natural key.
+
+    Args:
+        old_rows (List[Any]): rows of table in database.
+        new_rows (List[Any]): rows of table generated from new data file.
+        key_indexes (List[int]): indexes of columns which are the key of table.
+
+    Returns:
+        TableDiff: new rows whose keys are not in old rows, new rows which are different than old rows with the same key,
+        and keys of old rows which are not in new rows. Rows are in order of <new_rows> and <old_rows>.
+    """
+    def key_of(row: Any) -> Tuple:
+        return tuple(row[index] for index in key_indexes)
+
+    old_by_key = {key_of(row): list(row) for row in old_rows}
+    new_keys = set()
+    table_diff = TableDiff()
+    for row in new_rows:
+        key = key_of(row)
+        new_keys.add(key)
+        if key not in old_by_key:
+            table_diff.inserted.append(row)
+        elif old_by_key[key] != list(row):
+            table_diff.updated.append(row)
+    table_diff.deleted = [key for key in old_by_key if key not in new_keys]
+    return table_diff
+
+def diff_rows(old_rows: List[Any], new_rows: List[Any]) -> TableDiff:
+    """Compare two versions of a table without a natural key. Duplicated rows are compared by their count.
+
+    Args:
+        old_rows (List[Any]): rows of table in database.
+        new_rows (List[Any]): rows of table generated from new data file.
+
+    Returns:
+        TableDiff: rows to insert and whole rows to delete.
+    """
+    old_counts = {}
+    for row in old_rows:
+        old_counts[tuple(row)] = old_counts.get(tuple(row), 0) + 1
+    new_counts = {}
+    for row in new_rows:
+        new_counts[tuple(row)] = new_counts.get(tuple(row), 0) + 1
+
+    table_diff = TableDiff()
+    for row, count in new_counts.items():
+        table_diff.inserted += [list(row)] * max(count - old_counts.get(row, 0), 0)
+    for row, count in old_counts.items():
+        table_diff.deleted += [row] * max(count - new_counts.get(row, 0), 0)
+    return table_diff
+
+def align_place_ids(old_data: ParsedDatabaseData, new_data: ParsedDatabaseData) -> ParsedDatabaseData:
+    """Change IDs of places in new data, so that places which are also in old data keep their old IDs.
+    New places get IDs bigger than all old IDs. Without it, IDs of places (and so rows of Stop and Variant) could change
+    even if the places did not.
+
+    Args:
+        old_data (ParsedDatabaseData): data which is in database.
+        new_data (ParsedDatabaseData): data generated from new data file. It is changed in place.
+
+    Returns:
+        ParsedDatabaseData: <new_data> with changed IDs of places.
+    """
+    old_ids = {place[PLACE_NAME_INDEX]: place[PLACE_ID_INDEX] for place in old_data.place_data}
+    next_id = max(old_ids.values(), default=0) + 1
+
+    changed_ids = {}
+    for place in new_data.place_data:
+        name = place[PLACE_NAME_INDEX]
+        if name in old_ids:
+            changed_ids[place[PLACE_ID_INDEX]] = old_ids[name]
+        else:
+            changed_ids[place[PLACE_ID_INDEX]] = next_id
+            next_id += 1
+
+    new_data.place_data = sorted([(changed_ids[place_id], name) for place_id, name in new_data.place_data])
+    for rows, indexes in [(new_data.stop_data, STOP_PLACE_INDEXES), (new_data.variant_data, VARIANT_PLACE_INDEXES)]:
+        for row in rows:
+            for index in indexes:
+                if row[index]:
+                    row[index] = changed_ids[row[index]]
+    return new_data
+
+def group_line_tables(data: ParsedDatabaseData) -> Dict[str, Tuple[StopVaraintParsedData, CourseParsedData, StopCourseParsedData]]:
+    """Split rows of Stop_Variant, Course and Stop_Course tables by lines. Course indexes in Stop_Course rows are changed to
+    positions of courses among courses of their line (counted from 1), so rows of a line do not depend on other lines.
+
+    Args:
+        data (ParsedDatabaseData): data of database.
+
+    Returns:
+        Dict[str, Tuple[StopVaraintParsedData, CourseParsedData, StopCourseParsedData]]: rows of each table for each line.
+    """
+    line_tables = {}
+    def tables_of(line_id: str):
+        return line_tables.setdefault(line_id, ([], [], []))
+
+    for row in data.stop_variant_data:
+        tables_of(row[LINE_ID_INDEX])[0].append(list(row))
+
+    course_positions = []
+    for row in data.course_data:
+        line_courses = tables_of(row[LINE_ID_INDEX])[1]
+        line_courses.append(list(row))
+        course_positions.append((row[LINE_ID_INDEX], len(line_courses)))
+
+    for row in data.stop_course_data:
+        line_id, position = course_positions[row[STOP_COURSE_COURSE_INDEX] - 1]
+        tables_of(line_id)[2].append([position] + list(row[STOP_COURSE_COURSE_INDEX + 1:]))
+
+    return line_tables
+
+def group_neighbours(stop_neighbour_data: StopNeighbourParsedData) -> Dict[int, List[Tuple[int, int, float]]]:
+    """Split rows of Stop_Neighbour table by stops.
+
+    Args:
+        stop_neighbour_data (StopNeighbourParsedData): data generated by get_stop_neighbours() function.
+
+    Returns:
+        Dict[int, List[Tuple[int, int, float]]]: rows of each stop.
+    """
+    neighbours = {}
+    for row in stop_neighbour_data:
+        neighbours.setdefault(row[STOP_ID_INDEX], []).append(tuple(row))
+    return neighbours
+
+def get_database_diff(old_data: ParsedDatabaseData, new_data: ParsedDatabaseData) -> DatabaseDiff:
+    """Compare data which is in database with data generated from new data file. IDs of places of <new_data> should be aligned
+    with <old_data> by align_place_ids() function first.
+
+    Args:
+        old_data (ParsedDatabaseData): data which is in database.
+        new_data (ParsedDatabaseData): data generated from new data file.
+
+    Returns:
+        DatabaseDiff: changes which turn database with <old_data> into database with <new_data>.
+    """
+    old_lines = group_line_tables(old_data)
+    new_lines = group_line_tables(new_data)
+    changed_lines = [line_id for line_id in new_lines if old_lines.get(line_id) != new_lines[line_id]]
+    changed_lines += [line_id for line_id in old_lines if line_id not in new_lines]
+
+    stop_variant_data = []
+    course_data = []
+    stop_course_data = []
+    for line_id in changed_lines:
+        if line_id not in new_lines:
+            continue
+        line_stop_variants, line_courses, line_stop_courses = new_lines[line_id]
+        stop_variant_data += line_stop_variants
+        for row in line_stop_courses:
+            stop_course_data.append([row[STOP_COURSE_COURSE_INDEX] + len(course_data)] + row[STOP_COURSE_COURSE_INDEX + 1:])
+        course_data += line_courses
+
+    old_neighbours = group_neighbours(old_data.stop_neighbour_data)
+    new_neighbours = group_neighbours(new_data.stop_neighbour_data)
+    changed_neighbour_stops = [stop_id for stop_id in new_neighbours if old_neighbours.get(stop_id) != new_neighbours[stop_id]]
+    changed_neighbour_stops += [stop_id for stop_id in old_neighbours if stop_id not in new_neighbours]
+    stop_neighbour_data = [row for stop_id in changed_neighbour_stops for row in new_neighbours.get(stop_id, [])]
+
+    return DatabaseDiff(
+        place=diff_table(old_data.place_data, new_data.place_data, [0]),
+        town=diff_table(old_data.town_data, new_data.town_data, [0]),
+        day_type=diff_table(old_data.day_type_data, new_data.day_type_data, [0]),
+        stop_complex=diff_table(old_data.stop_complex_data, new_data.stop_complex_data, [0]),
+        stop=diff_table(old_data.stop_data, new_data.stop_data, [0]),
+        line_type=diff_table(old_data.line_type_data, new_data.line_type_data, [0]),
+        line=diff_table(old_data.line_data, new_data.line_data, [0]),
+        variant=diff_table(old_data.variant_data, new_data.variant_data, [LINE_ID_INDEX, VARIANT_NAME_INDEX]),
+        changed_lines=changed_lines,
+        stop_variant_data=stop_variant_data,
+        course_data=course_data,
+        stop_course_data=stop_course_data,
+        day_line=diff_rows(old_data.day_line_data, new_data.day_line_data),
+        changed_neighbour_stops=changed_neighbour_stops,
+        stop_neighbour_data=stop_neighbour_data
+    )
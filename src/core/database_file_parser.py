@@ -1,6 +1,14 @@
 import statistics
 import os
+import bisect
+import mmap
+import pickle
+import logging
+import numpy as np
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from src.lib.geodesic import ground_distance
+from src.lib.spatial_grid import GeoGrid
 from src.models.nav_data_model import NavDataModel
 from src.core.database_file_parser_types import *
 from src.core.database_creator_errors import *
@@ -27,6 +35,29 @@ from src.core.database_creator_errors import *
 #   WK - Shows each departure time of each course and variant on each avalible day type on each stop of this line.
 #
 # (* menas that this section is not used in app's database)
+#
+# Positions of all sections (also nested ones) can be found once with build_section_index(). Functions which read data from file handle
+# accept this index and then seek directly to their section instead of scanning file line by line.
+#
+# Functions which read data from file handle also accept a memory map of the file, created by map_data_file(). Then sections are found
+# on bytes and only sections used in database are decoded: RP subsections (with TD, WG, OD and OP) of line blocks are skipped without decoding.
+
+SECTION_INDEX_EXTENSION = ".idx"
+SECTION_INDEX_VERSION = 1
+# Must be changed whenever data generated by this parser changes, so that data cached by parsed_data_cache is not used any more
+PARSER_VERSION = 4
+# Layout of a single WK row, used to read stop-course rows as a structured array. Offsets are counted in characters
+WK_ROW_LENGTH = 43
+WK_CHAR_SIZE = np.dtype("U1").itemsize
+WK_ROW_DTYPE = np.dtype({
+    "names": ["course_id", "stop_id", "time"],
+    "formats": ["U17", ("u4", 6), ("u4", 6)],
+    "offsets": [9 * WK_CHAR_SIZE, 28 * WK_CHAR_SIZE, 37 * WK_CHAR_SIZE],
+    "itemsize": WK_ROW_LENGTH * WK_CHAR_SIZE,
+})
+# How many line blocks can wait for a single worker process when LL section is parsed in parallel
+LINE_BLOCKS_IN_FLIGHT_PER_WORKER = 4
+DATA_FILE_ENCODING = "cp1250"
 
 def get_raw_lines_of_text(section_name: str, text_lines : List[str], start_symbol="*", end_symbol="#", start_index=0) -> Union[Tuple[List[str], int], None]:
     """
@@ -45,20 +76,44 @@ def get_raw_lines_of_text(section_name: str, text_lines : List[str], start_symbo
     """
     if start_index >= len(text_lines):
         raise WorkingIndexOutOfRange(get_raw_lines_of_text.__name__)
+    for section_start, section_end in iter_subsections(section_name, text_lines, start_symbol, end_symbol, start_index):
+        return text_lines[section_start:section_end], section_end
+
+def iter_subsections(section_name: str, text_lines: List[str], start_symbol="*", end_symbol="#", start_index=0) -> Iterator[Tuple[int, int]]:
+    """
+    Walk through the list of strings <text_lines> once and yield index ranges of all sections <section_name> in it.
+    <text_lines> is never sliced or copied, so finding all subsections of a section takes time linear in its length.
+
+    Args:
+        section_name (str): ID of sections which will be found
+        text_lines (List[str]): list of string on which function will be searching for sections
+        start_symbol (str, optional): symbol which is defined as a starting symbol of section. Defaults to "*".
+        end_symbol (str, optional): symbol which is defined as a ending symbol of section. Defaults to "#".
+        start_index (int, optional): Index from which the function will start searching for sections. Defaults to 0.
+
+    Raises:
+        SectionNotFoundError: when a section is started, but never ended.
+
+    Yields:
+        Iterator[Tuple[int, int]]: tuples (index of first line within section, index of line where this section ends).
+        Lines of the section are text_lines[start:end].
+    """
     start_string = start_symbol + section_name
     end_string = end_symbol + section_name
-    data = []
-    for index, line in enumerate(text_lines[start_index:]):
-        if start_string in line:
-            index += start_index + 1
-            while True:
-                line = text_lines[index]
-                if end_string in line:
-                    return data, index
-                data.append(line)
+    text_len = len(text_lines)
+    index = start_index
+    while index < text_len:
+        if start_string in text_lines[index]:
+            section_start = index + 1
+            index = section_start
+            while index < text_len and end_string not in text_lines[index]:
                 index += 1
+            if index == text_len:
+                raise SectionNotFoundError(end_string)
+            yield section_start, index
+        index += 1
 
-def get_raw_lines_of_handle(section_name: str, handle: IO, start_index: int, start_symbol="*", end_symbol="#") -> Union[Tuple[List[str], int], None]:
+def get_raw_lines_of_handle(section_name: str, handle: IO, start_index: int, start_symbol="*", end_symbol="#", section_index: SectionIndex = None) -> Union[Tuple[List[str], int], None]:
     """
     From the file handle <handle> find line which contains symbol <start_symbol><section_name>, then find line wich contains
     sybmol <end_symbol><section_name> and return all linees which are between these two lines (without them).
@@ -69,15 +124,23 @@ def get_raw_lines_of_handle(section_name: str, handle: IO, start_index: int, sta
         start_index (int): Index from which the function will start searching for given section.
         start_symbol (str, optional): symbol which is defined as a starting symbol of section. Defaults to "*".
         end_symbol (str, optional): symbol which is defined as a ending symbol of section. Defaults to "#".
+        section_index (SectionIndex, optional): index of sections of file, generated by build_section_index() function. If given,
+        function will seek directly to the section. Defaults to None.
 
     Returns:
         Union[Tuple[List[str], int], None]: lines within this section and index of line in <handle> where this section ends. Function will return None if it could not find a section
     """
+    if isinstance(handle, mmap.mmap):
+        return get_raw_lines_of_map(section_name, handle, start_index, start_symbol, end_symbol, section_index)
     start_string = start_symbol + section_name
     end_string = end_symbol + section_name
     data = []
     if start_index > os.stat(handle.name).st_size:
         raise WorkingIndexOutOfRange(get_raw_lines_of_handle.__name__)
+    if section_index is not None:
+        start_index = get_section_start(section_index, section_name, start_index)
+        if start_index is None:
+            return None
     handle.seek(start_index)
     while True:
         line = handle.readline()
@@ -90,19 +153,342 @@ def get_raw_lines_of_handle(section_name: str, handle: IO, start_index: int, sta
                     return data, handle.tell()
                 data.append(line)
 
-def get_raw_data_stop_complex(handle: IO, start_index: int) -> Tuple[StopComplexParsedData, int]:
+def map_data_file(file_path: str) -> mmap.mmap:
+    """Map data file into memory, so it can be read by parser functions instead of a file handle. File is read by the operating system
+    only when its parts are used, and only sections used in database are decoded. The map should be closed after use.
+
+    Args:
+        file_path (str): address of WTP data file
+
+    Returns:
+        mmap.mmap: read-only memory map of the whole file.
+    """
+    with open(file_path, "rb") as stream:
+        return mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+
+def decode_lines(raw_bytes: bytes) -> RawText:
+    """Decode part of data file into lines, the same as they are read from a file opened in text mode: each line ends with '\\n'.
+
+    Args:
+        raw_bytes (bytes): whole lines of data file.
+
+    Returns:
+        RawText: decoded lines.
+    """
+    text = raw_bytes.decode(DATA_FILE_ENCODING)
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    lines = text.split("\n")
+    last_line = lines.pop()
+    lines = [line + "\n" for line in lines]
+    if last_line:
+        lines.append(last_line)
+    return lines
+
+def get_line_start(data: mmap.mmap, index: int) -> int:
+    """Get index where the line with byte at <index> begins."""
+    return data.rfind(b"\n", 0, index) + 1
+
+def get_line_end(data: mmap.mmap, index: int, end_index: int = None) -> int:
+    """Get index right after the line with byte at <index> (after its new line character)."""
+    end_index = len(data) if end_index is None else end_index
+    line_end = data.find(b"\n", index, end_index)
+    return end_index if line_end == -1 else line_end + 1
+
+def get_section_bounds_of_map(section_name: str, data: mmap.mmap, start_index: int, start_symbol="*", end_symbol="#", section_index: SectionIndex = None) -> Union[Tuple[int, int, int], None]:
+    """Find section <section_name> in memory map of data file, like get_raw_lines_of_handle() does in file handle.
+
+    Args:
+        section_name (str): ID of section which will be found
+        data (mmap.mmap): memory map of data file, created by map_data_file() function.
+        start_index (int): Index from which the function will start searching for given section.
+        start_symbol (str, optional): symbol which is defined as a starting symbol of section. Defaults to "*".
+        end_symbol (str, optional): symbol which is defined as a ending symbol of section. Defaults to "#".
+        section_index (SectionIndex, optional): index of sections of file, generated by build_section_index() function. Defaults to None.
+
+    Raises:
+        WorkingIndexOutOfRange: when <start_index> is after the end of file.
+        SectionNotFoundError: when section has no end.
+
+    Returns:
+        Union[Tuple[int, int, int], None]: index of the first line of section content, index of line with end symbol and index right after
+        this line. None if there is no such section.
+    """
+    start_string = (start_symbol + section_name).encode("ascii")
+    end_string = (end_symbol + section_name).encode("ascii")
+    if start_index > len(data):
+        raise WorkingIndexOutOfRange(get_section_bounds_of_map.__name__)
+    if section_index is not None:
+        start_index = get_section_start(section_index, section_name, start_index)
+        if start_index is None:
+            return None
+
+    start_marker = data.find(start_string, start_index)
+    if start_marker == -1:
+        return None
+    content_start = get_line_end(data, start_marker)
+    end_marker = data.find(end_string, content_start)
+    if end_marker == -1:
+        raise SectionNotFoundError(end_string.decode("ascii"))
+    content_end = get_line_start(data, end_marker)
+    return content_start, content_end, get_line_end(data, end_marker)
+
+def get_raw_lines_of_map(section_name: str, data: mmap.mmap, start_index: int, start_symbol="*", end_symbol="#", section_index: SectionIndex = None) -> Union[Tuple[List[str], int], None]:
+    """Version of get_raw_lines_of_handle() function for memory map of data file. Only lines of found section are decoded.
+    Position of <data> is set right after the end of section, like position of file handle.
+
+    Args:
+        section_name (str): ID of section which will be found
+        data (mmap.mmap): memory map of data file, created by map_data_file() function.
+        start_index (int): Index from which the function will start searching for given section.
+        start_symbol (str, optional): symbol which is defined as a starting symbol of section. Defaults to "*".
+        end_symbol (str, optional): symbol which is defined as a ending symbol of section. Defaults to "#".
+        section_index (SectionIndex, optional): index of sections of file, generated by build_section_index() function. Defaults to None.
+
+    Returns:
+        Union[Tuple[List[str], int], None]: lines within this section and index where this section ends. None if there is no such section.
+    """
+    section_bounds = get_section_bounds_of_map(section_name, data, start_index, start_symbol, end_symbol, section_index)
+    if section_bounds is None:
+        return None
+    content_start, content_end, section_end = section_bounds
+    data.seek(section_end)
+    return decode_lines(data[content_start:content_end]), section_end
+
+def iter_line_blocks_of_map(data: mmap.mmap, start_index: int, section_index: SectionIndex = None) -> Iterator[RawText]:
+    """Version of iter_line_blocks() function for memory map of data file. Yielded blocks hold only lines which are used by split_line_block():
+    'Linia:' line, line which describes each variant followed by its LW subsection, and WK subsections. Other lines are not decoded.
+    After the generator is exhausted, position of <data> is set right after the end of the LL section.
+
+    Args:
+        data (mmap.mmap): memory map of data file, created by map_data_file() function.
+        start_index (int): Index from which the function will start searching for the LL section.
+        section_index (SectionIndex, optional): index of sections of file, generated by build_section_index() function. Defaults to None.
+
+    Raises:
+        SectionNotFoundError: when there is no LL section after <start_index>.
+
+    Yields:
+        Iterator[RawText]: used lines of a single line block, starting with its 'Linia:' line.
+    """
+    LINE_HEADER = b"Linia:"
+    section_bounds = get_section_bounds_of_map("LL", data, start_index, section_index=section_index)
+    if section_bounds is None:
+        raise SectionNotFoundError("LL")
+    content_start, content_end, section_end = section_bounds
+
+    block_starts = []
+    header = data.find(LINE_HEADER, content_start, content_end)
+    while header != -1:
+        line_start = get_line_start(data, header)
+        if not data[line_start:header].strip():
+            block_starts.append(line_start)
+        header = data.find(LINE_HEADER, header + len(LINE_HEADER), content_end)
+
+    for block_start, block_end in zip(block_starts, block_starts[1:] + [content_end]):
+        yield get_used_lines_of_block(data, block_start, block_end)
+    data.seek(section_end)
+
+def get_used_lines_of_block(data: mmap.mmap, block_start: int, block_end: int) -> RawText:
+    """Decode lines of a line block which are used by split_line_block() function.
+
+    Args:
+        data (mmap.mmap): memory map of data file, created by map_data_file() function.
+        block_start (int): index where 'Linia:' line of the block begins.
+        block_end (int): index where the block ends.
+
+    Raises:
+        SectionNotFoundError: when LW or WK subsection in this block is not closed.
+
+    Returns:
+        RawText: 'Linia:' line, lines which describe variants together with their LW subsections and WK subsections, in order of file.
+    """
+    used_parts = [(block_start, get_line_end(data, block_start, block_end))]
+    for section_name in ["LW", "WK"]:
+        start_string = ("*" + section_name).encode("ascii")
+        end_string = ("#" + section_name).encode("ascii")
+        start_marker = data.find(start_string, block_start, block_end)
+        while start_marker != -1:
+            part_start = get_line_start(data, start_marker)
+            if section_name == "LW":
+                # Line which describes the variant is right before LW subsection
+                part_start = get_line_start(data, part_start - 1)
+            end_marker = data.find(end_string, start_marker, block_end)
+            if end_marker == -1:
+                raise SectionNotFoundError(end_string.decode("ascii"))
+            part_end = get_line_end(data, end_marker, block_end)
+            used_parts.append((part_start, part_end))
+            start_marker = data.find(start_string, part_end, block_end)
+
+    return [line for part_start, part_end in sorted(used_parts) for line in decode_lines(data[part_start:part_end])]
+
+def build_section_index(file_path: str) -> SectionIndex:
+    """Read the whole data file once and find positions of all sections in it (nested sections like PR, LW or WK included).
+
+    Args:
+        file_path (str): address of WTP data file
+
+    Returns:
+        SectionIndex: dict, where keys are IDs of sections and values are lists of tuples: (index where line with start symbol of section begins,
+        index right after line with end symbol of section). Tuples are sorted by their position in file.
+    """
+    START_SYMBOL = b"*"
+    END_SYMBOL = b"#"
+    section_index = {}
+    open_sections = {}
+    position = 0
+    with open(file_path, "rb") as handle:
+        for line in handle:
+            marker = line.lstrip()[:3]
+            symbol, section_name = marker[:1], marker[1:]
+            if len(section_name) == 2 and section_name.isalpha() and section_name.isupper():
+                section_name = section_name.decode("ascii")
+                if symbol == START_SYMBOL:
+                    open_sections[section_name] = position
+                elif symbol == END_SYMBOL and section_name in open_sections:
+                    section_index.setdefault(section_name, []).append((open_sections.pop(section_name), position + len(line)))
+            position += len(line)
+    return section_index
+
+def load_section_index(file_path: str) -> SectionIndex:
+    """Load index of sections of data file, which is saved next to this file. If there is no saved index or the data file has changed since
+    the index was saved, a new index is built by build_section_index() function and saved.
+
+    Args:
+        file_path (str): address of WTP data file
+
+    Returns:
+        SectionIndex: index of sections of data file.
+    """
+    index_path = file_path + SECTION_INDEX_EXTENSION
+    file_stat = os.stat(file_path)
+    stamp = (SECTION_INDEX_VERSION, file_stat.st_size, file_stat.st_mtime_ns)
+
+    try:
+        with open(index_path, "rb") as stream:
+            saved_stamp, section_index = pickle.load(stream)
+        if saved_stamp == stamp:
+            return section_index
+        logging.info("Data file has changed, rebuilding section index")
+    except FileNotFoundError:
+        logging.info("Section index missing, building a new one")
+    except (pickle.UnpicklingError, EOFError, ValueError):
+        logging.warning("Section index is corrupted, building a new one")
+
+    section_index = build_section_index(file_path)
+    try:
+        with open(index_path, "wb") as stream:
+            pickle.dump((stamp, section_index), stream)
+    except PermissionError:
+        logging.warning("No permission to save section index!")
+    return section_index
+
+def get_section_start(section_index: SectionIndex, section_name: str, start_index: int) -> Union[int, None]:
+    """From index of sections find where the first section <section_name> which begins at or after <start_index> starts.
+
+    Args:
+        section_index (SectionIndex): index of sections of file, generated by build_section_index() function
+        section_name (str): ID of section
+        start_index (int): index from which the section is searched for.
+
+    Returns:
+        Union[int, None]: index where this section starts or None if there is no such section.
+    """
+    section_positions = section_index.get(section_name, [])
+    found = bisect.bisect_left(section_positions, (start_index, ))
+    if found == len(section_positions):
+        return None
+    return section_positions[found][0]
+
+def iter_line_blocks(handle: IO, start_index: int, section_index: SectionIndex = None) -> Iterator[RawText]:
+    """From the file handle <handle> find the LL section and yield it one line block at a time. Each block starts with
+    the 'Linia:' line of its line and holds all lines up to the next 'Linia:' line (or to the end of the LL section).
+    Only one block is kept in memory at once, so the whole LL section is read from the file exactly once.
+    After the generator is exhausted, <handle> is positioned right after the end of the LL section.
+
+    Args:
+        handle (IO): file handle on which function will be searching for the LL section
+        start_index (int): Index from which the function will start searching for the LL section.
+        section_index (SectionIndex, optional): index of sections of file, generated by build_section_index() function. If given,
+        function will seek directly to the LL section. Defaults to None.
+
+    Raises:
+        SectionNotFoundError: when there is no LL section after <start_index>.
+
+    Yields:
+        Iterator[RawText]: lines of a single line block, starting with its 'Linia:' line.
+    """
+    if isinstance(handle, mmap.mmap):
+        yield from iter_line_blocks_of_map(handle, start_index, section_index)
+        return
+    LINE_HEADER = "Linia:"
+    start_string = "*LL"
+    end_string = "#LL"
+    if start_index > os.stat(handle.name).st_size:
+        raise WorkingIndexOutOfRange(iter_line_blocks.__name__)
+    if section_index is not None:
+        start_index = get_section_start(section_index, "LL", start_index)
+        if start_index is None:
+            raise SectionNotFoundError("LL")
+    handle.seek(start_index)
+    while True:
+        line = handle.readline()
+        if not line:
+            raise SectionNotFoundError("LL")
+        if start_string in line:
+            break
+
+    line_block = []
+    while True:
+        line = handle.readline()
+        if not line or end_string in line:
+            break
+        if line.lstrip().startswith(LINE_HEADER):
+            if line_block:
+                yield line_block
+            line_block = [line]
+        elif line_block:
+            line_block.append(line)
+    if line_block:
+        yield line_block
+
+def split_line_block(line_block: RawText) -> LineBlockSections:
+    """Split a single line block generated by iter_line_blocks() into its subsections.
+
+    Args:
+        line_block (RawText): lines of a single line block, starting with its 'Linia:' line
+
+    Raises:
+        SectionNotFoundError: when LW or WK subsection in this block is not closed.
+
+    Returns:
+        LineBlockSections: 'Linia:' line of this block, list of variants of this line (each one is a tuple of a line which describes this variant
+        and lines of its LW subsection) and all lines of WK subsections of this block.
+    """
+    VARIANT_DATA_ROW_OFFSET = 2
+    variants = []
+    course_lines = []
+    for section_start, section_end in iter_subsections("LW", line_block):
+        variants.append((line_block[section_start - VARIANT_DATA_ROW_OFFSET], line_block[section_start:section_end]))
+    for section_start, section_end in iter_subsections("WK", line_block):
+        course_lines += line_block[section_start:section_end]
+    return line_block[0], variants, course_lines
+
+def get_raw_data_stop_complex(handle: IO, start_index: int, section_index: SectionIndex = None) -> Tuple[StopComplexParsedData, int]:
     """ Get data from data file <handle> which will be inserted into Stop_Complex table in database.
 
     Args:
         handle (IO): data file hanlde
         start_index (int): index from which this function will start looking for appropriate section. This param does not have to be exaclty where
         the section begins, but must be smaller or equal tha index of section.
+        section_index (SectionIndex, optional): index of sections of file, generated by build_section_index() function. If given,
+        function will seek directly to appropriate section. Defaults to None.
 
     Returns:
         Tuple[StopComplexParsedData, int]: Data for Stop_Complex table, which is a list of lists: [complex_ID, complex_name, id_of_town]. Function also returns index where the section of data ends.
     """
 
-    raw_data = get_raw_lines_of_handle("ZA", handle, start_index)
+    raw_data = get_raw_lines_of_handle("ZA", handle, start_index, section_index=section_index)
     if not raw_data:
         raise SectionNotFoundError("ZA")
     raw_stops, end_index = raw_data
@@ -129,25 +515,25 @@ def get_raw_data_stop_complex(handle: IO, start_index: int) -> Tuple[StopComplex
 
     return parsed_raw_stops, end_index
 
-def get_raw_data_stop(handle: IO, start_index: int) -> Tuple[StopParsedData, int]:
+def get_raw_data_stop(handle: IO, start_index: int, section_index: SectionIndex = None) -> Tuple[StopParsedData, int]:
     """Get data from data file <handle> which will be inserted into Stop_Complex table in database.
 
     Args:
         handle (IO): data file hanlde
         start_index (int): index from which this function will start looking for appropriate section. This param does not have to be exaclty where
         the section begins, but must be smaller or equal tha index of section.
+        section_index (SectionIndex, optional): index of sections of file, generated by build_section_index() function. If given,
+        function will seek directly to appropriate section. Defaults to None.
 
     Returns:
         Tuple[StopParsedData, int]: Data for Stop table, which is a list of lists: [stop_ID, stop_ID_within_complex, stop_complex_ID, latitude, longitude, name_of_street, name_of_direction].
         Function also returns index where the section of data ends.
     """
-    raw_data = get_raw_lines_of_handle("ZP", handle, start_index)
+    raw_data = get_raw_lines_of_handle("ZP", handle, start_index, section_index=section_index)
     if not raw_data:
         raise SectionNotFoundError("ZP")
 
     raw_detailed_stops_lines, end_index = raw_data
-    current_index = 0
-    all_stop_raw_data = []
     all_stop_data = []
     parsed_all_stop_data = []
 
@@ -166,27 +552,16 @@ def get_raw_data_stop(handle: IO, start_index: int) -> Tuple[StopParsedData, int
     DIRECTION_START = 74
     DIRECTION_END = 109
 
-    while True:
-        data = get_raw_lines_of_text("PR", raw_detailed_stops_lines, start_index=current_index)
-        if not data:
-            break
-        stop_data, current_index = data
-        all_stop_raw_data.append(stop_data)
-
-    for stop_complex in all_stop_raw_data:
-        single_stop_data = []
-        for index, text_line in enumerate(stop_complex):
-            data_len = len(stop_complex)
+    for complex_start, complex_end in iter_subsections("PR", raw_detailed_stops_lines):
+        for index in range(complex_start, complex_end):
+            text_line = raw_detailed_stops_lines[index]
             if text_line[STOP_ID_START:STOP_ID_END].isnumeric():
-                single_stop_data.append(text_line)
+                single_stop_data = [text_line]
                 temp_index = index + 1
-                while not stop_complex[temp_index][STOP_ID_START:STOP_ID_END].isnumeric():
-                    single_stop_data.append(stop_complex[temp_index])
+                while temp_index < complex_end and not raw_detailed_stops_lines[temp_index][STOP_ID_START:STOP_ID_END].isnumeric():
+                    single_stop_data.append(raw_detailed_stops_lines[temp_index])
                     temp_index += 1
-                    if temp_index == data_len:
-                        break
                 parsed_all_stop_data.append(single_stop_data)
-                single_stop_data = []
 
 
     for stop_data in parsed_all_stop_data:
@@ -223,13 +598,15 @@ def get_raw_data_stop(handle: IO, start_index: int) -> Tuple[StopParsedData, int
 
     return all_stop_data, end_index
 
-def get_raw_variant_and_line_data(handle: IO, start_index: int) -> Tuple[VaraintParsedData, LineParsedData, int]:
+def get_raw_variant_and_line_data(handle: IO, start_index: int, section_index: SectionIndex = None) -> Tuple[VaraintParsedData, LineParsedData, int]:
     """Get data from data file <handle> which will be inserted into Varaint and Line tables in database.
 
     Args:
         handle (IO): data file hanlde
         start_index (int): index from which this function will start looking for appropriate section. This param does not have to be exaclty where
         the section begins, but must be smaller or equal tha index of section.
+        section_index (SectionIndex, optional): index of sections of file, generated by build_section_index() function. If given,
+        function will seek directly to appropriate section. Defaults to None.
 
     Returns:
         Tuple[VaraintParsedData, LineParsedData, int]: Data for Variant table, which is a list of lists: [line_of_variant,
@@ -238,22 +615,31 @@ def get_raw_variant_and_line_data(handle: IO, start_index: int) -> Tuple[Varaint
         Function also returns index where the section of data ends.
     """
     basic_variants = []
-    all_variants = []
-    all_lines = []
     additional_variants = []
+    all_lines = []
 
-    raw_data = get_raw_lines_of_handle("LL", handle, start_index)
-    if not raw_data:
-        raise SectionNotFoundError("LL")
-    data, end_index = raw_data
+    for line_block in iter_line_blocks(handle, start_index, section_index):
+        block_basic_variants, block_additional_variants, block_lines = get_variant_and_line_data_of_block(split_line_block(line_block))
+        basic_variants += block_basic_variants
+        additional_variants += block_additional_variants
+        all_lines += block_lines
 
-    index = 0
-    current_line = ""
+    return basic_variants+additional_variants, all_lines, handle.tell()
 
+def get_variant_and_line_data_of_block(sections: LineBlockSections) -> Tuple[VaraintParsedData, VaraintParsedData, LineParsedData]:
+    """Get data about variants and line described in a single line block.
+
+    Args:
+        sections (LineBlockSections): subsections of a line block, generated by split_line_block() function.
+
+    Returns:
+        Tuple[VaraintParsedData, VaraintParsedData, LineParsedData]: basic variants of this line, special (non-basic) variants of this line
+        and data about this line. Special variants are not as well-described as basic, so information about them is being created based on entries in
+        'list of courses' section: only line, variant_name are given (other data is set to None) and flag is_basic is set to 0.
+        If this block does not describe any variant, all three lists are empty.
+    """
     VARIANT_ID_START = 9
     VARIANT_ID_END = 17
-    LINE_NUMBER_ROW_OFFSET = 4
-    VARIANT_DATA_ROW_OFFSET = 2
     LINE_NUMBER_START = 9
     LINE_NUMBER_END = 15
     DIRECTION_DESC_START = 64
@@ -267,39 +653,15 @@ def get_raw_variant_and_line_data(handle: IO, start_index: int) -> Tuple[Varaint
     LINE_DESCRIPTION_START = 16
     LINE_DESCRIPTION_END = -1
 
-    def get_variants_list_from_courses(line_number: str, text_index: int) -> VaraintParsedData:
-        """Get special (non-basic) varians of this line. Because these are not as well-described as basic,
-        information about them is being created based on entries in 'list of courses' section.
-
-        Args:
-            line_number (str): line name from which data about special variants will be created
-            text_index (int): index from which this function will start looking for appropriate section. This param does not have to be exaclty where
-            the section begins, but must be smaller or equal tha index of section.
-
-        Returns:
-            VaraintParsedData: List of special Variants, but only line, variant_name are returned (other data is set to None). Also, flag is_basic is set to 0.
-        """
-        line_course_list, _ = get_raw_lines_of_text("WK", data, start_index=text_index)
-        line_course_list = [line[COURSE_ID_START:COURSE_ID_END] for line in line_course_list]
-        variants = [line.split("/")[0] for line in line_course_list]
-        variants = set(variants)
-        return [[line_number, variant, None, None, None, 0] for variant in variants]
-
-    while True:
-        raw_data = get_raw_lines_of_text("LW", data, start_index=index)
-        if not raw_data:
-            break
-        raw_stops, new_index = raw_data
-        if data[new_index-len(raw_stops)-LINE_NUMBER_ROW_OFFSET].split()[0] == 'Linia:':
-            offset = new_index-len(raw_stops)-LINE_NUMBER_ROW_OFFSET
-            current_line = data[offset][LINE_NUMBER_START:LINE_NUMBER_END].strip(" ")
-            line_desc = data[offset][LINE_DESCRIPTION_START:LINE_DESCRIPTION_END].strip(" ")
-            all_lines.append([current_line, line_desc])
-            all_variants += get_variants_list_from_courses(current_line, new_index)
-
-        variant_data_line = data[new_index-len(raw_stops)-VARIANT_DATA_ROW_OFFSET]
+    line_header, variants, course_lines = sections
+    if not variants:
+        return [], [], []
 
+    current_line = line_header[LINE_NUMBER_START:LINE_NUMBER_END].strip(" ")
+    line_desc = line_header[LINE_DESCRIPTION_START:LINE_DESCRIPTION_END].strip(" ")
 
+    basic_variants = []
+    for variant_data_line, _ in variants:
         variant_id      = variant_data_line[VARIANT_ID_START:VARIANT_ID_END].strip(" ")
         direction_desc  = variant_data_line[DIRECTION_DESC_START:DIRECTION_DESC_END].strip(", ")
         direction       = variant_data_line[DIRECTION_START:DIRECTION_END]
@@ -308,14 +670,12 @@ def get_raw_variant_and_line_data(handle: IO, start_index: int) -> Tuple[Varaint
         check_if_var_is_integer(direction_level)
 
         basic_variants.append([current_line, variant_id, direction, int(direction_level), direction_desc, 1])
-        index = new_index
 
-    variant_check = [(variant[0], variant[1]) for variant in basic_variants]
-    for additional_variant in all_variants:
-        if (additional_variant[0], additional_variant[1]) not in variant_check:
-            additional_variants.append(additional_variant)
+    basic_variant_names = set(variant[1] for variant in basic_variants)
+    course_variants = sorted(set(line[COURSE_ID_START:COURSE_ID_END].split("/")[0] for line in course_lines))
+    additional_variants = [[current_line, variant, None, None, None, 0] for variant in course_variants if variant not in basic_variant_names]
 
-    return basic_variants+additional_variants, all_lines, end_index
+    return basic_variants, additional_variants, [[current_line, line_desc]]
 
 def get_previous_line_with(string_to_find: str, data: List[str], index: int) -> str:
     """From list of sring <data> find the line which contains <straing_to_find>.
@@ -335,7 +695,7 @@ def get_previous_line_with(string_to_find: str, data: List[str], index: int) ->
             return current_line
         index -= 1
 
-def get_raw_data_stop_course(handle: IO, start_index: int, course_id_dict: Dict[Tuple[str, str], int], stop_raw_data: StopParsedData) -> Tuple[StopCourseParsedData, int]:
+def get_raw_data_stop_course(handle: IO, start_index: int, course_id_dict: Dict[Tuple[str, str], int], stop_raw_data: StopParsedData, section_index: SectionIndex = None) -> Tuple[StopCourseParsedData, int]:
     """Get data from data file <handle> which will be inserted into Stop_Course table in database.
 
     Args:
@@ -346,60 +706,185 @@ def get_raw_data_stop_course(handle: IO, start_index: int, course_id_dict: Dict[
         values are numeric indexes of these courses. This dict must be created by get_dict_for_stop_course() function.
         stop_raw_data (StopParsedData): data about stops, used for splitting stop_course data into chunks based of position of stop and time of departure.
         This data must be generated by get_raw_data_stop() function.
+        section_index (SectionIndex, optional): index of sections of file, generated by build_section_index() function. If given,
+        function will seek directly to appropriate section. Defaults to None.
 
     Returns:
-        Tuple[StopCourseParsedData, int]:  Data for StopCourse table, which is a list of lists: [course_ID, stop_ID, departure_time_in_minutes]
+        Tuple[StopCourseParsedData, int]:  Data for StopCourse table, which is a list of lists: [course_ID, stop_ID, departure_time_in_minutes, chunk_ID]
         Function also returns index where the section of data ends.
     """
+    all_data_with_chunks = list(iter_stop_course_rows(handle, start_index, course_id_dict, stop_raw_data, section_index))
+    return all_data_with_chunks, handle.tell()
 
-    index = 0
+def iter_stop_course_rows(handle: IO, start_index: int, course_id_dict: Dict[Tuple[str, str], int], stop_raw_data: StopParsedData, section_index: SectionIndex = None) -> Iterator[Tuple[int, int, int, int]]:
+    """Yield rows of Stop_Course table from data file <handle> one by one, in the same order as get_raw_data_stop_course() returns them.
+    Only rows of one line block are held in memory at once. Other functions must not read <handle> until the generator is exhausted.
 
-    raw_data = get_raw_lines_of_handle("LL", handle, start_index)
-    if not raw_data:
-        raise SectionNotFoundError('LL')
-    data, end_index = raw_data
+    Args:
+        handle (IO): data file hanlde
+        start_index (int): index from which this function will start looking for appropriate section.
+        course_id_dict (Dict[Tuple[str, str], int]): Dict of indexes of courses, created by get_dict_for_stop_course() function.
+        stop_raw_data (StopParsedData): data about stops, generated by get_raw_data_stop() function.
+        section_index (SectionIndex, optional): index of sections of file, generated by build_section_index() function. Defaults to None.
+
+    Yields:
+        Iterator[Tuple[int, int, int, int]]: rows of Stop_Course table: [course_ID, stop_ID, departure_time_in_minutes, chunk_ID]
+    """
+    stop_dict = get_dict_of_stop_locations(stop_raw_data)
+    for line_block in iter_line_blocks(handle, start_index, section_index):
+        yield from get_stop_course_data_of_block(split_line_block(line_block), course_id_dict, stop_dict)
 
-    all_data = []
+def get_dict_of_stop_locations(stop_raw_data: StopParsedData) -> Dict[int, Tuple[float, float]]:
+    """From data about stops return the dict, where keys are IDs of stops and values are their locations.
 
-    SINGLE_COURSE_ID_START = 9
-    SINGLE_COURSE_ID_END = 26
-    STOP_ID_START = 28
-    STOP_ID_END = 34
-    TIME_START = 37
-    TIME_END = 43
+    Args:
+        stop_raw_data (StopParsedData): data about stops generated by get_raw_data_stop() function.
+
+    Returns:
+        Dict[int, Tuple[float, float]]: Dict, where keys are IDs of stops and values are tuples (latitude, longitude)
+    """
     STOP_PARSED_DATA_STOP_ID_INDEX = 0
     STOP_PARSED_DATA_STOP_LATITUDE = 3
     STOP_PARSED_DATA_STOP_LONGITUDE = 4
 
-    line_number = ""
-    while True:
-        raw_data = get_raw_lines_of_text("WK", data, start_index=index)
-        if not raw_data:
-            break
-        raw_times, new_index = raw_data
-        index = new_index
-        line_number = get_previous_line_with("Linia:", data, index).split()[1]
-        for line in raw_times:
-            single_course_id = line[SINGLE_COURSE_ID_START:SINGLE_COURSE_ID_END]
-            check_if_var_is_integer(line[STOP_ID_START:STOP_ID_END])
-            stop_id = int(line[STOP_ID_START:STOP_ID_END])
-            time = time_str_to_int(line[TIME_START:TIME_END].strip(" "))
-
-            all_data.append([course_id_dict[(line_number, single_course_id)], stop_id, time])
-
-    # Add chunk ID of stop course to data
-
     stop_dict = {}
     for stop in stop_raw_data:
         stop_dict[stop[STOP_PARSED_DATA_STOP_ID_INDEX]] = (stop[STOP_PARSED_DATA_STOP_LATITUDE],stop[STOP_PARSED_DATA_STOP_LONGITUDE])
-    all_data_with_chunks = []
-    for stop_course in all_data:
-        course_id, stop_id, time = stop_course
-        latitude, longitude = stop_dict[stop_id]
-        stop_course = [course_id, stop_id, time, NavDataModel.get_chunk_from_location_and_time((latitude, longitude), time*60)]
-        all_data_with_chunks.append(stop_course)
+    return stop_dict
 
-    return all_data_with_chunks, end_index
+def get_stop_course_data_of_block(sections: LineBlockSections, course_id_dict: Dict[Tuple[str, str], int], stop_dict: Dict[int, Tuple[float, float]]) -> StopCourseParsedData:
+    """Get data for Stop_Course table from a single line block.
+
+    Args:
+        sections (LineBlockSections): subsections of a line block, generated by split_line_block() function.
+        course_id_dict (Dict[Tuple[str, str], int]): Dict where keys are tuples of lines and unique courses of that line and
+        values are numeric indexes of these courses. This dict must be created by get_dict_for_stop_course() function.
+        stop_dict (Dict[int, Tuple[float, float]]): locations of stops, generated by get_dict_of_stop_locations() function.
+
+    Returns:
+        StopCourseParsedData: Data for StopCourse table, which is a list of lists: [course_ID, stop_ID, departure_time_in_minutes, chunk_ID]
+    """
+    return stop_course_columns_to_rows(get_stop_course_columns_of_block(sections, course_id_dict, stop_dict))
+
+def get_stop_course_columns_of_block(sections: LineBlockSections, course_id_dict: Dict[Tuple[str, str], int], stop_dict: Dict[int, Tuple[float, float]]) -> StopCourseColumns:
+    """Get data for Stop_Course table from a single line block as columns.
+    WK rows are read as a fixed-width structured array, so stop IDs and times are decoded and validated for whole columns at once.
+
+    Args:
+        sections (LineBlockSections): subsections of a line block, generated by split_line_block() function.
+        course_id_dict (Dict[Tuple[str, str], int]): Dict where keys are tuples of lines and unique courses of that line and
+        values are numeric indexes of these courses. This dict must be created by get_dict_for_stop_course() function.
+        stop_dict (Dict[int, Tuple[float, float]]): locations of stops, generated by get_dict_of_stop_locations() function.
+
+    Raises:
+        NumericTypeExpectedError: when stop ID or departure time of any row is not a number.
+        StopLocationNotFoundError: when any row is of a stop without latitude or longitude.
+
+    Returns:
+        StopCourseColumns: arrays of course IDs, stop IDs, departure times in minutes and chunk IDs, one element for each WK row.
+    """
+    line_header, _, course_lines = sections
+    if not course_lines:
+        empty_column = np.zeros(0, dtype=np.int64)
+        return empty_column, empty_column.copy(), empty_column.copy(), empty_column.copy()
+    line_number = line_header.split()[1]
+
+    # Text is stored by NumPy as fixed-width array of code points, so each row can be viewed as a record without encoding it
+    raw_rows = np.array(["".join(line[:WK_ROW_LENGTH].ljust(WK_ROW_LENGTH) for line in course_lines)])
+    rows = raw_rows.view(WK_ROW_DTYPE)
+
+    stop_ids = decode_integer_column(rows["stop_id"])
+    times = decode_time_column(rows["time"])
+
+    unique_course_ids, course_positions = np.unique(rows["course_id"], return_inverse=True)
+    course_indexes = np.array([course_id_dict[(line_number, str(course_id))] for course_id in unique_course_ids], dtype=np.int64)
+
+    unique_stop_ids, stop_positions = np.unique(stop_ids, return_inverse=True)
+    stop_locations = np.array([stop_dict[stop_id] for stop_id in unique_stop_ids.tolist()], dtype=np.float64).reshape(-1, 2)
+    # Missing coordinates become NaN, which would be silently cast to a wrong chunk
+    missing_locations = np.isnan(stop_locations).any(axis=1)
+    if missing_locations.any():
+        raise StopLocationNotFoundError(unique_stop_ids[missing_locations].tolist())
+    latitudes = stop_locations[stop_positions, 0]
+    longitudes = stop_locations[stop_positions, 1]
+
+    chunks = NavDataModel.get_chunks_from_locations_and_times(latitudes, longitudes, times * 60)
+
+    return course_indexes[course_positions.reshape(-1)], stop_ids, times, chunks
+
+def decode_integer_column(column: np.ndarray) -> np.ndarray:
+    """Change array of fixed-width ASCII digit fields into array of integers.
+
+    Args:
+        column (np.ndarray): array of character codes, with shape (rows, field_width).
+
+    Raises:
+        NumericTypeExpectedError: when any field is not made of digits only.
+
+    Returns:
+        np.ndarray: decoded integers, one for each row.
+    """
+    digits = column.astype(np.int64) - ord("0")
+    if ((digits < 0) | (digits > 9)).any():
+        raise NumericTypeExpectedError()
+    powers = 10 ** np.arange(column.shape[1] - 1, -1, -1, dtype=np.int64)
+    return digits @ powers
+
+def decode_time_column(column: np.ndarray) -> np.ndarray:
+    """Change array of fixed-width time fields (formatted as 'HH.mm' and padded with spaces) into array of amounts of minutes from midnight.
+    Vectorized version of time_str_to_int().
+
+    Args:
+        column (np.ndarray): array of character codes, with shape (rows, field_width).
+
+    Raises:
+        NumericTypeExpectedError: when any field is not properly formatted time.
+
+    Returns:
+        np.ndarray: amounts of minutes from midnight, one for each row.
+    """
+    MINUTES_IN_HOUR = 60
+
+    rows_count, width = column.shape
+    positions = np.arange(width)
+    digits = column.astype(np.int64) - ord("0")
+    is_digit = (digits >= 0) & (digits <= 9)
+    is_dot = column == ord(".")
+    is_space = column == ord(" ")
+
+    if (is_dot.sum(axis=1) != 1).any() or not (is_digit | is_dot | is_space).all():
+        raise NumericTypeExpectedError()
+
+    dot_positions = is_dot.argmax(axis=1)[:, None]
+    before_dot = positions < dot_positions
+    after_dot = positions > dot_positions
+    # Spaces may only surround the time, so they can not follow a digit of hour or precede a digit of minutes
+    digit_seen_from_left = np.cumsum(is_digit, axis=1) > 0
+    digit_seen_from_right = np.cumsum(is_digit[:, ::-1], axis=1)[:, ::-1] > 0
+    hour_present = is_digit[np.arange(rows_count), np.maximum(dot_positions[:, 0] - 1, 0)] & (dot_positions[:, 0] > 0)
+    minutes_present = is_digit[np.arange(rows_count), np.minimum(dot_positions[:, 0] + 1, width - 1)] & (dot_positions[:, 0] < width - 1)
+    if (is_space & before_dot & digit_seen_from_left).any() or (is_space & after_dot & digit_seen_from_right).any() \
+            or not hour_present.all() or not minutes_present.all():
+        raise NumericTypeExpectedError()
+
+    last_digit_positions = (width - 1 - is_digit[:, ::-1].argmax(axis=1))[:, None]
+    hour_powers = np.where(before_dot & is_digit, 10 ** np.clip(dot_positions - 1 - positions, 0, None), 0)
+    minutes_powers = np.where(after_dot & is_digit, 10 ** np.clip(last_digit_positions - positions, 0, None), 0)
+    hours = (digits * hour_powers).sum(axis=1)
+    minutes = (digits * minutes_powers).sum(axis=1)
+
+    return hours * MINUTES_IN_HOUR + minutes
+
+def stop_course_columns_to_rows(columns: StopCourseColumns) -> StopCourseParsedData:
+    """Change columns generated by get_stop_course_columns_of_block() function into data for Stop_Course table.
+
+    Args:
+        columns (StopCourseColumns): arrays of course IDs, stop IDs, departure times and chunk IDs.
+
+    Returns:
+        StopCourseParsedData: Data for StopCourse table, which is a list of lists: [course_ID, stop_ID, departure_time_in_minutes, chunk_ID]
+    """
+    return np.column_stack(columns).tolist()
 
 def get_stop_neighbours(data: StopParsedData, walk_distance=250, min_neighbours=5) -> StopNeighbourParsedData:
     """Get data which will be inserted into Stop_Neighbour table in database.
@@ -415,57 +900,80 @@ def get_stop_neighbours(data: StopParsedData, walk_distance=250, min_neighbours=
         [stop_id, neighbout_id, distance_in_meters_between_these_two]
     """
     STOP_ID = 0
-    STOP_COMPLEX_ID = 2
-    LATITUDE = 3
-    LONGITUDE = 4
-    def approximate_location(stop_complex_id: int) -> Tuple[float, float]:
-        if stop_complex_id < 0:
-            raise StopIDOutOfRange()
-        all_lat = []
-        all_long = []
-        for stop_data in data:
-            if stop_data[STOP_COMPLEX_ID] == stop_complex_id and stop_data[LATITUDE] is not None:
-                all_lat.append(stop_data[LATITUDE])
-                all_long.append(stop_data[LONGITUDE])
-        if len(all_lat) == 0:
-            # if no data is found, approx this stop coordinates to previous stop complex coordinattes
-            return approximate_location(stop_complex_id-1)
-        return statistics.mean(all_lat), statistics.mean(all_long)
 
-    all_neighbours = []
-    for stop_data in data:
-        stop_neighbours = []
-        dist_data = []
+    locations = get_stop_locations_for_neighbours(data)
+    grid = GeoGrid(locations, walk_distance)
 
-        if stop_data[LATITUDE]:
-            stop_lat, stop_long = stop_data[LATITUDE], stop_data[LONGITUDE]
-        else:
-            stop_lat, stop_long = approximate_location(stop_data[STOP_COMPLEX_ID])
+    def is_same_stop(index: int, other_index: int) -> bool:
+        return data[index][STOP_ID] == data[other_index][STOP_ID]
 
-        for neighbour_data in data:
+    stop_neighbours = grid.within_each(walk_distance, is_same_stop)
+    too_few_neighbours = [index for index, neighbours in stop_neighbours.items() if len(neighbours) < min_neighbours]
+    stop_neighbours.update(grid.nearest_each(too_few_neighbours, min_neighbours, is_same_stop, walk_distance))
 
-            if neighbour_data[STOP_ID] == stop_data[STOP_ID]:
-                continue
+    # Grid finds neighbours with haversine distances, stored distances are computed by ground_distance as they always were
+    all_neighbours = []
+    for index, stop_data in enumerate(data):
+        for neighbour_index, _ in stop_neighbours[index]:
+            distance = ground_distance(locations[index], locations[neighbour_index])
+            all_neighbours.append((stop_data[STOP_ID], data[neighbour_index][STOP_ID], round(distance, 6)))
+
+    return all_neighbours
 
-            if neighbour_data[LATITUDE]:
-                neigh_lat, neigh_long = neighbour_data[LATITUDE], neighbour_data[LONGITUDE]
-            else:
-                neigh_lat, neigh_long = approximate_location(neighbour_data[STOP_COMPLEX_ID])
+def get_stop_locations_for_neighbours(data: StopParsedData) -> List[Tuple[float, float]]:
+    """Get locations of all stops which will be used to find their neighbours. Stops without location are placed in the middle of their stop complex
+    (mean of locations of its stops), or in the middle of previous stop complex, if none of stops in complex has location.
 
-            distance = ground_distance((stop_lat, stop_long), (neigh_lat, neigh_long))
-            if distance <= walk_distance:
-                stop_neighbours.append((neighbour_data[STOP_ID], distance))
-            dist_data.append((neighbour_data[STOP_ID], distance))
+    Args:
+        data (StopParsedData): data about stops, created by get_raw_data_stop() function
 
-        if len(stop_neighbours) < min_neighbours:
-            stop_neighbours = sorted(dist_data, key= lambda x: x[1])[:min_neighbours]
+    Raises:
+        StopIDOutOfRange: when stop has no location and no stop complex before its complex has location.
 
-        for neighbour in stop_neighbours:
-            all_neighbours.append((stop_data[STOP_ID], neighbour[0], round(neighbour[1], 6)))
+    Returns:
+        List[Tuple[float, float]]: latitude and longitude of every stop, in order of <data>.
+    """
+    STOP_COMPLEX_ID = 2
+    LATITUDE = 3
+    LONGITUDE = 4
 
-    return all_neighbours
+    complex_locations = {}
+    for stop_data in data:
+        if stop_data[LATITUDE] is not None:
+            all_lat, all_long = complex_locations.setdefault(stop_data[STOP_COMPLEX_ID], ([], []))
+            all_lat.append(stop_data[LATITUDE])
+            all_long.append(stop_data[LONGITUDE])
 
-def get_raw_data_stop_variant(handle: IO, stops_list : List[int], special_variants_list: VaraintParsedData, start_index: int) -> StopVaraintParsedData:
+    approximated_locations = {}
+    def approximate_location(stop_complex_id: int) -> Tuple[float, float]:
+        if stop_complex_id in approximated_locations:
+            return approximated_locations[stop_complex_id]
+        checked_complexes = []
+        complex_id = stop_complex_id
+        while True:
+            if complex_id < 0:
+                raise StopIDOutOfRange()
+            if complex_id in complex_locations or complex_id in approximated_locations:
+                break
+            # if no data is found, approx this stop coordinates to previous stop complex coordinattes
+            checked_complexes.append(complex_id)
+            complex_id -= 1
+        if complex_id not in approximated_locations:
+            all_lat, all_long = complex_locations[complex_id]
+            approximated_locations[complex_id] = statistics.mean(all_lat), statistics.mean(all_long)
+        for checked_complex in checked_complexes:
+            approximated_locations[checked_complex] = approximated_locations[complex_id]
+        return approximated_locations[complex_id]
+
+    locations = []
+    for stop_data in data:
+        if stop_data[LATITUDE]:
+            locations.append((stop_data[LATITUDE], stop_data[LONGITUDE]))
+        else:
+            locations.append(approximate_location(stop_data[STOP_COMPLEX_ID]))
+    return locations
+
+def get_raw_data_stop_variant(handle: IO, stops_list : List[int], special_variants_list: VaraintParsedData, start_index: int, section_index: SectionIndex = None) -> StopVaraintParsedData:
     """Get data from data file <handle> which will be inserted into Stop_Varaint table in database.
 
     Args:
@@ -474,36 +982,84 @@ def get_raw_data_stop_variant(handle: IO, stops_list : List[int], special_varian
         special_variants_list (VaraintParsedData): List of special variants, generated by get_foreign_keys_for_stop_variant() function.
         start_index (int): index from which this function will start looking for appropriate section. This param does not have to be exaclty where
         the section begins, but must be smaller or equal tha index of section.
+        section_index (SectionIndex, optional): index of sections of file, generated by build_section_index() function. If given,
+        function will seek directly to appropriate section. Defaults to None.
 
     Returns:
         StopVaraintParsedData:  Data for Stop_Variant table, which is a list of lists:
         [variant_line, variant_name, order_of_stop_in_variant, stop_id, flag_is_stop_on_request, zone_number]
         Function also returns index where the section of data ends.
     """
-    raw_data = get_raw_lines_of_handle("LL", handle, start_index)
-    if not raw_data:
-        raise SectionNotFoundError("LL")
-    data, end_index = raw_data
-    index = 0
-    current_line = ""
-    current_zone = 1
-    all_stop_basic_variants = []
+    all_stop_variants = list(iter_stop_variant_rows(handle, stops_list, special_variants_list, start_index, section_index))
+    return all_stop_variants, handle.tell()
+
+def iter_stop_variant_rows(handle: IO, stops_list : List[int], special_variants_list: VaraintParsedData, start_index: int, section_index: SectionIndex = None) -> Iterator[Tuple[str, str, int, int, int, int]]:
+    """Yield rows of Stop_Variant table from data file <handle> one by one, in the same order as get_raw_data_stop_variant() returns them.
+    Rows of basic variants are yielded while line blocks are read, rows of special variants (which are a small part of all rows) are kept until
+    the end of section. Other functions must not read <handle> until the generator is exhausted.
+
+    Args:
+        handle (IO): data file hanlde
+        stops_list (List[int]): list of stops, generated by get_foreign_keys_for_stop_variant() function.
+        special_variants_list (VaraintParsedData): List of special variants, generated by get_foreign_keys_for_stop_variant() function.
+        start_index (int): index from which this function will start looking for appropriate section.
+        section_index (SectionIndex, optional): index of sections of file, generated by build_section_index() function. Defaults to None.
+
+    Yields:
+        Iterator[Tuple[str, str, int, int, int, int]]: rows of Stop_Variant table:
+        [variant_line, variant_name, order_of_stop_in_variant, stop_id, flag_is_stop_on_request, zone_number]
+    """
+    stops_set = set(stops_list)
     all_stop_special_variants = []
 
-    def get_stop_from_special_variants(line: str, index: int) -> StopVaraintParsedData:
+    for line_block in iter_line_blocks(handle, start_index, section_index):
+        block_basic, block_special = get_stop_variant_data_of_block(split_line_block(line_block), stops_set, special_variants_list)
+        yield from block_basic
+        all_stop_special_variants += block_special
+
+    yield from all_stop_special_variants
+
+def get_stop_variant_data_of_block(sections: LineBlockSections, stops_set: Set[int], special_variants_list: VaraintParsedData) -> Tuple[StopVaraintParsedData, StopVaraintParsedData]:
+    """Get data for Stop_Variant table from a single line block.
+
+    Args:
+        sections (LineBlockSections): subsections of a line block, generated by split_line_block() function.
+        stops_set (Set[int]): IDs of all stops, generated by get_foreign_keys_for_stop_variant() function.
+        special_variants_list (VaraintParsedData): List of special variants, generated by get_foreign_keys_for_stop_variant() function.
+
+    Returns:
+        Tuple[StopVaraintParsedData, StopVaraintParsedData]: Data for Stop_Variant table generated for basic variants of this line
+        and for special variants of this line.
+    """
+    LINE_NUMBER_START = 9
+    LINE_NUMBER_END = 15
+    VARIANT_ID_START = 9
+    VARIANT_ID_END = 17
+    ZONE_CHECK_START = 15
+    ZONE_CHECK_END = 45
+    STOP_ID_START = 49
+    STOP_ID_END = 55
+    ON_REQUEST_START = 96
+    ON_REQUEST_END = 98
+    ON_REQUEST_STRING = "NŻ"
+    FIRST_ZONE_CHECK  = ("""====== S T R E F A   1 =======""", 1)
+    SECOND_ZONE_CHECK = ("""====== S T R E F A   2 =======""", 2)
+    ZONES = [FIRST_ZONE_CHECK, SECOND_ZONE_CHECK]
+
+    line_header, variants, course_lines = sections
+    if not variants:
+        return [], []
+    current_line = line_header[LINE_NUMBER_START:LINE_NUMBER_END].strip(" ")
+
+    def get_stop_from_special_variants() -> StopVaraintParsedData:
         """Get data about Stop_variant for variants which are special. From these varaints, data about its route is stored only
         in 'list of stops and courses departures' section.
 
-        Args:
-            line (str): line from which data about special variants will be generated
-            index (int): index from which this function will start looking for appropriate section.
-
         Returns:
             StopVaraintParsedData: Data for Stop_Variant table generated for special variants.
         """
-        special_variants_line = [variant for variant in special_variants_list if variant[0] == line]
-        all_stop_courses, _ = get_raw_lines_of_text("WK", data, start_index=index)
-        all_stop_courses = [stop_course.split() for stop_course in all_stop_courses]
+        special_variants_line = [variant for variant in special_variants_list if variant[0] == current_line]
+        all_stop_courses = [stop_course.split() for stop_course in course_lines]
         line_stop_special_variants = []
         used_special_variants = []
         working_index = 0
@@ -514,15 +1070,15 @@ def get_raw_data_stop_variant(handle: IO, stops_list : List[int], special_varian
                 break
             current_text_line = all_stop_courses[working_index]
             variant_index = current_text_line[0].split("/")[0]
-            if variant_index not in used_special_variants and (line, variant_index) in special_variants_line:
+            if variant_index not in used_special_variants and (current_line, variant_index) in special_variants_line:
                 stop_order = 1
                 current_course = current_text_line[0]
                 while working_index != data_size and current_course == all_stop_courses[working_index][0]:
                     current_stop = all_stop_courses[working_index][1]
                     check_if_var_is_integer(current_stop)
                     current_stop = int(current_stop)
-                    if current_stop in stops_list:
-                        line_stop_special_variants.append([line, variant_index, stop_order, current_stop, None, None])
+                    if current_stop in stops_set:
+                        line_stop_special_variants.append([current_line, variant_index, stop_order, current_stop, None, None])
                         stop_order += 1
                     working_index += 1
                 used_special_variants.append(variant_index)
@@ -532,35 +1088,8 @@ def get_raw_data_stop_variant(handle: IO, stops_list : List[int], special_varian
             working_index += 1
         return line_stop_special_variants
 
-
-    LINE_NUMBER_ROW_OFFSET = 4
-    LINE_NUMBER_START = 9
-    LINE_NUMBER_END = 15
-    VARIANT_DATA_ROW_OFFSET = 2
-    VARIANT_ID_START = 9
-    VARIANT_ID_END = 17
-    ZONE_CHECK_START = 15
-    ZONE_CHECK_END = 45
-    STOP_ID_START = 49
-    STOP_ID_END = 55
-    ON_REQUEST_START = 96
-    ON_REQUEST_END = 98
-    ON_REQUEST_STRING = "NŻ"
-    FIRST_ZONE_CHECK  = ("""====== S T R E F A   1 =======""", 1)
-    SECOND_ZONE_CHECK = ("""====== S T R E F A   2 =======""", 2)
-    ZONES = [FIRST_ZONE_CHECK, SECOND_ZONE_CHECK]
-
-    while True:
-        raw_data = get_raw_lines_of_text("LW", data, start_index=index)
-        if not raw_data:
-            break
-        raw_stops, index = raw_data
-
-        if data[index-len(raw_stops)-LINE_NUMBER_ROW_OFFSET].split()[0] == 'Linia:':
-            current_line = data[index-len(raw_stops)-LINE_NUMBER_ROW_OFFSET][LINE_NUMBER_START:LINE_NUMBER_END].strip(" ")
-            all_stop_special_variants += get_stop_from_special_variants(current_line, index)
-
-        variant_data_line = data[index-len(raw_stops)-VARIANT_DATA_ROW_OFFSET]
+    stop_basic_variants = []
+    for variant_data_line, raw_stops in variants:
         variant_id = variant_data_line[VARIANT_ID_START:VARIANT_ID_END].strip(" ")
 
         current_zone = 1
@@ -580,15 +1109,15 @@ def get_raw_data_stop_variant(handle: IO, stops_list : List[int], special_varian
 
             check_if_var_is_integer(stop_id)
             stop_id = int(stop_id)
-            if stop_id not in stops_list:
+            if stop_id not in stops_set:
                 continue
 
             on_request = 1 if text_line[ON_REQUEST_START:ON_REQUEST_END] == ON_REQUEST_STRING else 0
             stop_variant_data = [current_line, variant_id, stop_order, int(stop_id), on_request, current_zone]
             stop_order += 1
-            all_stop_basic_variants.append(stop_variant_data)
+            stop_basic_variants.append(stop_variant_data)
 
-    return all_stop_basic_variants+all_stop_special_variants, end_index
+    return stop_basic_variants, get_stop_from_special_variants()
 
 
 def get_foreign_keys_for_stop_variant(parsed_data_stop : StopParsedData, parsed_data_variant: VaraintParsedData) -> Tuple[List[int], VaraintParsedData]:
@@ -611,61 +1140,78 @@ def get_foreign_keys_for_stop_variant(parsed_data_stop : StopParsedData, parsed_
 
     return stop_list, special_variant_list
 
-def get_raw_data_course(handle: IO, index: int) -> Tuple[CourseParsedData, int]:
+def get_raw_data_course(handle: IO, index: int, section_index: SectionIndex = None) -> Tuple[CourseParsedData, int]:
     """Get data from data file <handle> which will be inserted into Course table in database.
 
     Args:
         handle (IO): data file hanlde
         index (int): index from which this function will start looking for appropriate section. This param does not have to be exaclty where
         the section begins, but must be smaller or equal tha index of section.
+        section_index (SectionIndex, optional): index of sections of file, generated by build_section_index() function. If given,
+        function will seek directly to appropriate section. Defaults to None.
 
     Returns:
         Tuple[CourseParsedData, int]: Data for Course table, which is a list of lists:
         [line_name, variant_name, day_tpe_of_course, hour_of_start_of_course]
         Function also returns index where the section of data ends.
     """
+    all_courses = list(iter_course_rows(handle, index, section_index))
+    return all_courses, handle.tell()
+
+def iter_course_rows(handle: IO, index: int, section_index: SectionIndex = None) -> Iterator[Tuple[str, str, str, int]]:
+    """Yield rows of Course table from data file <handle> one by one, in the same order as get_raw_data_course() returns them.
+    Other functions must not read <handle> until the generator is exhausted.
 
+    Args:
+        handle (IO): data file hanlde
+        index (int): index from which this function will start looking for appropriate section.
+        section_index (SectionIndex, optional): index of sections of file, generated by build_section_index() function. Defaults to None.
+
+    Yields:
+        Iterator[Tuple[str, str, str, int]]: rows of Course table: [line_name, variant_name, day_tpe_of_course, hour_of_start_of_course]
+    """
+    for line_block in iter_line_blocks(handle, index, section_index):
+        yield from get_course_data_of_block(split_line_block(line_block))
+
+def get_course_data_of_block(sections: LineBlockSections) -> CourseParsedData:
+    """Get data for Course table from a single line block.
+
+    Args:
+        sections (LineBlockSections): subsections of a line block, generated by split_line_block() function.
+
+    Returns:
+        CourseParsedData: Data for Course table, which is a list of lists:
+        [line_name, variant_name, day_tpe_of_course, hour_of_start_of_course]
+    """
     TIME_INDEX = 3
     COURSE_NAME_START = 9
     COURSE_NAME_END = 26
     LINE_NAME_START = 9
     LINE_NAME_END = 15
-    all_courses = []
-
-    raw_data = get_raw_lines_of_handle("LL", handle, index)
-    if not raw_data:
-        raise SectionNotFoundError()
-    all_data, _  = raw_data
 
-    working_index = 0
+    line_header, _, course_lines = sections
+    if not course_lines:
+        return []
+    current_line = line_header[LINE_NAME_START:LINE_NAME_END].strip()
 
-    while True:
-        raw_data = get_raw_lines_of_text("WK", all_data, start_index=working_index)
-        if not raw_data:
-            break
-        data, working_index = raw_data
+    data = [line[COURSE_NAME_START:COURSE_NAME_END] for line in course_lines]
+    data = sorted(set(data))
+    data = [line.strip("_").split("/") for line in data]
+    data = [[current_line] + text_line for text_line in data]
+    times = [line.pop(TIME_INDEX) for line in data]
+    for index, line in enumerate(data):
+        time_in_minutes = time_str_to_int(times[index])
+        line.append(time_in_minutes)
 
-        text_line_with_bus_line = get_previous_line_with("Linia:", all_data, working_index)
-        current_line = text_line_with_bus_line[LINE_NAME_START:LINE_NAME_END].strip()
+    return data
 
-        data = [line[COURSE_NAME_START:COURSE_NAME_END] for line in data]
-        data = set(data)
-        data = [line.strip("_").split("/") for line in data]
-        data = [[current_line] + text_line for text_line in data]
-        times = [line.pop(TIME_INDEX) for line in data]
-        for index, line in enumerate(data):
-            time_in_minutes = time_str_to_int(times[index])
-            line.append(time_in_minutes)
-        all_courses += data
-
-    return all_courses, working_index
-
-def get_dict_for_stop_course(raw_course_data: CourseParsedData) -> Dict[Tuple[str, str], int]:
+def get_dict_for_stop_course(raw_course_data: CourseParsedData, first_course_index: int = 1) -> Dict[Tuple[str, str], int]:
     """From data about courses return the dict, where keys are names of courses and values are new enumerated
     indexes of these courses.
 
     Args:
         raw_course_data (CourseParsedData): data about courses created by get_raw_data_course() function
+        first_course_index (int, optional): index given to the first course in <raw_course_data>. Defaults to 1.
 
     Returns:
         Dict[Tuple[str, str], int]: Dict, where keys are names of courses (line_number and course_id) and values are new enumerated
@@ -676,7 +1222,7 @@ def get_dict_for_stop_course(raw_course_data: CourseParsedData) -> Dict[Tuple[st
     VARIANT_NAME_INDEX = 1
     DAY_TYPE_INDEX = 2
     START_HOUR_INDEX = 3
-    index = 1
+    index = first_course_index
     for line in raw_course_data:
         course_name = f"{line[VARIANT_NAME_INDEX]}/{line[DAY_TYPE_INDEX]}/{time_int_to_str(line[START_HOUR_INDEX])}"
         course_name = f"{course_name:_<17}"
@@ -685,6 +1231,139 @@ def get_dict_for_stop_course(raw_course_data: CourseParsedData) -> Dict[Tuple[st
 
     return course_dict
 
+def get_raw_data_of_lines(handle: IO, start_index: int, stop_raw_data: StopParsedData, section_index: SectionIndex = None, workers: int = 1) -> Tuple[VaraintParsedData, LineParsedData, StopVaraintParsedData, CourseParsedData, Dict[Tuple[str, str], int], StopCourseParsedData, int]:
+    """Get data from data file <handle> which will be inserted into Variant, Line, Stop_Variant, Course and Stop_Course tables in database.
+    The LL section is read only once: each line block is passed to all consumers before the next one is read. Returned data is the same as data
+    returned by get_raw_variant_and_line_data(), get_raw_data_stop_variant(), get_raw_data_course(), get_dict_for_stop_course() and get_raw_data_stop_course().
+
+    Args:
+        handle (IO): data file hanlde
+        start_index (int): index from which this function will start looking for appropriate section. This param does not have to be exaclty where
+        the section begins, but must be smaller or equal tha index of section.
+        stop_raw_data (StopParsedData): data about stops, generated by get_raw_data_stop() function.
+        section_index (SectionIndex, optional): index of sections of file, generated by build_section_index() function. If given,
+        function will seek directly to appropriate section. Defaults to None.
+        workers (int, optional): number of processes which will parse line blocks. Result does not depend on this number. Defaults to 1.
+
+    Returns:
+        Tuple[VaraintParsedData, LineParsedData, StopVaraintParsedData, CourseParsedData, Dict[Tuple[str, str], int], StopCourseParsedData, int]:
+        Data for Variant, Line, Stop_Variant and Course tables, dict of indexes of courses, data for Stop_Course table and index where the section of data ends.
+    """
+    STOP_COURSE_COURSE_INDEX = 0
+
+    basic_variants = []
+    additional_variants = []
+    all_lines = []
+    stop_basic_variants = []
+    stop_special_variants = []
+    all_courses = []
+    course_dict = {}
+    all_stop_courses = []
+
+    for block_data in iter_parsed_line_blocks(handle, start_index, stop_raw_data, section_index, workers):
+        block_basic, block_additional, block_lines, block_stop_basic, block_stop_special, block_courses, block_stop_courses = block_data
+        basic_variants += block_basic
+        additional_variants += block_additional
+        all_lines += block_lines
+        stop_basic_variants += block_stop_basic
+        stop_special_variants += block_stop_special
+
+        # Courses of each block are numbered from 1, shift them after courses of previous blocks
+        course_index_offset = len(all_courses)
+        course_dict.update(get_dict_for_stop_course(block_courses, course_index_offset + 1))
+        all_courses += block_courses
+        for stop_course in block_stop_courses:
+            stop_course[STOP_COURSE_COURSE_INDEX] += course_index_offset
+        all_stop_courses += block_stop_courses
+
+    return basic_variants+additional_variants, all_lines, stop_basic_variants+stop_special_variants, all_courses, course_dict, all_stop_courses, handle.tell()
+
+def iter_parsed_line_blocks(handle: IO, start_index: int, stop_raw_data: StopParsedData, section_index: SectionIndex = None, workers: int = 1) -> Iterator[LineBlockParsedData]:
+    """Read line blocks of LL section from data file <handle> and yield data parsed from each of them by parse_line_block() function, in order of blocks in file.
+    If <workers> is bigger than 1, blocks are parsed by a pool of processes. Only a few blocks per process are read ahead of the parsed ones.
+
+    Args:
+        handle (IO): data file hanlde
+        start_index (int): index from which this function will start looking for appropriate section.
+        stop_raw_data (StopParsedData): data about stops, generated by get_raw_data_stop() function.
+        section_index (SectionIndex, optional): index of sections of file, generated by build_section_index() function. Defaults to None.
+        workers (int, optional): number of processes which will parse line blocks. Defaults to 1.
+
+    Yields:
+        Iterator[LineBlockParsedData]: data parsed from each line block.
+    """
+    STOP_ID_POSITION = 0
+
+    stops_set = set(stop[STOP_ID_POSITION] for stop in stop_raw_data)
+    stop_dict = get_dict_of_stop_locations(stop_raw_data)
+    line_blocks = iter_line_blocks(handle, start_index, section_index)
+
+    if workers <= 1:
+        for line_block in line_blocks:
+            yield parse_line_block(line_block, stops_set, stop_dict)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_line_block_worker, initargs=(stops_set, stop_dict)) as executor:
+        pending = deque()
+        for line_block in line_blocks:
+            pending.append(executor.submit(parse_line_block_in_worker, line_block))
+            if len(pending) >= workers * LINE_BLOCKS_IN_FLIGHT_PER_WORKER:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def parse_line_block(line_block: RawText, stops_set: Set[int], stop_dict: Dict[int, Tuple[float, float]]) -> LineBlockParsedData:
+    """Get all data described in a single line block. Line blocks do not depend on each other, so they can be parsed in any order.
+
+    Args:
+        line_block (RawText): lines of a single line block, generated by iter_line_blocks() function.
+        stops_set (Set[int]): IDs of all stops.
+        stop_dict (Dict[int, Tuple[float, float]]): locations of stops, generated by get_dict_of_stop_locations() function.
+
+    Returns:
+        LineBlockParsedData: basic variants, special variants, line, Stop_Variant data of basic variants, Stop_Variant data of special variants,
+        courses and Stop_Course data of this line block. Courses in Stop_Course data are numbered from 1, in order of courses in returned course data.
+    """
+    LINE_ID_POSITION = 0
+    VARIANT_ID_POSITION = 1
+
+    sections = split_line_block(line_block)
+
+    basic_variants, additional_variants, lines = get_variant_and_line_data_of_block(sections)
+
+    special_variants_list = [(variant[LINE_ID_POSITION], variant[VARIANT_ID_POSITION]) for variant in additional_variants]
+    stop_basic_variants, stop_special_variants = get_stop_variant_data_of_block(sections, stops_set, special_variants_list)
+
+    courses = get_course_data_of_block(sections)
+    stop_courses = get_stop_course_data_of_block(sections, get_dict_for_stop_course(courses), stop_dict)
+
+    return basic_variants, additional_variants, lines, stop_basic_variants, stop_special_variants, courses, stop_courses
+
+# Data shared by all line blocks parsed in a worker process, set once by init_line_block_worker()
+_line_block_worker_data = None
+
+def init_line_block_worker(stops_set: Set[int], stop_dict: Dict[int, Tuple[float, float]]) -> None:
+    """Initialize a worker process of iter_parsed_line_blocks() with data shared by all line blocks.
+
+    Args:
+        stops_set (Set[int]): IDs of all stops.
+        stop_dict (Dict[int, Tuple[float, float]]): locations of stops, generated by get_dict_of_stop_locations() function.
+    """
+    global _line_block_worker_data
+    _line_block_worker_data = (stops_set, stop_dict)
+
+def parse_line_block_in_worker(line_block: RawText) -> LineBlockParsedData:
+    """Parse a line block by parse_line_block() in a worker process initialized by init_line_block_worker().
+
+    Args:
+        line_block (RawText): lines of a single line block, generated by iter_line_blocks() function.
+
+    Returns:
+        LineBlockParsedData: data parsed from this line block.
+    """
+    stops_set, stop_dict = _line_block_worker_data
+    return parse_line_block(line_block, stops_set, stop_dict)
+
 def time_str_to_int(time_string: str) -> int:
     """ Change from String where data about hour is stored: 'HH:mm' amonut of minutes from midnight as integer.
 
@@ -822,13 +1501,15 @@ def dict_of_indexes_to_list(dict_to_change: Dict[Any, int]) -> List[Tuple[int, A
     return list(zip(dict_to_change.values(), dict_to_change.keys()))
 
 
-def get_raw_data_town(handle: IO, start_index: int) -> Tuple[TownParsedData, int]:
+def get_raw_data_town(handle: IO, start_index: int, section_index: SectionIndex = None) -> Tuple[TownParsedData, int]:
     """Get data from data file <handle> which will be inserted into Town table in database.
 
     Args:
         handle (IO): data file hanlde
         start_index (int): index from which this function will start looking for appropriate section. This param does not have to be exaclty where
         the section begins, but must be smaller or equal tha index of section.
+        section_index (SectionIndex, optional): index of sections of file, generated by build_section_index() function. If given,
+        function will seek directly to appropriate section. Defaults to None.
 
     Returns:
         Tuple[TownParsedData, int]: Data for Town table, which is a list of lists:
@@ -843,7 +1524,7 @@ def get_raw_data_town(handle: IO, start_index: int) -> Tuple[TownParsedData, int
     WARSAW_ID   = '--'
     WARSAW_NAME = 'WARSZAWA'
 
-    raw_data = get_raw_lines_of_handle("SM", handle, start_index)
+    raw_data = get_raw_lines_of_handle("SM", handle, start_index, section_index=section_index)
     if not raw_data:
         raise SectionNotFoundError()
     raw_town_data, end_index = raw_data
@@ -857,13 +1538,15 @@ def get_raw_data_town(handle: IO, start_index: int) -> Tuple[TownParsedData, int
 
     return all_towns, end_index
 
-def get_raw_data_day_type(handle: IO, start_index: int) -> Tuple[DayTypeParsedData ,int]:
+def get_raw_data_day_type(handle: IO, start_index: int, section_index: SectionIndex = None) -> Tuple[DayTypeParsedData ,int]:
     """Get data from data file <handle> which will be inserted into Day_Type table in database.
 
     Args:
         handle (IO): data file hanlde
         start_index (int): index from which this function will start looking for appropriate section. This param does not have to be exaclty where
         the section begins, but must be smaller or equal tha index of section.
+        section_index (SectionIndex, optional): index of sections of file, generated by build_section_index() function. If given,
+        function will seek directly to appropriate section. Defaults to None.
 
     Returns:
         Tuple[DayTypeParsedData ,int]:  Data for Day_Type table, which is a list of lists:
@@ -876,7 +1559,7 @@ def get_raw_data_day_type(handle: IO, start_index: int) -> Tuple[DayTypeParsedDa
     DAY_TYPE_NAME_START = 8
     DAY_TYPE_NAME_END = -1
     all_day_types = []
-    raw_data = get_raw_lines_of_handle("TY", handle, start_index)
+    raw_data = get_raw_lines_of_handle("TY", handle, start_index, section_index=section_index)
     if not raw_data:
         raise SectionNotFoundError()
     raw_day_type, end_index  = raw_data
@@ -888,7 +1571,7 @@ def get_raw_data_day_type(handle: IO, start_index: int) -> Tuple[DayTypeParsedDa
 
     return all_day_types, end_index
 
-def get_raw_data_day_line(handle: IO, start_index: int, lines_list: LinesList) -> Tuple[DayLineParsedData, int]:
+def get_raw_data_day_line(handle: IO, start_index: int, lines_list: LinesList, section_index: SectionIndex = None) -> Tuple[DayLineParsedData, int]:
     """Get data from data file <handle> which will be inserted into Day_Line table in database.
 
     Args:
@@ -896,6 +1579,8 @@ def get_raw_data_day_line(handle: IO, start_index: int, lines_list: LinesList) -
         start_index (int): index from which this function will start looking for appropriate section. This param does not have to be exaclty where
         the section begins, but must be smaller or equal tha index of section.
         lines_list (LinesList): list of lines, generated by prepare_lies_list()
+        section_index (SectionIndex, optional): index of sections of file, generated by build_section_index() function. If given,
+        function will seek directly to appropriate section. Defaults to None.
 
     Returns:
         Tuple[DayLineParsedData, int]: Data for Day_Line table, which is a list of lists:
@@ -933,7 +1618,7 @@ def get_raw_data_day_line(handle: IO, start_index: int, lines_list: LinesList) -
 
         return parsed_list
 
-    raw_data = get_raw_lines_of_handle("KD", handle, start_index)
+    raw_data = get_raw_lines_of_handle("KD", handle, start_index, section_index=section_index)
     if not raw_data:
         raise SectionNotFoundError()
     raw_day_line_data, end_index = raw_data
@@ -1003,36 +1688,117 @@ def reduce_stop_course_data(stop_course_data: StopCourseParsedData, course_data:
     Returns:
         StopCourseParsedData: data with type like <stop_course_data> but with data reduced to only contain courses from the type of day where the amount of courses is the biggest for given line.
     """
-    COURSE_DATA_LINE_INDEX = 0
-    COURSE_DATA_DAY_TYPE_INDEX = 2
+    courses_in_most_common_day_type = get_courses_in_most_common_day_type(course_data, course_dict, lines_list)
+    return list(filter_stop_course_rows(stop_course_data, courses_in_most_common_day_type))
+
+def filter_stop_course_rows(stop_course_rows: Iterable[Tuple[int, int, int, int]], courses: Set[int]) -> Iterator[Tuple[int, int, int, int]]:
+    """Yield only these rows of Stop_Course table which belong to one of <courses>. Rows are not held in memory, so they can be
+    yielded by iter_stop_course_rows() function.
+
+    Args:
+        stop_course_rows (Iterable[Tuple[int, int, int, int]]): rows of Stop_Course table.
+        courses (Set[int]): indexes of courses to keep, generated by get_courses_in_most_common_day_type() function.
+
+    Yields:
+        Iterator[Tuple[int, int, int, int]]: rows of courses from <courses>, in order of <stop_course_rows>.
+    """
+    STOP_COURSE_COURSE_INDEX = 0
+    for stop_course in stop_course_rows:
+        if stop_course[STOP_COURSE_COURSE_INDEX] in courses:
+            yield stop_course
+
+def get_courses_in_most_common_day_type(course_data: CourseParsedData, course_dict: Dict[str, int], lines_list: LinesList) -> Set[int]:
+    """Get indexes of courses which take place on the type of day where the amount of courses is the biggest for their line.
+    Rows of Stop_Course table which are kept by reduce_stop_course_data() function are rows of these courses.
+
+    Args:
+        course_data (CourseParsedData): data about courses generated by get_raw_data_course() function
+        course_dict (Dict[str, int]): dict to map each course with given number. Geenerated by get_dict_for_stop_course() function
+        lines_list (LinesList): list of lines, generated, by prepare_line_list() function
+
+    Returns:
+        Set[int]: indexes of courses from <course_dict>.
+    """
     COURSE_DICT_LINE_INDEX = 0
     COURSE_DICT_COURSE_NAME_INDEX = 1
     COURSE_NAME_DAY_TYPE_INDEX = 1
-    STOP_COURSE_COURSE_INDEX = 0
 
-    line_most_common_type = {}
-    courses_in_most_common_day_type = []
-
-    # Count the most common type of day for each line
-    for line in lines_list:
-        day_type_list = [course[COURSE_DATA_DAY_TYPE_INDEX] for course in course_data if course[COURSE_DATA_LINE_INDEX] == line]
-        most_common_day_type = max(set(day_type_list), key=day_type_list.count)
-        line_most_common_type[line] = most_common_day_type
+    line_most_common_type = get_most_common_day_types(count_courses_per_day_type(course_data, lines_list))
 
     # Get courses_id from courses which are taking place on the most common type of day
-    for course in course_dict.keys():
-        course_line = course[COURSE_DICT_LINE_INDEX]
-        course_name = course[COURSE_DICT_COURSE_NAME_INDEX]
-        course_day_type = course_name.split("/")[COURSE_NAME_DAY_TYPE_INDEX]
-        if line_most_common_type[course_line] == course_day_type:
-            courses_in_most_common_day_type.append(course_dict[course])
+    courses_in_most_common_day_type = set()
+    for course, course_index in course_dict.items():
+        course_day_type = course[COURSE_DICT_COURSE_NAME_INDEX].split("/")[COURSE_NAME_DAY_TYPE_INDEX]
+        if line_most_common_type.get(course[COURSE_DICT_LINE_INDEX]) == course_day_type:
+            courses_in_most_common_day_type.add(course_index)
+
+    return courses_in_most_common_day_type
+
+def count_courses_per_day_type(course_data: CourseParsedData, lines_list: LinesList) -> DayTypeCourseCounts:
+    """Count courses of each line on each type of day, in one pass over <course_data>.
 
+    Args:
+        course_data (CourseParsedData): data about courses generated by get_raw_data_course() function
+        lines_list (LinesList): list of lines, generated, by prepare_line_list() function. Courses of other lines are not counted.
+
+    Returns:
+        DayTypeCourseCounts: dict where keys are lines and values are dicts of numbers of courses of this line on each type of day.
+        Lines without courses are not in this dict.
+    """
+    COURSE_DATA_LINE_INDEX = 0
+    COURSE_DATA_DAY_TYPE_INDEX = 2
 
-    # Change the stop_course_data to contain only the most common type
-    courses_in_most_common_day_type = set(courses_in_most_common_day_type)
-    new_stop_course = [stop_course for stop_course in stop_course_data if stop_course[STOP_COURSE_COURSE_INDEX] in courses_in_most_common_day_type]
+    course_counts = {line: {} for line in lines_list}
+    for course in course_data:
+        day_type_counts = course_counts.get(course[COURSE_DATA_LINE_INDEX])
+        if day_type_counts is not None:
+            day_type = course[COURSE_DATA_DAY_TYPE_INDEX]
+            day_type_counts[day_type] = day_type_counts.get(day_type, 0) + 1
 
-    return new_stop_course
+    return {line: day_type_counts for line, day_type_counts in course_counts.items() if day_type_counts}
+
+def get_most_common_day_types(course_counts: DayTypeCourseCounts) -> Dict[str, str]:
+    """Get the type of day with the biggest amount of courses for each line. If a few types of day have the same amount,
+    the first one in alphabetical order is chosen.
+
+    Args:
+        course_counts (DayTypeCourseCounts): numbers of courses, generated by count_courses_per_day_type() function.
+
+    Returns:
+        Dict[str, str]: dict where keys are lines and values are their most common types of day.
+    """
+    return {line: max(sorted(day_type_counts), key=day_type_counts.get) for line, day_type_counts in course_counts.items()}
+
+def get_stop_course_reduction_report(course_data: CourseParsedData, lines_list: LinesList) -> StopCourseReductionReport:
+    """Describe what reduce_stop_course_data() function keeps and what it throws away.
+
+    Args:
+        course_data (CourseParsedData): data about courses generated by get_raw_data_course() function
+        lines_list (LinesList): list of lines, generated, by prepare_line_list() function
+
+    Returns:
+        StopCourseReductionReport: list of lists: [line, day_type, number_of_courses, flag_are_courses_kept],
+        sorted by lines (in order of <lines_list>) and types of day.
+    """
+    course_counts = count_courses_per_day_type(course_data, lines_list)
+    line_most_common_type = get_most_common_day_types(course_counts)
+    return [[line, day_type, count, day_type == line_most_common_type[line]]
+            for line, day_type_counts in course_counts.items() for day_type, count in sorted(day_type_counts.items())]
+
+def log_stop_course_reduction_report(report: StopCourseReductionReport) -> None:
+    """Log how many courses are kept by reduce_stop_course_data() function. Numbers of courses of each line and type of day are logged
+    on debug level.
+
+    Args:
+        report (StopCourseReductionReport): report generated by get_stop_course_reduction_report() function.
+    """
+    COUNT_INDEX = 2
+    KEPT_INDEX = 3
+    kept_courses = sum(row[COUNT_INDEX] for row in report if row[KEPT_INDEX])
+    all_courses = sum(row[COUNT_INDEX] for row in report)
+    logging.info(f"Stop_Course reduced to {kept_courses} of {all_courses} courses")
+    for line, day_type, count, is_kept in report:
+        logging.debug(f"Line {line}, day type {day_type}: {count} courses {'kept' if is_kept else 'removed'}")
 
 def check_if_var_is_integer(var_to_check: str) -> None:
     """Check if given data got from data file if integer.
@@ -1,20 +1,30 @@
-from typing import List, Tuple, IO, Dict, Any, Union
+from typing import List, Tuple, IO, Dict, Any, Union, Iterator, Iterable, Set
+from dataclasses import dataclass
+import numpy as np
 
 # This is a list of all types used for generating data for databse.
 # These types may be find in database_builder and database_file_parser
 
 CourseParsedData =          List[Tuple[str, str, str, int]]
 DayLineParsedData =         List[Tuple[str, str, str]]
+DayTypeCourseCounts =       Dict[str, Dict[str, int]]
 DayTypeParsedData =         List[Tuple[str, str]]
 FileHandle =                IO
+LineBlockParsedData =       Tuple[List[Tuple[str, str, str, int, str, int]], List[Tuple[str, str, str, int, str, int]], List[Tuple[str, str]],
+                                  List[Tuple[str, str, int, int, int, int]], List[Tuple[str, str, int, int, int, int]],
+                                  List[Tuple[str, str, str, int]], List[Tuple[int, int, int]]]
+LineBlockSections =         Tuple[str, List[Tuple[str, List[str]]], List[str]]
 LineNormalizedData =        List[Tuple[str, int]]
 LineParsedData =            List[Tuple[str, str]]
 LinesList =                 List[str]
 LineTypeParsedData =        List[Tuple[int, str]]
 PlaceParsedData =           List[Tuple[int, str]]
 RawText =                   List[str]
+SectionIndex =              Dict[str, List[Tuple[int, int]]]
 StopComplexParsedData =     List[Tuple[int, str, str]]
+StopCourseColumns =         Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]
 StopCourseParsedData =      List[Tuple[int, int, int]]
+StopCourseReductionReport = List[Tuple[str, str, int, bool]]
 StopNeighbourParsedData =   List[Tuple[int, int, float]]
 StopNormalizedData =        List[Tuple[int, str, int, float, float, int, int]]
 StopParsedData =            List[Tuple[int, str, int, float, float, str, str]]
@@ -22,3 +32,21 @@ StopVaraintParsedData =     List[Tuple[str, str, int, int, int, int]]
 TownParsedData =            List[Tuple[str, str]]
 VaraintParsedData =         List[Tuple[str, str, str, int, str, int]]
 VariantNormalizedData =     List[Tuple[str, str, str, int, int, int]]
+
+
+@dataclass
+class ParsedDatabaseData:
+    """Data of all tables of database, generated from WTP data file and ready to be inserted into database."""
+    place_data: PlaceParsedData
+    town_data: TownParsedData
+    day_type_data: DayTypeParsedData
+    stop_complex_data: StopComplexParsedData
+    stop_data: StopNormalizedData
+    line_type_data: LineTypeParsedData
+    line_data: LineNormalizedData
+    variant_data: VariantNormalizedData
+    stop_neighbour_data: StopNeighbourParsedData
+    stop_variant_data: StopVaraintParsedData
+    course_data: CourseParsedData
+    stop_course_data: StopCourseParsedData
+    day_line_data: DayLineParsedData
@@ -0,0 +1,248 @@
+import gzip
+import logging
+import os
+import pickle
+import threading
+import time
+from typing import Dict, Iterable, List, Tuple
+from src.core.constants import DEFAULT_DATABASE_RECORDING_FILE
+from src.core.database_backends import DatabaseBackend
+
+# Recording of results of queries, which lets models run without database. RecordingBackend runs queries in another backend
+# and remembers their results, ReplayBackend answers the same queries from a saved recording, optionally waiting
+# like a remote database would. Queries are matched by their text and values of bind parameters.
+
+RECORDING_VERSION = 1
+# Placeholder of name of parameter in recorded subquery of ID list
+_ID_LIST_NAME = "\0"
+
+QueryKey = Tuple[str, Tuple]
+
+
+class QueryNotRecordedError(Exception):
+    """
+    An error which occurs when replayed query is not in the recording
+    """
+    def __init__(self, sql: str) -> None:
+        super().__init__(f"Query was not recorded: {' '.join(sql.split())[:200]}")
+
+
+class IdList:
+    """
+    Value of ID list parameter, recorded by its IDs, because values of the recorded backend may not be saved
+    """
+
+    def __init__(self, ids: Iterable[int], value=None):
+        self.ids = tuple(ids)
+        self.value = value
+
+
+def get_query_key(sql: str, parameters) -> QueryKey:
+    """
+    :param sql: sql statement
+    :param parameters: values of bind parameters, as a dictionary or a sequence
+    :return: key of query in recording
+    """
+    if isinstance(parameters, dict):
+        items = sorted(parameters.items())
+    else:
+        items = list(enumerate(parameters or ()))
+    return sql, tuple((name, value.ids if isinstance(value, IdList) else value) for name, value in items)
+
+
+def unwrap_parameters(parameters):
+    """
+    :param parameters: values of bind parameters, as a dictionary or a sequence
+    :return: parameters with values of recorded backend instead of IdList values
+    """
+    if isinstance(parameters, dict):
+        return {name: value.value if isinstance(value, IdList) else value for name, value in parameters.items()}
+    return [value.value if isinstance(value, IdList) else value for value in parameters or ()]
+
+
+class RecordedCursor:
+    """
+    Cursor whose results are held in memory, like the ones served from a recording
+    """
+
+    def __init__(self, latency: float = 0.0):
+        self.arraysize = 100
+        self._latency = latency
+        self._rows: List[Tuple] = []
+        self._position = 0
+
+    def _round_trip(self) -> None:
+        if self._latency > 0:
+            time.sleep(self._latency)
+
+    def _set_rows(self, rows: List[Tuple]) -> None:
+        self._rows = rows
+        self._position = 0
+
+    def fetchmany(self, size: int = None) -> List[Tuple]:
+        self._round_trip()
+        size = self.arraysize if size is None else size
+        rows = self._rows[self._position:self._position + size]
+        self._position += len(rows)
+        return rows
+
+    def fetchone(self):
+        rows = self.fetchmany(1)
+        return rows[0] if rows else None
+
+    def fetchall(self) -> List[Tuple]:
+        self._round_trip()
+        rows = self._rows[self._position:]
+        self._position = len(self._rows)
+        return rows
+
+    def __iter__(self):
+        while rows := self.fetchmany():
+            yield from rows
+
+    def close(self) -> None:
+        pass
+
+
+class RecordingBackend(DatabaseBackend):
+    """
+    Backend which runs queries in another backend and records their results
+    """
+
+    def __init__(self, backend: DatabaseBackend, recording_file: str = DEFAULT_DATABASE_RECORDING_FILE):
+        self._backend = backend
+        self._recording_file = recording_file
+        self._results: Dict[QueryKey, List[Tuple]] = {}
+        self._lock = threading.Lock()
+
+    def connect(self) -> "RecordingConnection":
+        return RecordingConnection(self, self._backend.connect())
+
+    def is_healthy(self, connection: "RecordingConnection") -> bool:
+        return self._backend.is_healthy(connection.connection)
+
+    def id_list_subquery(self, name: str) -> str:
+        return self._backend.id_list_subquery(name)
+
+    def id_list_value(self, connection: "RecordingConnection", ids: Iterable[int]) -> IdList:
+        ids = list(ids)
+        return IdList(ids, self._backend.id_list_value(connection.connection, ids))
+
+    def record(self, key: QueryKey, rows: List[Tuple]) -> None:
+        with self._lock:
+            self._results[key] = rows
+
+    @property
+    def query_count(self) -> int:
+        return len(self._results)
+
+    def save(self) -> None:
+        """
+        Saves all recorded queries to the recording file
+        """
+        with self._lock:
+            recording = {"version": RECORDING_VERSION, "id_list_subquery": self._backend.id_list_subquery(_ID_LIST_NAME),
+                         "results": dict(self._results)}
+        os.makedirs(os.path.dirname(os.path.abspath(self._recording_file)), exist_ok=True)
+        temporary_file = self._recording_file + ".tmp"
+        with gzip.open(temporary_file, "wb") as stream:
+            pickle.dump(recording, stream, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary_file, self._recording_file)
+        logging.info(f"Saved {len(recording['results'])} recorded queries to {self._recording_file}")
+
+
+class RecordingConnection:
+    def __init__(self, backend: RecordingBackend, connection):
+        self._backend = backend
+        self.connection = connection
+
+    def cursor(self) -> "RecordingCursor":
+        return RecordingCursor(self._backend, self, self.connection.cursor())
+
+    def commit(self) -> None:
+        self.connection.commit()
+
+    def close(self) -> None:
+        self.connection.close()
+
+
+class RecordingCursor(RecordedCursor):
+    """
+    Cursor which fetches whole result of query at once, records it and serves it from memory
+    """
+
+    def __init__(self, backend: RecordingBackend, connection: RecordingConnection, cursor):
+        super().__init__()
+        self._backend = backend
+        self.connection = connection
+        self._cursor = cursor
+
+    def execute(self, sql: str, parameters=()) -> "RecordingCursor":
+        self._cursor.execute(sql, unwrap_parameters(parameters))
+        rows = [tuple(row) for row in self._cursor.fetchall()] if self._cursor.description else []
+        self._backend.record(get_query_key(sql, parameters), rows)
+        self._set_rows(rows)
+        return self
+
+
+class ReplayBackend(DatabaseBackend):
+    """
+    Backend which answers queries from a recording saved by RecordingBackend
+    """
+
+    def __init__(self, recording_file: str = DEFAULT_DATABASE_RECORDING_FILE, latency: float = 0.0):
+        """
+        :param recording_file: file saved by RecordingBackend.save()
+        :param latency: simulated time of one round trip to database in seconds, spent by every execute and fetch
+        """
+        with gzip.open(recording_file, "rb") as stream:
+            recording = pickle.load(stream)
+        if recording.get("version") != RECORDING_VERSION:
+            raise ValueError(f"{recording_file} was saved by another version of recording")
+        self._id_list_subquery: str = recording["id_list_subquery"]
+        self._results: Dict[QueryKey, List[Tuple]] = recording["results"]
+        self.latency = latency
+
+    def connect(self) -> "ReplayConnection":
+        return ReplayConnection(self)
+
+    def id_list_subquery(self, name: str) -> str:
+        return self._id_list_subquery.replace(_ID_LIST_NAME, name)
+
+    def id_list_value(self, connection, ids: Iterable[int]) -> IdList:
+        return IdList(ids)
+
+    def get_rows(self, sql: str, parameters) -> List[Tuple]:
+        key = get_query_key(sql, parameters)
+        if key not in self._results:
+            raise QueryNotRecordedError(sql)
+        return self._results[key]
+
+
+class ReplayConnection:
+    def __init__(self, backend: ReplayBackend):
+        self._backend = backend
+
+    def cursor(self) -> "ReplayCursor":
+        return ReplayCursor(self._backend, self)
+
+    def ping(self) -> None:
+        pass
+
+    def commit(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class ReplayCursor(RecordedCursor):
+    def __init__(self, backend: ReplayBackend, connection: ReplayConnection):
+        super().__init__(backend.latency)
+        self._backend = backend
+        self.connection = connection
+
+    def execute(self, sql: str, parameters=()) -> "ReplayCursor":
+        self._round_trip()
+        self._set_rows(self._backend.get_rows(sql, parameters))
+        return self
@@ -0,0 +1,165 @@
+import os
+import pickle
+import hashlib
+import logging
+from typing import Union
+from src.core.constants import DEFAULT_PARSED_DATA_FOLDER
+from src.core.database_file_parser import PARSER_VERSION
+from src.core.database_file_parser_types import ParsedDatabaseData
+
+# Cache of data parsed from WTP data files. Data of each file is saved in a separate file, named after hash of the data file,
+# together with version of parser which generated it, so a changed data file or a changed parser never uses old data.
+
+HASH_CHUNK_SIZE = 1 << 20
+CACHE_FILE_EXTENSION = ".pickle"
+# Data which is currently in database, saved after each build, so that the next update can be applied as a difference.
+# File is named after dataset version stamp written into database together with the data, so the data is used only
+# for the database which holds it, and never for another database or for the same database after it was changed elsewhere
+DATABASE_STATE_FILE_PREFIX = "database_state_"
+
+
+def get_file_hash(file_path: str) -> str:
+    """Get SHA-256 hash of content of file.
+
+    Args:
+        file_path (str): address of file
+
+    Returns:
+        str: hexadecimal hash of file.
+    """
+    file_hash = hashlib.sha256()
+    with open(file_path, "rb") as stream:
+        while chunk := stream.read(HASH_CHUNK_SIZE):
+            file_hash.update(chunk)
+    return file_hash.hexdigest()
+
+def get_cache_file_path(file_hash: str, cache_folder: str = DEFAULT_PARSED_DATA_FOLDER) -> str:
+    """Get address of file in which data parsed from data file with hash <file_hash> is cached.
+
+    Args:
+        file_hash (str): hash of data file, generated by get_file_hash() function.
+        cache_folder (str, optional): folder where cached data is stored. Defaults to DEFAULT_PARSED_DATA_FOLDER.
+
+    Returns:
+        str: address of cache file.
+    """
+    return os.path.join(cache_folder, file_hash + CACHE_FILE_EXTENSION)
+
+def load_parsed_data(file_hash: str, cache_folder: str = DEFAULT_PARSED_DATA_FOLDER) -> Union[ParsedDatabaseData, None]:
+    """Load data parsed from data file with hash <file_hash>, if it was cached by the current version of parser.
+
+    Args:
+        file_hash (str): hash of data file, generated by get_file_hash() function.
+        cache_folder (str, optional): folder where cached data is stored. Defaults to DEFAULT_PARSED_DATA_FOLDER.
+
+    Returns:
+        Union[ParsedDatabaseData, None]: cached data or None if there is no valid cached data.
+    """
+    return load_versioned_data(get_cache_file_path(file_hash, cache_folder))
+
+def save_parsed_data(file_hash: str, parsed_data: ParsedDatabaseData, cache_folder: str = DEFAULT_PARSED_DATA_FOLDER) -> None:
+    """Save data parsed from data file with hash <file_hash>, so it can be loaded by load_parsed_data() function.
+
+    Args:
+        file_hash (str): hash of data file, generated by get_file_hash() function.
+        parsed_data (ParsedDatabaseData): data parsed from data file.
+        cache_folder (str, optional): folder where cached data is stored. Defaults to DEFAULT_PARSED_DATA_FOLDER.
+    """
+    save_versioned_data(get_cache_file_path(file_hash, cache_folder), parsed_data)
+
+def get_database_state_file_path(dataset_version: str, cache_folder: str = DEFAULT_PARSED_DATA_FOLDER) -> str:
+    """Get address of file in which data of database with version stamp <dataset_version> is saved.
+
+    Args:
+        dataset_version (str): version stamp of data in database, written by write_dataset_version() function.
+        cache_folder (str, optional): folder where cached data is stored. Defaults to DEFAULT_PARSED_DATA_FOLDER.
+
+    Returns:
+        str: address of file with data of database.
+    """
+    return os.path.join(cache_folder, DATABASE_STATE_FILE_PREFIX + dataset_version + CACHE_FILE_EXTENSION)
+
+def load_database_state(dataset_version: Union[str, None], cache_folder: str = DEFAULT_PARSED_DATA_FOLDER) -> Union[ParsedDatabaseData, None]:
+    """Load data which was inserted into database by the last build or update of database.
+
+    Args:
+        dataset_version (Union[str, None]): version stamp currently in database, None if database has no stamp.
+        cache_folder (str, optional): folder where cached data is stored. Defaults to DEFAULT_PARSED_DATA_FOLDER.
+
+    Returns:
+        Union[ParsedDatabaseData, None]: data which is in database or None if it is unknown.
+    """
+    if dataset_version is None:
+        logging.info("Database has no dataset version, its data is unknown")
+        return None
+    return load_versioned_data(get_database_state_file_path(dataset_version, cache_folder))
+
+def save_database_state(dataset_version: str, parsed_data: ParsedDatabaseData, cache_folder: str = DEFAULT_PARSED_DATA_FOLDER) -> None:
+    """Save data which was inserted into database, so the next update of database can be compared with it.
+
+    Args:
+        dataset_version (str): version stamp written into database together with data.
+        parsed_data (ParsedDatabaseData): data which is in database.
+        cache_folder (str, optional): folder where cached data is stored. Defaults to DEFAULT_PARSED_DATA_FOLDER.
+    """
+    save_versioned_data(get_database_state_file_path(dataset_version, cache_folder), parsed_data)
+
+def remove_database_state(dataset_version: Union[str, None], cache_folder: str = DEFAULT_PARSED_DATA_FOLDER) -> None:
+    """Remove data saved by save_database_state() function, when database no longer has version stamp <dataset_version>.
+
+    Args:
+        dataset_version (Union[str, None]): version stamp which was replaced in database, nothing is removed if it is None.
+        cache_folder (str, optional): folder where cached data is stored. Defaults to DEFAULT_PARSED_DATA_FOLDER.
+    """
+    if dataset_version is None:
+        return
+    try:
+        os.remove(get_database_state_file_path(dataset_version, cache_folder))
+    except FileNotFoundError:
+        pass
+
+def load_versioned_data(file_path: str) -> Union[ParsedDatabaseData, None]:
+    """Load data saved by save_versioned_data() function, if it was saved by the current version of parser.
+
+    Args:
+        file_path (str): address of file with saved data.
+
+    Returns:
+        Union[ParsedDatabaseData, None]: saved data or None if there is no valid saved data.
+    """
+    try:
+        with open(file_path, "rb") as stream:
+            version, parsed_data = pickle.load(stream)
+    except FileNotFoundError:
+        logging.info(f"No saved data in {file_path}")
+        return None
+    except (pickle.UnpicklingError, EOFError, ValueError, AttributeError):
+        logging.warning(f"Saved data in {file_path} is corrupted, ignoring it")
+        return None
+
+    if version != PARSER_VERSION:
+        logging.info(f"Data in {file_path} was generated by another version of parser, ignoring it")
+        return None
+    return parsed_data
+
+def save_versioned_data(file_path: str, parsed_data: ParsedDatabaseData) -> None:
+    """Save data together with version of parser which generated it. File is replaced only when whole data is written.
+    Data which cannot be saved is only logged, because it is just a cache.
+
+    Args:
+        file_path (str): address of file where data will be saved.
+        parsed_data (ParsedDatabaseData): data to save.
+    """
+    temporary_file_path = file_path + ".tmp"
+    try:
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        with open(temporary_file_path, "wb") as stream:
+            pickle.dump((PARSER_VERSION, parsed_data), stream, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary_file_path, file_path)
+    except OSError:
+        logging.warning(f"Cannot save data in {file_path}!")
+        # Partially written data would be left on disk, e.g. when the disk is full
+        try:
+            os.remove(temporary_file_path)
+        except OSError:
+            pass
@@ -0,0 +1,185 @@
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, List
+from src.core.constants import DEFAULT_SLOW_QUERY_LOG_FILE
+
+# Statistics of queries run by Database, aggregated by shape of query (SQL with literals replaced by "?"), so that the same
+# query with different values is counted together. Queries slower than the threshold are also appended to slow query log.
+
+DEFAULT_SLOW_QUERY_THRESHOLD = 0.5
+
+_WHITESPACE = re.compile(r"\s+")
+_COMMENT = re.compile(r"--[^\n]*")
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w:?])-?\d+(?:\.\d+)?\b")
+_LITERAL_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_INTERNAL_MODULES = {"src.core.database", "src.core.database_backends", "src.core.query_statistics", "src.core.connection_pool"}
+
+
+@dataclass
+class QueryStatistics:
+    """
+    Statistics of all runs of queries of one shape
+    """
+    shape: str
+    count: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+    rows: int = 0
+    bytes: int = 0
+    # Number of runs of query by each calling method
+    callers: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def mean_seconds(self) -> float:
+        return self.total_seconds / self.count if self.count else 0.0
+
+
+@dataclass(eq=False)
+class DatabaseTime:
+    """
+    Time spent in database by queries run by one thread inside measure_database_time()
+    """
+    seconds: float = 0.0
+    query_count: int = 0
+    rows: int = 0
+
+
+_statistics: Dict[str, QueryStatistics] = {}
+_statistics_lock = threading.Lock()
+_slow_query_threshold = DEFAULT_SLOW_QUERY_THRESHOLD
+_slow_query_log_file = DEFAULT_SLOW_QUERY_LOG_FILE
+_measurements = threading.local()
+
+
+def normalize_query(sql: str) -> str:
+    """
+    Replaces literals of sql by "?" and lists of literals by "(?)", removes comments and collapses whitespace
+    :param sql: sql statement
+    :return: shape of statement
+    """
+    sql = _COMMENT.sub(" ", sql)
+    sql = _STRING_LITERAL.sub("?", sql)
+    sql = _NUMBER_LITERAL.sub("?", sql)
+    sql = _LITERAL_LIST.sub("(?)", sql)
+    return _WHITESPACE.sub(" ", sql).strip()
+
+
+def estimate_row_size(row) -> int:
+    """
+    :param row: row fetched from database
+    :return: approximate number of bytes of values of row, as they are sent by database
+    """
+    size = 0
+    for value in row:
+        if isinstance(value, (str, bytes)):
+            size += len(value)
+        elif value is not None:
+            size += 8
+    return size
+
+
+def get_calling_method() -> str:
+    """
+    :return: "module.method" of the first frame on the stack outside of the database layer
+    """
+    frame = sys._getframe(1)
+    while frame is not None and frame.f_globals.get("__name__") in _INTERNAL_MODULES:
+        frame = frame.f_back
+    if frame is None:
+        return "unknown"
+    code = frame.f_code
+    return f"{frame.f_globals.get('__name__', '?')}.{getattr(code, 'co_qualname', code.co_name)}"
+
+
+def record_query(sql: str, seconds: float, rows: int = 0, fetched_bytes: int = 0, caller: str = None) -> None:
+    """
+    Adds a run of query to statistics and to slow query log if it took longer than the threshold
+    :param sql: sql statement
+    :param seconds: time spent in database
+    :param rows: number of fetched rows
+    :param fetched_bytes: approximate size of fetched rows
+    :param caller: method which ran the query, by default found on the stack
+    """
+    caller = caller if caller is not None else get_calling_method()
+    shape = normalize_query(sql)
+    with _statistics_lock:
+        statistics = _statistics.setdefault(shape, QueryStatistics(shape))
+        statistics.count += 1
+        statistics.total_seconds += seconds
+        statistics.max_seconds = max(statistics.max_seconds, seconds)
+        statistics.rows += rows
+        statistics.bytes += fetched_bytes
+        statistics.callers[caller] = statistics.callers.get(caller, 0) + 1
+
+    for measurement in getattr(_measurements, "active", []):
+        measurement.seconds += seconds
+        measurement.query_count += 1
+        measurement.rows += rows
+
+    if seconds >= _slow_query_threshold:
+        log_slow_query(shape, seconds, rows, caller)
+
+
+def log_slow_query(shape: str, seconds: float, rows: int, caller: str) -> None:
+    """
+    Appends a query to slow query log file
+    :param shape: normalized sql statement
+    :param seconds: time spent in database
+    :param rows: number of fetched rows
+    :param caller: method which ran the query
+    """
+    line = f"{time.strftime('%Y-%m-%d %H:%M:%S')}\t{seconds:.3f}s\t{rows} rows\t{caller}\t{shape}\n"
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(_slow_query_log_file)), exist_ok=True)
+        with _statistics_lock, open(_slow_query_log_file, "a", encoding="utf-8") as stream:
+            stream.write(line)
+    except OSError:
+        logging.warning(f"Cannot write slow query log {_slow_query_log_file}!")
+
+
+def set_slow_query_log(threshold: float = DEFAULT_SLOW_QUERY_THRESHOLD, log_file: str = DEFAULT_SLOW_QUERY_LOG_FILE) -> None:
+    """
+    :param threshold: queries which take at least this many seconds are written to slow query log
+    :param log_file: file of slow query log
+    """
+    global _slow_query_threshold, _slow_query_log_file
+    _slow_query_threshold = threshold
+    _slow_query_log_file = log_file
+
+
+def get_query_statistics() -> List[QueryStatistics]:
+    """
+    :return: copy of statistics of all query shapes, the ones with the longest total time first
+    """
+    with _statistics_lock:
+        statistics = [QueryStatistics(s.shape, s.count, s.total_seconds, s.max_seconds, s.rows, s.bytes, dict(s.callers))
+                      for s in _statistics.values()]
+    return sorted(statistics, key=lambda s: s.total_seconds, reverse=True)
+
+
+def reset_query_statistics() -> None:
+    with _statistics_lock:
+        _statistics.clear()
+
+
+@contextmanager
+def measure_database_time():
+    """
+    Measures time spent in database by queries of the current thread inside the with block
+    :return: DatabaseTime filled while the block runs
+    """
+    measurement = DatabaseTime()
+    if not hasattr(_measurements, "active"):
+        _measurements.active = []
+    _measurements.active.append(measurement)
+    try:
+        yield measurement
+    finally:
+        _measurements.active.remove(measurement)
@@ -0,0 +1,111 @@
+import logging
+import os
+import pickle
+from typing import Callable, List, Optional
+from src.core.constants import DEFAULT_REFERENCE_DATA_FOLDER
+from src.core.database import Database, DEFAULT_FETCH_ARRAY_SIZE
+
+# Read-through cache of static reference data (stops, complexes, lines, variants), which models download on every start.
+# Rows of each dataset are saved in a separate pickle file together with the query and the dataset version stamp which
+# database builder writes to Dataset_Version table on every build or update, so any change of data or of query
+# makes cached rows stale. Databases without the stamp are always queried.
+
+CACHE_FORMAT_VERSION = 1
+CACHE_FILE_EXTENSION = ".pickle"
+DATASET_VERSION_QUERY = "SELECT Version FROM Dataset_Version"
+
+_cache_folder: Optional[str] = DEFAULT_REFERENCE_DATA_FOLDER
+
+
+def set_reference_data_folder(cache_folder: Optional[str] = DEFAULT_REFERENCE_DATA_FOLDER) -> None:
+    """
+    :param cache_folder: folder of cached datasets, None disables the cache
+    """
+    global _cache_folder
+    _cache_folder = cache_folder
+
+
+def get_dataset_version(database: Database) -> Optional[str]:
+    """
+    :param database: database holding reference data
+    :return: version stamp written by database builder or None if database has no stamp
+    """
+    try:
+        versions = database.simple_type_mapping(DATASET_VERSION_QUERY, str)
+    except Exception as error:
+        logging.info(f"Database has no dataset version, reference data will not be cached ({error})")
+        return None
+    return versions[0] if len(versions) == 1 else None
+
+
+def get_cache_file_path(name: str, cache_folder: str) -> str:
+    """
+    :param name: name of dataset
+    :param cache_folder: folder of cached datasets
+    :return: address of file in which rows of dataset are cached
+    """
+    return os.path.join(cache_folder, name + CACHE_FILE_EXTENSION)
+
+
+def load_cached_rows(file_path: str, version: str, sql: str) -> Optional[List[tuple]]:
+    """
+    :param file_path: file saved by save_cached_rows()
+    :param version: current dataset version stamp
+    :param sql: query whose rows are cached
+    :return: cached rows or None if they are missing, corrupted or stale
+    """
+    try:
+        with open(file_path, "rb") as stream:
+            cache_format, cached_version, cached_sql, rows = pickle.load(stream)
+    except FileNotFoundError:
+        return None
+    except (pickle.UnpicklingError, EOFError, ValueError, TypeError, AttributeError):
+        logging.warning(f"Cached reference data in {file_path} is corrupted, ignoring it")
+        return None
+
+    if (cache_format, cached_version, cached_sql) != (CACHE_FORMAT_VERSION, version, sql):
+        logging.info(f"Cached reference data in {file_path} is stale, ignoring it")
+        return None
+    return rows
+
+
+def save_cached_rows(file_path: str, version: str, sql: str, rows: List[tuple]) -> None:
+    """
+    Saves rows of query, file is replaced only when all rows are written
+    :param file_path: file of dataset
+    :param version: dataset version stamp of rows
+    :param sql: query which returned rows
+    :param rows: rows as tuples
+    """
+    temporary_file_path = file_path + ".tmp"
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(file_path)), exist_ok=True)
+        with open(temporary_file_path, "wb") as stream:
+            pickle.dump((CACHE_FORMAT_VERSION, version, sql, rows), stream, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary_file_path, file_path)
+    except OSError:
+        logging.warning(f"Cannot save reference data in {file_path}!")
+
+
+def cached_query(database: Database, name: str, sql: str, map_to: Callable = None,
+                 arraysize: int = DEFAULT_FETCH_ARRAY_SIZE) -> list:
+    """
+    Returns results of sql select from local cache if they were saved for the current dataset version,
+    otherwise queries database and saves results
+    :param database: database holding reference data
+    :param name: name of dataset, used as name of cache file
+    :param sql: sql select without bind parameters
+    :param map_to: type to map each row to, rows are returned as tuples if it is None
+    :param arraysize: number of rows fetched in one round trip when database is queried
+    :return: list of rows
+    """
+    version = get_dataset_version(database) if _cache_folder is not None else None
+    if version is None:
+        return list(database.iter_rows(sql, map_to=map_to, arraysize=arraysize))
+
+    file_path = get_cache_file_path(name, _cache_folder)
+    rows = load_cached_rows(file_path, version, sql)
+    if rows is None:
+        rows = [tuple(row) for row in database.iter_rows(sql, arraysize=arraysize)]
+        save_cached_rows(file_path, version, sql, rows)
+    return rows if map_to is None else [map_to(*row) for row in rows]
@@ -1,11 +1,13 @@
 import logging
 import math
+import time
 from queue import PriorityQueue
-from src.lib.geodesic import ground_distance
+from src.lib.geodesic import ground_distance, planar_distance
 from src.lib.navigation_graph import TransitNetworkNode, FakeNetworkNode, NavGraph
 from src.lib.navigation_steps import NavStep, TakeTransit, GoOnFoot, StartAtNode
 from src.core.custom_types import *
 from src.models.nav_data_model import NavDataModel
+from src.core.query_statistics import DatabaseTime, measure_database_time
 from queue import Queue
 
 SECONDS_IN_A_DAY = 24 * 3600
@@ -51,6 +53,8 @@ class AStarNav:
 
         self._min_arrival_time: dict[int, Seconds_t] = {}  # WHEN will I optimally get here?
         self._min_path_taken: dict[int, NavStep] = {}  # HOW  will I optimally get here?
+        self.last_search_database_time: Optional[DatabaseTime] = None  # How long did the last search wait for database?
+        self._destination_planar_location: Optional[tuple[float, float]] = None  # Where is the destination on the plane of stops?
 
     @property
     def graph(self):
@@ -67,6 +71,15 @@ class AStarNav:
         """
         return ground_distance(p1, p2) / HEURISTIC_STRAIGHT_LINE_SPEED + time_taken_so_far
 
+    def _heuristic(self, destination_geopoint: Geopoint_t, node: TransitNetworkNode, time_taken_so_far: Seconds_t) -> Seconds_t:
+        """
+        Heuristic time of travel from node to destination, using planar locations of stops if they are known
+        """
+        if self._destination_planar_location is None or node.stop.x is None:
+            return self.heura(destination_geopoint, node.stop.get_location(), time_taken_so_far)
+        return planar_distance((node.stop.x, node.stop.y), self._destination_planar_location) / HEURISTIC_STRAIGHT_LINE_SPEED \
+            + time_taken_so_far
+
     def patience_drop_off(self, base: int, horizon: int, x: int):
         return round(base * (1 - 1 / horizon) ** x)
 
@@ -98,6 +111,11 @@ class AStarNav:
         start_geopoint = start_node.stop.get_location()
         destination_geopoint = destination_node.stop.get_location()
 
+        # Stops have precomputed planar locations, so heuristic of every considered step is a planar distance
+        self._destination_planar_location = None
+        if self._nav_data_model is not None:
+            self._destination_planar_location = self._nav_data_model.get_planar_location(destination_geopoint)
+
         initial_heuristic = self.heura(start_geopoint, destination_geopoint, 0)
         queue.put(initial_heuristic, starting_time, None, start_node)
 
@@ -195,10 +213,7 @@ class AStarNav:
                         next_stop_node = self._graph.get_nav_node(next_stop_id)
                         next_actual_time = next_course.times_of_arrival_per_stop_id[next_stop_id]
                         total_time = next_actual_time - actual_time_of_arrival
-                        next_heuristic_time = self.heura(
-                            destination_geopoint,
-                            next_stop_node.stop.get_location(),
-                            total_time)
+                        next_heuristic_time = self._heuristic(destination_geopoint, next_stop_node, total_time)
                         # Put it all together
                         if next_stop_id not in self._min_arrival_time or next_actual_time < self._min_arrival_time[
                             next_stop_id]:
@@ -220,10 +235,7 @@ class AStarNav:
                 time_walked_to_neighbour = distance / AVG_HUMAN_WALKING_SPEED + BASE_WALK_TIME
                 next_actual_time = actual_time_of_arrival + time_walked_to_neighbour
                 total_time = next_actual_time - actual_time_of_arrival
-                next_heuristic_time = self.heura(
-                    destination_geopoint,
-                    next_stop_node.stop.get_location(),
-                    total_time)
+                next_heuristic_time = self._heuristic(destination_geopoint, next_stop_node, total_time)
                 # Put it all together
                 if next_stop_id not in self._min_arrival_time or next_actual_time < self._min_arrival_time[
                     next_stop_id]:
@@ -306,7 +318,13 @@ class AStarNav:
         logging.info(f"{start_location} -> {str(start_node)}")
         logging.info(f"{destination_location} -> {str(destination_node)}")
 
-        self._init_A_star(starting_time, start_node, destination_node)
+        search_start = time.perf_counter()
+        with measure_database_time() as database_time:
+            self._init_A_star(starting_time, start_node, destination_node)
+        self.last_search_database_time = database_time
+        search_seconds = time.perf_counter() - search_start
+        logging.info(f"A* search took {search_seconds:.3f}s, of which {database_time.seconds:.3f}s "
+                     f"({database_time.seconds / max(search_seconds, 1e-9):.0%}) in {database_time.query_count} database queries")
 
         path = []
         current_node = destination_node
@@ -0,0 +1,249 @@
+import math
+from typing import Callable, Dict, List, Optional, Tuple
+import numpy as np
+from src.core.custom_types import Geopoint_t, Meter_t
+from src.lib.geodesic import EARTH_RADIUS, HAVERSINE, ground_distances, ground_distance_matrix
+
+# Distances returned by ground_distance are not exact for very close points (acos of a number near 1),
+# so every query looks this many meters further than asked, and the exact distance is checked afterwards
+GRID_SEARCH_MARGIN = 1.0
+# Average number of points whose distances are computed together by within_each(), which groups cells into square tiles
+WITHIN_EACH_TILE_POINTS = 64
+
+
+class GeoGrid:
+    """
+    Uniform grid of geopoints in latitude / longitude degrees. It is used to find candidates for distance queries
+    without comparing a point with every other point. Candidates are returned in the order in which points were given,
+    and the set of candidates always contains every point within the asked ground distance.
+    Distances to candidates are computed by vectorized ground_distances(), unless a distance function is given.
+    """
+
+    def __init__(self, geopoints: List[Geopoint_t], cell_size: Meter_t, method: str = HAVERSINE):
+        """
+        :param geopoints: lat lng float tuples which will be indexed
+        :param cell_size: approximate size of a grid cell in meters
+        :param method: method of ground_distances() used when queries are not given a distance function
+        """
+        cell_size = max(cell_size, GRID_SEARCH_MARGIN)
+        self._geopoints = geopoints
+        self._method = method
+        coordinates = np.array(geopoints, dtype=np.float64).reshape(-1, 2)
+        self._latitudes = coordinates[:, 0]
+        self._longitudes = coordinates[:, 1]
+        self._max_abs_lat = max((abs(lat) for lat, _ in geopoints), default=0.0)
+        self._cell_lat = self._lat_span(cell_size)
+        self._cell_lng = self._lng_span(cell_size)
+        self._cells: Dict[Tuple[int, int], List[int]] = {}
+        for index, geopoint in enumerate(geopoints):
+            self._cells.setdefault(self._cell_of(geopoint), []).append(index)
+
+        rows = [row for row, _ in self._cells]
+        cols = [col for _, col in self._cells]
+        self._row_range = (min(rows, default=0), max(rows, default=0))
+        self._col_range = (min(cols, default=0), max(cols, default=0))
+
+    def __len__(self):
+        return len(self._geopoints)
+
+    @property
+    def latitudes(self) -> np.ndarray:
+        return self._latitudes
+
+    @property
+    def longitudes(self) -> np.ndarray:
+        return self._longitudes
+
+    def distances(self, geopoint: Geopoint_t, indexes: List[int],
+                  distance_function: Optional[Callable[[Geopoint_t, Geopoint_t], Meter_t]] = None) -> List[Meter_t]:
+        """
+        :param geopoint: lat lng float tuple
+        :param indexes: indexes of points
+        :param distance_function: function returning distance in meters between two points, by default ground_distances() is used
+        :return: distances in meters from <geopoint> to points with <indexes>
+        """
+        if distance_function is None:
+            return ground_distances(geopoint, self._latitudes[indexes], self._longitudes[indexes], self._method).tolist()
+        return [distance_function(geopoint, self._geopoints[index]) for index in indexes]
+
+    def _lat_span(self, distance: Meter_t) -> float:
+        """
+        Latitude difference in degrees which can not be covered within <distance> meters
+        """
+        return math.degrees(distance / EARTH_RADIUS)
+
+    def _lng_span(self, distance: Meter_t) -> float:
+        """
+        Longitude difference in degrees which can not be covered within <distance> meters by any indexed point
+        (follows from haversine formula for the highest absolute latitude of indexed points)
+        """
+        cos_lat = math.cos(math.radians(self._max_abs_lat))
+        if cos_lat <= 0:
+            return 360.0
+        half_angle_sin = math.sin(min(distance / EARTH_RADIUS, math.pi) / 2) / cos_lat
+        if half_angle_sin >= 1:
+            return 360.0
+        return math.degrees(2 * math.asin(half_angle_sin))
+
+    def _cell_of(self, geopoint: Geopoint_t) -> Tuple[int, int]:
+        lat, lng = geopoint
+        return math.floor(lat / self._cell_lat), math.floor(lng / self._cell_lng)
+
+    def candidates(self, geopoint: Geopoint_t, distance: Meter_t) -> List[int]:
+        """
+        Returns indexes of all points which may be within <distance> meters from <geopoint>, in order of indexing
+        :param geopoint: lat lng float tuple
+        :param distance: distance in meters
+        :return: sorted indexes of points
+        """
+        lat, lng = geopoint
+        lat_span = self._lat_span(distance + GRID_SEARCH_MARGIN)
+        lng_span = self._lng_span(distance + GRID_SEARCH_MARGIN)
+
+        first_row = max(math.floor((lat - lat_span) / self._cell_lat), self._row_range[0])
+        last_row = min(math.floor((lat + lat_span) / self._cell_lat), self._row_range[1])
+        first_col = max(math.floor((lng - lng_span) / self._cell_lng), self._col_range[0])
+        last_col = min(math.floor((lng + lng_span) / self._cell_lng), self._col_range[1])
+
+        return self._indexes_in_cells(first_row, last_row, first_col, last_col)
+
+    def _indexes_in_cells(self, first_row: int, last_row: int, first_col: int, last_col: int) -> List[int]:
+        """
+        Returns sorted indexes of all points in cells of the given range of rows and columns
+        """
+        if (last_row - first_row + 1) * (last_col - first_col + 1) >= len(self._cells):
+            found = [index for (row, col), indexes in self._cells.items()
+                     if first_row <= row <= last_row and first_col <= col <= last_col for index in indexes]
+        else:
+            found = []
+            for row in range(first_row, last_row + 1):
+                for col in range(first_col, last_col + 1):
+                    found += self._cells.get((row, col), [])
+        return sorted(found)
+
+    def covers_all(self, geopoint: Geopoint_t, distance: Meter_t) -> bool:
+        """
+        Checks whether query of <distance> meters around <geopoint> returns every indexed point
+        """
+        lat, lng = geopoint
+        lat_span = self._lat_span(distance + GRID_SEARCH_MARGIN)
+        lng_span = self._lng_span(distance + GRID_SEARCH_MARGIN)
+        return math.floor((lat - lat_span) / self._cell_lat) <= self._row_range[0] \
+            and math.floor((lat + lat_span) / self._cell_lat) >= self._row_range[1] \
+            and math.floor((lng - lng_span) / self._cell_lng) <= self._col_range[0] \
+            and math.floor((lng + lng_span) / self._cell_lng) >= self._col_range[1]
+
+    def within(self, geopoint: Geopoint_t, distance: Meter_t,
+               distance_function: Optional[Callable[[Geopoint_t, Geopoint_t], Meter_t]] = None,
+               excluded: Callable[[int], bool] = lambda index: False) -> List[Tuple[int, Meter_t]]:
+        """
+        Returns all points within <distance> meters from <geopoint>, in order of indexing
+        :param geopoint: lat lng float tuple
+        :param distance: distance in meters
+        :param distance_function: function returning distance in meters between <geopoint> and an indexed point,
+        by default ground_distances() is used
+        :param excluded: tells which indexes should be skipped
+        :return: list of (index, distance) tuples
+        """
+        indexes = [index for index in self.candidates(geopoint, distance) if not excluded(index)]
+        return [(index, point_distance) for index, point_distance in zip(indexes, self.distances(geopoint, indexes, distance_function))
+                if point_distance <= distance]
+
+    def within_each(self, distance: Meter_t, excluded: Callable[[int, int], bool] = lambda index, other_index: index == other_index,
+                    indexes: Optional[List[int]] = None) -> Dict[int, List[Tuple[int, Meter_t]]]:
+        """
+        Returns for every point all points within <distance> meters from it, like within() called for each point,
+        but distances are computed for all points of a tile of cells at once by ground_distance_matrix()
+        :param distance: distance in meters
+        :param excluded: tells which pairs of indexes should be skipped, by default a point is not returned for itself
+        :param indexes: indexes of points for which neighbours are searched, all points by default
+        :return: dictionary from index of point to list of (index, distance) tuples in order of indexing
+        """
+        queried = None if indexes is None else set(indexes)
+        lat_span = self._lat_span(distance + GRID_SEARCH_MARGIN)
+        lng_span = self._lng_span(distance + GRID_SEARCH_MARGIN)
+
+        # Tiles would hold WITHIN_EACH_TILE_POINTS points if all their cells were as full as an average non-empty cell
+        tile_size = max(1, math.floor(math.sqrt(WITHIN_EACH_TILE_POINTS * len(self._cells) / max(len(self._geopoints), 1))))
+        tiles: Dict[Tuple[int, int], List[int]] = {}
+        for (row, col), cell_indexes in self._cells.items():
+            tile_indexes = tiles.setdefault((row // tile_size, col // tile_size), [])
+            tile_indexes += cell_indexes if queried is None else [index for index in cell_indexes if index in queried]
+
+        found: Dict[int, List[Tuple[int, Meter_t]]] = {}
+        for (tile_row, tile_col), tile_indexes in tiles.items():
+            if not tile_indexes:
+                continue
+            first_row, first_col = tile_row * tile_size, tile_col * tile_size
+            # Candidates of all points of the tile
+            candidates = self._indexes_in_cells(
+                max(math.floor((first_row * self._cell_lat - lat_span) / self._cell_lat), self._row_range[0]),
+                min(math.floor(((first_row + tile_size) * self._cell_lat + lat_span) / self._cell_lat), self._row_range[1]),
+                max(math.floor((first_col * self._cell_lng - lng_span) / self._cell_lng), self._col_range[0]),
+                min(math.floor(((first_col + tile_size) * self._cell_lng + lng_span) / self._cell_lng), self._col_range[1]))
+
+            distances = ground_distance_matrix(self._latitudes[tile_indexes], self._longitudes[tile_indexes],
+                                               self._latitudes[candidates], self._longitudes[candidates], self._method)
+            for index in tile_indexes:
+                found[index] = []
+            point_positions, candidate_positions = np.nonzero(distances <= distance)
+            for point_position, candidate_position, point_distance in zip(point_positions.tolist(), candidate_positions.tolist(),
+                                                                          distances[point_positions, candidate_positions].tolist()):
+                index, candidate = tile_indexes[point_position], candidates[candidate_position]
+                if not excluded(index, candidate):
+                    found[index].append((candidate, point_distance))
+        return found
+
+    def nearest_each(self, indexes: List[int], count: int,
+                     excluded: Callable[[int, int], bool] = lambda index, other_index: index == other_index,
+                     start_distance: Meter_t = 250.0) -> Dict[int, List[Tuple[int, Meter_t]]]:
+        """
+        Returns for every point with <indexes> <count> points closest to it, like nearest() called for each point,
+        but points which need the same search distance are searched together by within_each()
+        :param indexes: indexes of points for which neighbours are searched
+        :param count: how many points should be returned for each point
+        :param excluded: tells which pairs of indexes should be skipped, by default a point is not returned for itself
+        :param start_distance: distance in meters of the first search, which is doubled until enough points are found
+        :return: dictionary from index of point to list of (index, distance) tuples, sorted by distance
+        """
+        found: Dict[int, List[Tuple[int, Meter_t]]] = {}
+        distance = max(start_distance, GRID_SEARCH_MARGIN)
+        while indexes:
+            remaining = []
+            for index in indexes:
+                if self.covers_all(self._geopoints[index], distance):
+                    found[index] = self.nearest(self._geopoints[index], count, excluded=lambda other_index: excluded(index, other_index),
+                                                start_distance=distance)
+                else:
+                    remaining.append(index)
+            for index, neighbours in self.within_each(distance, excluded, remaining).items():
+                if len(neighbours) >= count:
+                    found[index] = sorted(neighbours, key=lambda x: x[1])[:count]
+            indexes = [index for index in remaining if index not in found]
+            distance *= 2
+        return found
+
+    def nearest(self, geopoint: Geopoint_t, count: int,
+                distance_function: Optional[Callable[[Geopoint_t, Geopoint_t], Meter_t]] = None,
+                excluded: Callable[[int], bool] = lambda index: False, start_distance: Meter_t = 250.0) -> List[Tuple[int, Meter_t]]:
+        """
+        Returns <count> points closest to <geopoint>. Points with equal distance are in order of indexing,
+        so result is the same as stable sorting all points by distance.
+        :param geopoint: lat lng float tuple
+        :param count: how many points should be returned
+        :param distance_function: function returning distance in meters between <geopoint> and an indexed point,
+        by default ground_distances() is used
+        :param excluded: tells which indexes should be skipped
+        :param start_distance: distance in meters of the first search, which is doubled until enough points are found
+        :return: list of (index, distance) tuples, sorted by distance
+        """
+        distance = max(start_distance, GRID_SEARCH_MARGIN)
+        while True:
+            if self.covers_all(geopoint, distance):
+                indexes = [index for index in range(len(self._geopoints)) if not excluded(index)]
+                found = list(zip(indexes, self.distances(geopoint, indexes, distance_function)))
+                return sorted(found, key=lambda x: x[1])[:count]
+            found = self.within(geopoint, distance, distance_function, excluded)
+            if len(found) >= count:
+                return sorted(found, key=lambda x: x[1])[:count]
+            distance *= 2
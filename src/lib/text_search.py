@@ -0,0 +1,128 @@
+import re
+import unicodedata
+from typing import Dict, List, Set
+
+# Letters which are not decomposed by unicode normalization into a base letter and a combining mark
+FOLDED_LETTERS = str.maketrans({"ł": "l", "đ": "d", "ø": "o", "ß": "ss"})
+WORD_PATTERN = re.compile(r"\w+")
+# Words are found by n-grams of this length, shorter query words can only match beginnings of words
+NGRAM_LENGTH = 3
+# Keys of postings of word beginnings, separate for names and for all texts of entries
+NAME_PREFIX_MARK = "^"
+WORD_PREFIX_MARK = "~"
+# Ranks of matches, all words of query are beginnings of words of name / of any words / parts of any words
+NAME_PREFIX_MATCH = 0
+WORD_PREFIX_MATCH = 1
+SUBSTRING_MATCH = 2
+
+
+def fold_diacritics(text: str) -> str:
+    """
+    :param text: any text
+    :return: lowercase text without diacritics, "Świętokrzyska" becomes "swietokrzyska"
+    """
+    decomposed = unicodedata.normalize("NFKD", text.lower().translate(FOLDED_LETTERS))
+    return "".join(character for character in decomposed if not unicodedata.combining(character))
+
+
+def split_words(text: str) -> List[str]:
+    """
+    :param text: any text
+    :return: folded words of text
+    """
+    return WORD_PATTERN.findall(fold_diacritics(text))
+
+
+class NgramSearchIndex:
+    """
+    Search index of short texts, which ignores letter case and diacritics. Every entry has a name and details (street,
+    town etc.), every word of query has to be found in one of them. Entries whose name words begin with the query
+    words are returned first, then ones with any words beginning with the query words, then ones which just contain
+    the query words. Within each rank entries are returned in the order in which they were given.
+    Candidates are found by intersecting postings of n-grams of query words, starting from the rarest one,
+    so a query does not look at entries which can not match.
+    """
+
+    def __init__(self, names: List[str], details: List[str]):
+        """
+        :param names: names of entries, in order of preference
+        :param details: other searchable texts of entries
+        """
+        self._names: List[str] = []
+        self._texts: List[str] = []
+        postings: Dict[str, List[int]] = {}
+
+        def add_posting(key: str, index: int):
+            posting = postings.setdefault(key, [])
+            if not posting or posting[-1] != index:
+                posting.append(index)
+
+        for index, (name, detail) in enumerate(zip(names, details)):
+            name_words = split_words(name)
+            words = name_words + split_words(detail)
+            # Words are separated by single spaces, so " " + word is found only at the beginning of a word
+            self._names.append(" " + " ".join(name_words))
+            self._texts.append(" " + " ".join(words))
+            for word in name_words:
+                add_posting(NAME_PREFIX_MARK + word[:NGRAM_LENGTH], index)
+            for word in words:
+                for length in range(1, min(len(word), NGRAM_LENGTH) + 1):
+                    add_posting(WORD_PREFIX_MARK + word[:length], index)
+                for start in range(len(word) - NGRAM_LENGTH + 1):
+                    add_posting(word[start:start + NGRAM_LENGTH], index)
+
+        # Postings are sorted by index, because entries were added in order
+        self._postings = postings
+        self._posting_sets: Dict[str, Set[int]] = {key: set(posting) for key, posting in postings.items()}
+
+    def __len__(self):
+        return len(self._names)
+
+    def search(self, query: str, limit: int) -> List[int]:
+        """
+        :param query: words to look for, in any letter case, with or without diacritics
+        :param limit: maximal number of returned entries
+        :return: indexes of at most <limit> best matching entries, best first
+        """
+        words = split_words(query)
+        if not words or limit <= 0:
+            return []
+
+        substring_keys = set()
+        for word in words:
+            if len(word) < NGRAM_LENGTH:
+                substring_keys.add(WORD_PREFIX_MARK + word)
+            else:
+                substring_keys.update(word[start:start + NGRAM_LENGTH] for start in range(len(word) - NGRAM_LENGTH + 1))
+        word_prefix_keys = substring_keys | {WORD_PREFIX_MARK + word[:NGRAM_LENGTH] for word in words}
+        name_prefix_keys = word_prefix_keys | {NAME_PREFIX_MARK + word[:NGRAM_LENGTH] for word in words}
+
+        results = []
+        found = set()
+        for rank, keys in ((NAME_PREFIX_MATCH, name_prefix_keys), (WORD_PREFIX_MATCH, word_prefix_keys),
+                           (SUBSTRING_MATCH, substring_keys)):
+            if any(key not in self._postings for key in keys):
+                continue
+            keys = sorted(keys, key=lambda key: len(self._postings[key]))
+            other_postings = [self._posting_sets[key] for key in keys[1:]]
+            # Rarest posting is scanned in order of entries, so scan stops as soon as enough entries are found
+            for index in self._postings[keys[0]]:
+                if index in found or not all(index in posting for posting in other_postings):
+                    continue
+                if self._matches(index, words, rank):
+                    results.append(index)
+                    found.add(index)
+                    if len(results) == limit:
+                        return results
+        return results
+
+    def _matches(self, index: int, words: List[str], rank: int) -> bool:
+        """
+        N-grams of words can be found in an entry which does not contain the words, so candidates are checked
+        """
+        if rank == NAME_PREFIX_MATCH:
+            return all(" " + word in self._names[index] for word in words)
+        text = self._texts[index]
+        if rank == WORD_PREFIX_MATCH:
+            return all(" " + word in text for word in words)
+        return all((word if len(word) >= NGRAM_LENGTH else " " + word) in text for word in words)
@@ -0,0 +1,131 @@
+import bisect
+import heapq
+import threading
+from collections import OrderedDict
+from functools import partial
+from itertools import islice, repeat
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from src.core.database import Database
+from src.core.model import DBModel
+from src.core.singleton_metaclass import Singleton
+
+# Departures of this many stops are kept in memory, departures of the least recently used stop are dropped first
+DEPARTURES_CACHED_STOPS = 512
+# Rows of departures fetched in one round trip, a busy stop has a few thousand departures
+DEPARTURES_FETCH_ARRAY_SIZE = 5000
+
+# Sorted departure times in minutes after midnight, by variant id and day type id
+StopDepartures = Dict[Tuple[int, str], List[int]]
+
+
+def download_departures(database: Database, stop_ids: Iterable[int]) -> Dict[int, StopDepartures]:
+    """
+    Downloads departures of all variants and day types at stops in one query
+    :param database: database holding timetables
+    :param stop_ids: ids of stops
+    :return: departures of every stop, stops without departures have no variants
+    """
+    departures_by_stop_id: Dict[int, StopDepartures] = {stop_id: {} for stop_id in stop_ids}
+    sql = f"""
+        select SC.STOP_ID, CO.VARIANT_ID, CO.DAY_TYPE_ID, SC.DEPARTURE_TIME
+        from STOP_COURSE SC inner join COURSE CO on CO.COURSE_ID = SC.COURSE_ID
+        where SC.STOP_ID in ({database.id_list("stop_ids")}) and SC.DEPARTURE_TIME is not null
+        """
+    rows = database.iter_rows(sql, {"stop_ids": database.id_list_value(list(departures_by_stop_id))},
+                              arraysize=DEPARTURES_FETCH_ARRAY_SIZE)
+    for stop_id, variant_id, day_type, departure_time in rows:
+        departures_by_stop_id[stop_id].setdefault((variant_id, day_type), []).append(departure_time)
+    for departures in departures_by_stop_id.values():
+        for times in departures.values():
+            times.sort()
+    return departures_by_stop_id
+
+
+class DepartureIndex:
+    """
+    Departures of stops, loaded for all variants of a stop at once when the stop is asked for the first time or when
+    it is preloaded, and kept for the least recently used <capacity> stops. Timetables and next departures are answered
+    from sorted departure times by bisection. Index is used by download threads of layouts, so it is guarded by a lock.
+    """
+
+    def __init__(self, load: Callable[[List[int]], Dict[int, StopDepartures]], capacity: int = DEPARTURES_CACHED_STOPS):
+        """
+        :param load: function returning departures of every stop of given list of ids
+        :param capacity: maximal number of stops whose departures are kept
+        """
+        if capacity < 1:
+            raise ValueError(f"Invalid capacity of departure index: {capacity}")
+        self._load = load
+        self._capacity = capacity
+        self._departures_by_stop_id: OrderedDict[int, StopDepartures] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._departures_by_stop_id)
+
+    def preload(self, stop_ids: Iterable[int]) -> None:
+        """
+        Loads departures of all stops which are not held yet in one query, e.g. for a departure board of a complex
+        :param stop_ids: ids of stops, at most <capacity> of them are kept
+        """
+        with self._lock:
+            missing_stop_ids = [stop_id for stop_id in dict.fromkeys(stop_ids) if stop_id not in self._departures_by_stop_id]
+        if missing_stop_ids:
+            self._store(self._load(missing_stop_ids))
+
+    def _store(self, departures_by_stop_id: Dict[int, StopDepartures]) -> None:
+        with self._lock:
+            for stop_id, departures in departures_by_stop_id.items():
+                self._departures_by_stop_id[stop_id] = departures
+                self._departures_by_stop_id.move_to_end(stop_id)
+            while len(self._departures_by_stop_id) > self._capacity:
+                self._departures_by_stop_id.popitem(last=False)
+
+    def _get_stop_departures(self, stop_id: int) -> StopDepartures:
+        with self._lock:
+            departures = self._departures_by_stop_id.get(stop_id)
+            if departures is not None:
+                self._departures_by_stop_id.move_to_end(stop_id)
+                return departures
+        # Database is queried without the lock, so other threads are not blocked by it
+        departures = self._load([stop_id])[stop_id]
+        self._store({stop_id: departures})
+        return departures
+
+    def _get_departure_lists(self, stop_id: int, variant_id: Optional[int], day_type: Optional[str]) -> List[Tuple[int, List[int]]]:
+        return [(key_variant_id, times) for (key_variant_id, key_day_type), times in self._get_stop_departures(stop_id).items()
+                if variant_id in (None, key_variant_id) and day_type in (None, key_day_type)]
+
+    def get_departures(self, stop_id: int, variant_id: int, day_type: str = None) -> List[int]:
+        """
+        :param stop_id: id of stop
+        :param variant_id: id of variant of line
+        :param day_type: id of day type, departures of all day types are returned if it is None
+        :return: timetable of variant at stop, sorted departure times in minutes after midnight
+        """
+        return list(heapq.merge(*(times for _, times in self._get_departure_lists(stop_id, variant_id, day_type))))
+
+    def get_next_departures(self, stop_id: int, minute: int, count: int, day_type: str = None) -> List[Tuple[int, int]]:
+        """
+        :param stop_id: id of stop
+        :param minute: time in minutes after midnight, departures at this minute are included
+        :param count: maximal number of returned departures
+        :param day_type: id of day type, departures of all day types are returned if it is None
+        :return: sorted departure times and variant ids of next departures of all lines from stop
+        """
+        departures = [zip(islice(times, bisect.bisect_left(times, minute), None), repeat(variant_id))
+                      for variant_id, times in self._get_departure_lists(stop_id, None, day_type)]
+        return list(islice(heapq.merge(*departures), max(count, 0)))
+
+
+class DepartureModel(DBModel, metaclass=Singleton):
+    """
+    Provides departures of stops from DepartureIndex downloading them from the database
+    """
+
+    def __init__(self, capacity: int = DEPARTURES_CACHED_STOPS) -> None:
+        super().__init__()
+        self._index = DepartureIndex(partial(download_departures, self._db), capacity)
+        self.preload = self._index.preload
+        self.get_departures = self._index.get_departures
+        self.get_next_departures = self._index.get_next_departures
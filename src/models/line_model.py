@@ -1,4 +1,5 @@
 from src.core.model import DBModel, Model
+from src.core.reference_data_cache import cached_query
 from dataclasses import dataclass
 from src.models.stop_model import Stop, StopModel
 from src.models.nav_data_structures import VariantStops
@@ -63,12 +64,12 @@ class Route(DBModel):
 
     def _get_stops_of_route(self) -> list:
         stops = []
-        sql_querry = f"""
+        sql_querry = """
         SELECT stop_id
         FROM STOP_VARIANT
-        WHERE variant_id = '{self._variant_id}'
+        WHERE variant_id = :variant_id
         """
-        data = self._db.simple_type_mapping(sql_querry, int)
+        data = self._db.simple_type_mapping(sql_querry, int, {"variant_id": self._variant_id})
         for stop_id in data:
             stops.append(self._stop_model.get_stop_by_id(stop_id))
         return stops
@@ -217,7 +218,7 @@ class LineModel(DBModel, metaclass=Singleton):
         sql = f"""
             select VARIANT_ID, STOP_ID from STOP_VARIANT
             """
-        variant_stops = self._db.simple_type_mapping(sql, Variant_Stops)
+        variant_stops = cached_query(self._db, "variant_stops", sql, Variant_Stops)
 
         for vs in variant_stops:
             if (vs.variant_id in variant_stops_dict):
@@ -230,29 +231,30 @@ class LineModel(DBModel, metaclass=Singleton):
     def _get_line_routes(self, line_id):
         line_routes = []
         route_types = []
-        sql = f"""
+        sql = """
             SELECT v.line_id, v.variant_id, v.variant_name
             FROM VARIANT v
-            WHERE line_id = '{line_id}'  and (Select v2.is_basic
+            WHERE line_id = :line_id  and (Select v2.is_basic
                                     FROM VARIANT v2
                                     WHERE v2.variant_id = v.variant_id) = 1
             """
-        routes_complex = self._db.simple_type_mapping(sql, Route_Complex)
+        routes_complex = self._db.simple_type_mapping(sql, Route_Complex, {"line_id": line_id})
 
         for route_complex in routes_complex:
             route_type = self._get_line_type_by_variant_id(route_complex.variant_id).name
             route = Route(route_complex.line_number, route_complex.variant_id, route_complex.variant_name, None)
             last_stop = route._stops[-1:][0]
-            sql = f"""
+            sql = """
             SELECT name
             FROM STOP_COMPLEX sc
-            WHERE sc.stop_complex_id = {last_stop.stop_complex_id}
+            WHERE sc.stop_complex_id = :stop_complex_id
             UNION
             SELECT stop_number
             from STOP s
-            WHERE s.stop_id = {last_stop.stop_id}
+            WHERE s.stop_id = :stop_id
             """
-            destination = self._db.simple_type_mapping(sql, Destination)
+            destination = self._db.simple_type_mapping(sql, Destination, {"stop_complex_id": last_stop.stop_complex_id,
+                                                                          "stop_id": last_stop.stop_id})
             route._destination = destination
             line_routes.append(route)
             route_types.append(route_type)
@@ -262,19 +264,19 @@ class LineModel(DBModel, metaclass=Singleton):
     def _get_stops_of_route(self, variant_id) -> list:
         self._stop_model = StopModel()
         stops = []
-        sql_querry = f"""
+        sql_querry = """
         SELECT stop_id
         FROM STOP_VARIANT
-        WHERE variant_id = '{variant_id}'
+        WHERE variant_id = :variant_id
         """
-        data = self._db.simple_type_mapping(sql_querry, int)
+        data = self._db.simple_type_mapping(sql_querry, int, {"variant_id": variant_id})
         for stop_id in data:
             stops.append(self._stop_model.get_stop_by_id(stop_id))
         self._stops = stops
         return stops
 
     def _get_line_type_by_variant_id(self, variant_id):
-        sql_querry = f"""
+        sql_querry = """
         SELECT type_name
         FROM LINE_TYPE
         WHERE type_id = (
@@ -283,31 +285,31 @@ class LineModel(DBModel, metaclass=Singleton):
             WHERE LINE_ID = (
                 SELECT LINE_ID
                 FROM VARIANT
-                WHERE Variant_id = {variant_id}
+                WHERE Variant_id = :variant_id
             )
         )
         """
-        line_type = self._db.simple_type_mapping(sql_querry, Line_type)[0]
+        line_type = self._db.simple_type_mapping(sql_querry, Line_type, {"variant_id": variant_id})[0]
         return line_type
 
 
     def _get_line_type_by_type_id(self, type_id):
-        sql_querry = f"""
+        sql_querry = """
         SELECT type_name
         FROM LINE_TYPE
-        WHERE type_id = {type_id}
+        WHERE type_id = :type_id
         """
-        line_type = self._db.simple_type_mapping(sql_querry, Line_type)[0]
+        line_type = self._db.simple_type_mapping(sql_querry, Line_type, {"type_id": type_id})[0]
         return line_type
 
 
     def _get_line_by_variant_id(self, variant_id):
-        sql_querry = f"""
+        sql_querry = """
         SELECT LINE_ID
         FROM VARIANT
-        WHERE Variant_id = {variant_id}
+        WHERE Variant_id = :variant_id
         """
-        line_type = self._db.simple_type_mapping(sql_querry, Line_type)[0]
+        line_type = self._db.simple_type_mapping(sql_querry, Line_type, {"variant_id": variant_id})[0]
         return line_type
         
 
@@ -317,7 +319,7 @@ class LineModel(DBModel, metaclass=Singleton):
         SELECT  *
         FROM LINE l
         """
-        all_lines = self._db.simple_type_mapping(sql, Line)
+        all_lines = cached_query(self._db, "lines", sql, Line)
         return all_lines
 
 
@@ -6,9 +6,12 @@ from src.models.line_model import LineModel
 from src.core.custom_types import *
 from src.core.singleton_metaclass import Singleton
 from math import floor
+import numpy as np
 
 SPACE_CHUNK_COUNT = 32
 TIME_CHUNK_COUNT = 32
+# Rows of chunk queries fetched in one round trip, a chunk can have tens of thousands of departures
+CHUNK_FETCH_ARRAY_SIZE = 5000
 
 
 class NavDataModel(DBModel, metaclass=Singleton):
@@ -18,6 +21,7 @@ class NavDataModel(DBModel, metaclass=Singleton):
         self._lines_model: LineModel = line_model
         self.get_stop_by_id = self._stop_model.get_stop_by_id
         self.get_n_closest_stops = self._stop_model.get_n_closest_stops
+        self.get_planar_location = self._stop_model.get_planar_location
 
     @staticmethod
     def get_chunk_from_location_and_time(location: Geopoint_t, time: Seconds_t) -> int:
@@ -37,6 +41,21 @@ class NavDataModel(DBModel, metaclass=Singleton):
         time_c = floor(time / 60 / 1777 * TIME_CHUNK_COUNT)
         return ((lat_c) * SPACE_CHUNK_COUNT + lng_c) * TIME_CHUNK_COUNT + time_c
 
+    @staticmethod
+    def get_chunks_from_locations_and_times(latitudes: np.ndarray, longitudes: np.ndarray, times: np.ndarray) -> np.ndarray:
+        """
+        Vectorized version of get_chunk_from_location_and_time(), computing chunks of many locations and times at once.
+
+        :param latitudes: array of latitudes
+        :param longitudes: array of longitudes
+        :param times: array of times in seconds
+        :return: array of chunk ids
+        """
+        lat_c = np.floor((latitudes - 51.921869) / 0.561141 * SPACE_CHUNK_COUNT).astype(np.int64)
+        lng_c = np.floor((longitudes - 20.462591) / 1.001192 * SPACE_CHUNK_COUNT).astype(np.int64)
+        time_c = np.floor(times / 60 / 1777 * TIME_CHUNK_COUNT).astype(np.int64)
+        return ((lat_c) * SPACE_CHUNK_COUNT + lng_c) * TIME_CHUNK_COUNT + time_c
+
     @staticmethod
     def next_chronologically_chunk(chunk: int):
         return (chunk & 0b111111111100000) + ((chunk + 1) & 0b11111)
@@ -55,26 +74,26 @@ class NavDataModel(DBModel, metaclass=Singleton):
 
         logging.info(f"Dowloading space time chunk {lat_chunk} x {lng_chunk} @ {time_chunk}")
 
-        if excluded_chunks is None or len(excluded_chunks) == 0:
-            excluded_chunks = [-1]
+        if excluded_chunks is None:
+            excluded_chunks = []
 
-        # Update courses
+        # Update courses. Excluded chunks are bound as one list, so the statement is the same for every chunk
         sql_query = f"""
         -- get all full courses that have at least one of their departures in this space time chunk
         select SC.STOP_ID, SC.COURSE_ID, SC.DEPARTURE_TIME, CO.VARIANT_ID
         from STOP_COURSE SC inner join (
-            select SC.COURSE_ID from STOP_COURSE SC
-            where SC.CHUNK = {chunk}
-            minus
-            select SC.COURSE_ID from STOP_COURSE SC
-            where SC.CHUNK in ({",".join(map(str, excluded_chunks))})
+            select distinct SC.COURSE_ID from STOP_COURSE SC
+            where SC.CHUNK = :chunk
+            and not exists (
+                select 1 from STOP_COURSE EX
+                where EX.COURSE_ID = SC.COURSE_ID and EX.CHUNK in ({self._db.id_list("excluded_chunks")}))
         ) SUB on SUB.COURSE_ID = SC.COURSE_ID inner join COURSE CO on CO.COURSE_ID = SC.COURSE_ID
     """
-        cur = self._db.cursor.execute(sql_query)
-        logging.info("Courses cursor created")
+        rows = self._db.iter_rows(sql_query, {"chunk": chunk, "excluded_chunks": self._db.id_list_value(excluded_chunks)},
+                                  arraysize=CHUNK_FETCH_ARRAY_SIZE, prefetchrows=CHUNK_FETCH_ARRAY_SIZE)
         all_new_courses: dict[str, SingleCourse] = dict()
         i = 0
-        for stop_id, course_id, departure_time, variant_id in cur.fetchall():
+        for stop_id, course_id, departure_time, variant_id in rows:
             i += 1
             if course_id not in all_new_courses:
                 variant_stops = self._lines_model.get_variant_stops(variant_id)
@@ -95,11 +114,10 @@ class NavDataModel(DBModel, metaclass=Singleton):
     where STOP_ID in (
                 select subS.STOP_ID
                   from STOP subS
-                  where floor((subS.LATITUDE - 51.921869) / 0.561141 * {SPACE_CHUNK_COUNT}) = {lat_chunk}
-                    and floor((subS.LONGITUDE - 20.462591) / 1.001192 * {SPACE_CHUNK_COUNT}) = {lng_chunk})
+                  where floor((subS.LATITUDE - 51.921869) / 0.561141 * {SPACE_CHUNK_COUNT}) = :lat_chunk
+                    and floor((subS.LONGITUDE - 20.462591) / 1.001192 * {SPACE_CHUNK_COUNT}) = :lng_chunk)
     """
-        cur = self._db.cursor.execute(sql_query)
-        logging.info("Neighbour cursor created")
-        for stop_id, neighbour_id, distance in cur:
+        rows = self._db.iter_rows(sql_query, {"lat_chunk": lat_chunk, "lng_chunk": lng_chunk}, arraysize=CHUNK_FETCH_ARRAY_SIZE)
+        for stop_id, neighbour_id, distance in rows:
             nav_graph.get_nav_node(stop_id).neighbours.append((distance, neighbour_id))
         logging.info(f"{lat_chunk} x {lng_chunk} @ {time_chunk} chunk data insertion complete")
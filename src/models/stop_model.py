@@ -1,13 +1,27 @@
 from src.core.model import DBModel
+from src.core.reference_data_cache import cached_query
 from functools import lru_cache
 from dataclasses import dataclass
-from src.lib.geodesic import ground_distance
+import logging
+from src.lib.geodesic import LocalProjection
+from src.lib.spatial_grid import GeoGrid
+from src.lib.text_search import NgramSearchIndex, fold_diacritics
 from src.core.custom_types import Geopoint_t
 from src.core.singleton_metaclass import Singleton
-from typing import List, Tuple
+from typing import Dict, List, Optional, Tuple
 
 STOP_COMPLEX_OBJECT_TYPE = "CPLX"
 STOP_OBJECT_TYPE = "STOP"
+# Rows of all stops fetched in one round trip
+STOPS_FETCH_ARRAY_SIZE = 2000
+# Size in meters of cells of spatial index of stops, close to the usual distance between neighbouring stops
+STOP_GRID_CELL_SIZE = 250.0
+# Stops are projected on local plane only if planar distances differ from ground distances by at most this fraction
+PLANAR_PROJECTION_TOLERANCE = 1e-3
+# Number of stops whose pairwise distances are compared while checking accuracy of projection
+PLANAR_PROJECTION_CHECKED_STOPS = 50
+# Maximal number of readable identifiers returned by search
+SEARCH_RESULTS_LIMIT = 50
 
 
 @dataclass(eq=False)
@@ -45,6 +59,9 @@ class Stop:
     direction: str
     stop_complex_name: str
     complex_town: str
+    # Location in meters on local plane of all stops, set by StopModel if projection is accurate enough
+    x: Optional[float] = None
+    y: Optional[float] = None
 
     def has_location(self):
         return not (self.longitude is None or self.latitude is None)
@@ -76,59 +93,131 @@ class StopModel(DBModel, metaclass=Singleton):
     def __init__(self) -> None:
         super().__init__()
 
-        self._complexes_by_id = None
-        self._stops_by_id = None
+        self._projection: Optional[LocalProjection] = None
 
-    def get_time_departures_from_stop_of_route(self, route, stop_id) -> list:
-        sql_querry = f"""
-        SELECT Departure_Time
-        FROM Stop_Course
-        WHERE STOP_ID = {stop_id} AND COURSE_ID = ANY(SELECT COURSE_ID
-                                                    FROM Course
-                                                    WHERE variant_id = {route.variant_id})"""
-
-        return self._db.simple_type_mapping(sql_querry, str)
+    @lru_cache(1)
+    def _get_stop_grid(self) -> Tuple[GeoGrid, List[Stop]]:
+        """
+        Spatial index of all stops which have a location. Stops are indexed in order of their ids,
+        so stops with equal distance are returned in that order.
+        :return: grid and stops in order of indexes of grid
+        """
+        located_stops = sorted(stop for stop in self.get_all_stops() if stop.has_location())
+        return GeoGrid([stop.get_location() for stop in located_stops], STOP_GRID_CELL_SIZE), located_stops
 
     def get_n_closest_stops(self, n: int, geopoint: Geopoint_t) -> List[Tuple[float, int]]:
         """
         :param n: how many stops to retrurn
         :param geopoint: (lat, lng) tuple
-        :return: list of stop distances and ids
+        :return: list of stop distances and ids, sorted by distance
+        """
+        grid, located_stops = self._get_stop_grid()
+        if n <= 0 or not located_stops:
+            return []
+        return [(distance, located_stops[index].stop_id)
+                for index, distance in grid.nearest(geopoint, n, start_distance=STOP_GRID_CELL_SIZE)]
+
+    def get_stops_within(self, radius: float, geopoint: Geopoint_t) -> List[Tuple[float, int]]:
+        """
+        :param radius: distance in meters
+        :param geopoint: (lat, lng) tuple
+        :return: list of distances and ids of stops at most <radius> meters from <geopoint>, sorted by distance
         """
-        all_distances = sorted(
-            [(ground_distance(geopoint, stop.get_location()), stop.stop_id) for stop in self.get_all_stops()])
-        return all_distances[:n]
+        grid, located_stops = self._get_stop_grid()
+        return sorted((distance, located_stops[index].stop_id) for index, distance in grid.within(geopoint, radius))
 
     @lru_cache(1)
     def get_complexes(self):
         sql = """
            select SC.STOP_COMPLEX_ID, SC.NAME, T.TOWN_NAME from STOP_COMPLEX SC inner join TOWN T on T.TOWN_ID = SC.TOWN_ID
             """
-        all_complexes = self._db.simple_type_mapping(sql, StopComplex)
-        self._complexes_by_id = {comp.stop_complex_id: comp for comp in all_complexes}
-        return all_complexes
+        return cached_query(self._db, "stop_complexes", sql, StopComplex)
 
-    @lru_cache(15, True)
-    def get_stops_of_stop_complex(self, stop_complex_id):
-        sql = f"""
-            select ST.STOP_ID, ST.STOP_NUMBER, ST.STOP_COMPLEX_ID, ST.LATITUDE, ST.LONGITUDE, str_place.PLACE_NAME, dir_place.PLACE_NAME, SC.NAME, T.TOWN_NAME
-            from STOP ST left join PLACE dir_place on dir_place.PLACE_ID = ST.DIRECTION 
-            left join PLACE str_place on ST.STREET = str_place.PLACE_ID
-            left join STOP_COMPLEX SC on ST.STOP_COMPLEX_ID = SC.STOP_COMPLEX_ID
-            left join TOWN T on SC.TOWN_ID = T.TOWN_ID
-            where  ST.STOP_COMPLEX_ID = {stop_complex_id}
-            """
-        return self._db.simple_type_mapping(sql, Stop)
+    @lru_cache(1)
+    def _get_complexes_by_id(self) -> Dict[int, StopComplex]:
+        return {stop_complex.stop_complex_id: stop_complex for stop_complex in self.get_complexes()}
 
-    def get_complex_by_stop_id(self, stop_id):
-        sql = f"""
-            select SC.STOP_COMPLEX_ID, SC.NAME, T.TOWN_NAME from STOP_COMPLEX SC inner join TOWN T on T.TOWN_ID = SC.TOWN_ID
-            where SC.STOP_COMPLEX_ID = (
-                select STOP_COMPLEX_ID from STOP
-                where STOP_ID = {stop_id}
-            )
-            """
-        return self._db.simple_type_mapping(sql, StopComplex)[0]
+    @lru_cache(1)
+    def _get_complexes_by_town(self) -> Dict[str, List[StopComplex]]:
+        complexes_by_town = {}
+        for stop_complex in self.get_complexes():
+            complexes_by_town.setdefault(stop_complex.town, []).append(stop_complex)
+        return complexes_by_town
+
+    @lru_cache(1)
+    def _get_stops_by_complex_id(self) -> Dict[int, List[Stop]]:
+        """
+        :return: stops of every complex, in order in which they were downloaded
+        """
+        stops_by_complex_id = {}
+        for stop in self.get_all_stops():
+            stops_by_complex_id.setdefault(stop.stop_complex_id, []).append(stop)
+        return stops_by_complex_id
+
+    def get_stops_of_stop_complex(self, stop_complex_id: int) -> List[Stop]:
+        """
+        :param stop_complex_id: id of complex
+        :return: all stops of complex, empty list if complex has no stops
+        """
+        return self._get_stops_by_complex_id().get(stop_complex_id, [])
+
+    def get_complexes_of_town(self, town: str) -> List[StopComplex]:
+        """
+        :param town: name of town
+        :return: all complexes in town, empty list if there are none
+        """
+        return self._get_complexes_by_town().get(town, [])
+
+    def get_complex_by_stop_id(self, stop_id: int) -> StopComplex:
+        """
+        :param stop_id: id of stop
+        :return: complex to which stop belongs
+        """
+        stop = self._get_stops_by_id().get(stop_id)
+        if stop is None:
+            raise ValueError(f"Stop id {stop_id} not found")
+        return self.get_complex_by_id(stop.stop_complex_id)
+
+    @lru_cache(2)
+    def _get_search_index(self, with_complexes: bool) -> Tuple[NgramSearchIndex, List[str]]:
+        """
+        Search index of names, streets and towns of stops and complexes. Entries with shorter names are preferred,
+        and complex is preferred to its stops.
+        :param with_complexes: whether complexes are indexed, stops are always indexed
+        :return: index and readable identifiers of its entries
+        """
+        entries = []
+        if with_complexes:
+            for stop_complex in self.get_complexes():
+                name = stop_complex.name or ""
+                entries.append((len(name), fold_diacritics(name), 0, "", name, stop_complex.town or "",
+                                stop_complex.readable_identifier))
+        for stop in self.get_all_stops():
+            name = stop.stop_complex_name or ""
+            details = " ".join(detail for detail in (stop.stop_number, stop.street, stop.complex_town) if detail)
+            entries.append((len(name), fold_diacritics(name), 1, stop.stop_number or "", name, details,
+                            stop.readable_identifier))
+        entries.sort()
+        index = NgramSearchIndex([entry[4] for entry in entries], [entry[5] for entry in entries])
+        return index, [entry[6] for entry in entries]
+
+    def prepare_search(self, with_complexes: bool = True) -> None:
+        """
+        Builds search index in advance, so the first search does not wait for it
+        :param with_complexes: whether complexes will be searched
+        """
+        self._get_search_index(with_complexes)
+
+    def search(self, text: str, with_complexes: bool = True, limit: int = SEARCH_RESULTS_LIMIT) -> List[str]:
+        """
+        Finds stops and complexes by words of their names, streets and towns, ignoring letter case and diacritics
+        :param text: words typed by user, "swietokrz" finds "Świętokrzyska"
+        :param with_complexes: whether complexes are returned, stops are always returned
+        :param limit: maximal number of results
+        :return: readable identifiers of best matching stops and complexes, best first
+        """
+        index, identifiers = self._get_search_index(with_complexes)
+        return [identifiers[entry] for entry in index.search(text, limit)]
 
     @staticmethod
     def parse_readable_identifier(readable_identifer: str):
@@ -137,11 +226,9 @@ class StopModel(DBModel, metaclass=Singleton):
         return object_type, int(object_id)
 
     def get_complex_by_id(self, complex_id: int):
-        if self._complexes_by_id is None:
-            self.get_complexes()
-
-        if complex_id in self._complexes_by_id:
-            return self._complexes_by_id[complex_id]
+        complexes_by_id = self._get_complexes_by_id()
+        if complex_id in complexes_by_id:
+            return complexes_by_id[complex_id]
         else:
             raise ValueError(f"Complex id {complex_id} not found")
 
@@ -155,12 +242,49 @@ class StopModel(DBModel, metaclass=Singleton):
             left join TOWN T on SC.TOWN_ID = T.TOWN_ID
             """
 
-        stops = self._db.simple_type_mapping(sql, Stop)
-        self._stops_by_id = {stop.stop_id: stop for stop in stops}
+        stops = cached_query(self._db, "stops", sql, Stop, STOPS_FETCH_ARRAY_SIZE)
+        self._projection = self._project_stops(stops)
         return stops
 
-    def get_stop_by_id(self, stop_id: int):
-        if self._stops_by_id is None:
-            self.get_all_stops()
+    @staticmethod
+    def _project_stops(stops: List[Stop]) -> Optional[LocalProjection]:
+        """
+        Sets planar location of all stops which have a location, if stops are close enough to fit on one plane
+        :param stops: all stops
+        :return: projection of stops or None if they were not projected
+        """
+        located_stops = [stop for stop in stops if stop.has_location()]
+        if not located_stops:
+            return None
+        latitudes = [stop.latitude for stop in located_stops]
+        longitudes = [stop.longitude for stop in located_stops]
+        projection = LocalProjection(((min(latitudes) + max(latitudes)) / 2, (min(longitudes) + max(longitudes)) / 2))
 
-        return self._stops_by_id[stop_id]
+        # Error is the highest for the farthest stops, so the extreme ones are always checked
+        checked_stops = located_stops[::max(1, len(located_stops) // PLANAR_PROJECTION_CHECKED_STOPS)]
+        checked_stops += [min(located_stops, key=lambda stop: stop.latitude), max(located_stops, key=lambda stop: stop.latitude),
+                          min(located_stops, key=lambda stop: stop.longitude), max(located_stops, key=lambda stop: stop.longitude)]
+        error = projection.max_relative_error([stop.get_location() for stop in checked_stops])
+        if error > PLANAR_PROJECTION_TOLERANCE:
+            logging.warning(f"Stops are too far apart to be projected on a plane (error {error:.2%}), planar distances will not be used")
+            return None
+
+        x, y = projection.project(latitudes, longitudes)
+        for stop, stop_x, stop_y in zip(located_stops, x.tolist(), y.tolist()):
+            stop.x, stop.y = stop_x, stop_y
+        return projection
+
+    def get_planar_location(self, geopoint: Geopoint_t) -> Optional[Tuple[float, float]]:
+        """
+        :param geopoint: (lat, lng) tuple
+        :return: location on the plane of stops in meters, or None if stops are not projected
+        """
+        self.get_all_stops()
+        return None if self._projection is None else self._projection.project_point(geopoint)
+
+    @lru_cache(1)
+    def _get_stops_by_id(self) -> Dict[int, Stop]:
+        return {stop.stop_id: stop for stop in self.get_all_stops()}
+
+    def get_stop_by_id(self, stop_id: int):
+        return self._get_stops_by_id()[stop_id]
@@ -1,4 +1,4 @@
-from src.lib.geodesic import EARTH_RADIUS, ground_distance
+from src.lib.geodesic import EARTH_RADIUS, EQUIRECTANGULAR, ground_distance, ground_distances, ground_distance_matrix
 from src.lib.a_star_navigation import AStarNav
 from src.lib.navigation_graph import TransitNetworkNode, FakeStop
 from src.lib.navigation_steps import GoOnFoot
@@ -34,6 +34,21 @@ def test_ground_distance():
     # 1 deg lat approx 111 km
 
 
+def test_vectorized_ground_distances():
+    geopoints = [(52.2297, 21.0122), (52.2305, 21.0110), (52.4064, 16.9252), (0.0, 179.9999), (0.0, -179.9999)]
+    latitudes, longitudes = zip(*geopoints)
+    matrix = ground_distance_matrix(latitudes, longitudes, latitudes, longitudes)
+    for i, geopoint_a in enumerate(geopoints):
+        assert(ground_distances(geopoint_a, latitudes, longitudes).tolist() == matrix[i].tolist())
+        for j, geopoint_b in enumerate(geopoints):
+            assert(matrix[i, j] == approx(ground_distance(geopoint_a, geopoint_b), abs=0.01))
+
+    # Equirectangular approximation is close for short distances, also across antimeridian
+    short_distances = ground_distances(geopoints[0], latitudes[:2], longitudes[:2], EQUIRECTANGULAR)
+    assert(short_distances.tolist() == approx(matrix[0, :2].tolist(), rel=1e-6))
+    assert(ground_distances(geopoints[3], [0.0], [-179.9999], EQUIRECTANGULAR)[0] == approx(matrix[3, 4], rel=1e-6))
+
+
 def test_A_star_graph_building():
     # G1
     nav = AStarNav()
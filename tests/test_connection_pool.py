@@ -0,0 +1,96 @@
+import threading
+from src.core.connection_pool import ConnectionPool, ConnectionPoolTimeoutError, get_connection_pool, thread_connection
+from src.core.database import Database
+from src.core.database_backends import DatabaseBackend
+
+
+class MockConnection:
+    def __init__(self, number):
+        self.number = number
+        self.healthy = True
+        self.closed = False
+
+    def ping(self):
+        if not self.healthy:
+            raise ConnectionError()
+
+    def close(self):
+        self.closed = True
+
+
+class MockBackend(DatabaseBackend):
+    def __init__(self):
+        self.connections = []
+
+    def connect(self):
+        self.connections.append(MockConnection(len(self.connections)))
+        return self.connections[-1]
+
+    def id_list_subquery(self, name: str) -> str:
+        return f"SELECT value FROM json_each(:{name})"
+
+    def id_list_value(self, connection, ids):
+        return list(ids)
+
+
+def acquire_in_thread(pool: ConnectionPool, release: bool = True):
+    connections = []
+    def run():
+        try:
+            connections.append(pool.acquire())
+        except ConnectionPoolTimeoutError as error:
+            connections.append(error)
+        if release:
+            pool.release()
+    thread = threading.Thread(target=run)
+    thread.start()
+    thread.join()
+    return connections[0]
+
+
+def test_connection_per_thread():
+    backend = MockBackend()
+    pool = ConnectionPool(backend, min_size=1, max_size=3)
+    assert(len(backend.connections) == 1)
+
+    connection = pool.acquire()
+    assert(pool.acquire() is connection)
+    other_connection = acquire_in_thread(pool)
+    assert(other_connection is not connection)
+    # Released connection above minimum size is closed, below it is kept for the next thread
+    assert(other_connection.closed)
+    pool.release()
+    assert(acquire_in_thread(pool) is connection)
+    assert(pool.size == 1)
+
+
+def test_broken_connection_is_replaced():
+    backend = MockBackend()
+    pool = ConnectionPool(backend, min_size=1, max_size=1)
+    backend.connections[0].healthy = False
+
+    connection = pool.acquire()
+    assert(connection is backend.connections[1])
+    assert(backend.connections[0].closed)
+    assert(pool.size == 1)
+
+
+def test_connections_of_ended_threads_are_reclaimed():
+    backend = MockBackend()
+    pool = ConnectionPool(backend, min_size=0, max_size=1, timeout=0.01)
+
+    connection = acquire_in_thread(pool, release=False)
+    assert(pool.acquire() is connection)
+    assert(isinstance(acquire_in_thread(pool, release=False), ConnectionPoolTimeoutError))
+    pool.release()
+    assert(connection.closed)
+    assert(isinstance(acquire_in_thread(pool), MockConnection))
+
+
+def test_models_share_connections():
+    backend = MockBackend()
+    databases = [Database(backend) for _ in range(20)]
+    assert(all(database.backend is backend for database in databases))
+    with thread_connection(backend) as connection:
+        assert(get_connection_pool(backend).acquire() is connection)
+    assert(len(backend.connections) == 1)
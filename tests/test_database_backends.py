@@ -0,0 +1,120 @@
+import pytest
+from src.core.database import Database
+from src.core.database_backends import DatabaseBackend, SQLiteBackend, adapt_sql_to_sqlite
+from src.core.database_bulider import *
+from src.models.nav_data_model import NavDataModel
+from src.models.nav_data_structures import VariantStops
+
+
+def build_small_database(database_file) -> Database:
+    database = Database(SQLiteBackend(str(database_file)))
+    cursor = database.cursor
+    create_all_tables(cursor)
+    insert_place_data_into_table(cursor, [(1, "Ulica"), (2, "Kierunek")])
+    insert_town_data_into_databse(cursor, [["--", "WARSZAWA"]])
+    insert_day_type_data_into_databse(cursor, [["DP", "Dzień powszedni"], ["SB", "Sobota"]])
+    insert_stop_complex_data_into_database(cursor, [[1, "Centrum", "--"]])
+    insert_stop_data_into_database(cursor, [[101, "01", 1, 52.23, 21.01, 1, 2], [102, "02", 1, 52.24, 21.02, 1, None]])
+    insert_data_into_line_type_table(cursor, [(1, "Linia autobusowa")])
+    insert_data_into_line_table(cursor, [["100", 1]])
+    insert_variant_data_into_table(cursor, [["100", "TP-A", "A", 1, 2, 1], ["100", "TP-B", "B", 1, None, 1]])
+    insert_data_into_stop_variant(cursor, [["100", "TP-A", 1, 101, 0, 1], ["100", "TP-A", 2, 102, 0, 1],
+                                           ["100", "TP-B", 1, 102, 0, 1], ["100", "TP-B", 2, 101, 0, 1]])
+    insert_data_into_course_table(cursor, [["100", "TP-A", "DP", 480], ["100", "TP-B", "DP", 490]])
+    insert_stop_course_data_into_table(cursor, [[1, 101, 480, 7], [1, 102, 485, 8], [2, 102, 490, 8], [2, 101, 495, 9]])
+    insert_day_line_data_into_table(cursor, [["2022-12-24", "100", "SB"], ["2022-12-24", "100", "SB"], ["2022-12-25", "100", None]])
+    insert_data_into_stop_neighbour(cursor, [(101, 102, 120.5), (102, 101, 120.5)])
+    cursor.connection.commit()
+    return database
+
+
+def test_adapt_sql_to_sqlite():
+    assert(adapt_sql_to_sqlite("INSERT INTO Course VALUES(DEFAULT, get_variant_id_by_line_and_var_name(:1,:2),:3,:4)") ==
+           "INSERT INTO Course VALUES(NULL, (SELECT Variant_ID FROM Variant WHERE Line_ID = ?1 AND Variant_name = ?2),?3,?4)")
+    assert(adapt_sql_to_sqlite("SELECT NVL(MAX(Course_ID), 0) FROM Course") == "SELECT IFNULL(MAX(Course_ID), 0) FROM Course")
+    assert(adapt_sql_to_sqlite("""DELETE FROM Day_Line WHERE Day = to_date(:1, 'YYYY-MM-DD') AND Line_ID = :2
+    AND DECODE(Day_Type_ID, :3, 1, 0) = 1 AND ROWNUM = 1""") ==
+           """DELETE FROM Day_Line WHERE rowid = (SELECT rowid FROM Day_Line WHERE Day = ?1 AND Line_ID = ?2
+    AND Day_Type_ID IS ?3 LIMIT 1)""")
+    portable_sql = "select STOP_ID from STOP where STOP_ID in (select STOP_ID from STOP_COURSE where CHUNK = 5)"
+    assert(adapt_sql_to_sqlite(portable_sql) == portable_sql)
+
+
+def test_build_sqlite_database(tmp_path):
+    database = build_small_database(tmp_path / "database.sqlite")
+
+    variants = database.simple_type_mapping("SELECT Variant_ID, Variant_name FROM Variant ORDER BY Variant_ID", lambda *row: row)
+    assert(variants == [(1, "TP-A"), (2, "TP-B")])
+    courses = database.simple_type_mapping("SELECT Course_ID, Variant_ID FROM Course ORDER BY Course_ID", lambda *row: row)
+    assert(courses == [(1, 1), (2, 2)])
+    stop_variants = database.simple_type_mapping("SELECT Variant_ID, Stop_ID FROM Stop_Variant ORDER BY SV_ID", lambda *row: row)
+    assert(stop_variants == [(1, 101), (1, 102), (2, 102), (2, 101)])
+
+    # Only one of two equal rows of Day_Line is deleted, and NULL day type matches NULL
+    delete_day_line = """DELETE FROM Day_Line WHERE Day = to_date(:1, 'YYYY-MM-DD') AND Line_ID = :2
+    AND DECODE(Day_Type_ID, :3, 1, 0) = 1 AND ROWNUM = 1"""
+    database.cursor.executemany(delete_day_line, [("2022-12-24", "100", "SB"), ("2022-12-25", "100", None)])
+    day_lines = database.simple_type_mapping("SELECT Day, Line_ID, Day_Type_ID FROM Day_Line", lambda *row: row)
+    assert(day_lines == [("2022-12-24", "100", "SB")])
+
+
+def test_update_graph_here_now_on_sqlite(tmp_path):
+    class MockLineModel:
+        def get_variant_stops(self, variant_id):
+            return VariantStops(variant_id, [101, 102] if variant_id == 1 else [102, 101])
+
+    class MockNavGraph:
+        def __init__(self):
+            self.courses = []
+            self.neighbours = {}
+
+        def add_course_to_graph(self, course):
+            self.courses.append(course)
+
+        def get_nav_node(self, stop_id):
+            class Node:
+                neighbours = self.neighbours.setdefault(stop_id, [])
+            return Node
+
+    # NavDataModel is a singleton connected to the default database, so its query is run on a model made by hand
+    model = object.__new__(NavDataModel)
+    model._db = build_small_database(tmp_path / "database.sqlite")
+    model._lines_model = MockLineModel()
+    chunk = NavDataModel.get_chunk_from_location_and_time((52.23, 21.01), 480 * 60)
+    model._db.cursor.execute("UPDATE Stop_Course SET Chunk = :1 WHERE Chunk = 8", [chunk])
+    model._db.cursor.execute("UPDATE Stop_Course SET Chunk = :1 WHERE Chunk = 9", [chunk + 1])
+
+    nav_graph = MockNavGraph()
+    model.update_graph_here_now(nav_graph, chunk, [chunk + 1])
+    assert([course.course_id for course in nav_graph.courses] == [1])
+    assert(nav_graph.courses[0].times_of_arrival_per_stop_id == {101: 480 * 60, 102: 485 * 60})
+    assert(nav_graph.neighbours == {101: [(120.5, 102)]})
+
+
+def test_bind_parameters_and_id_lists(tmp_path):
+    database = build_small_database(tmp_path / "database.sqlite")
+    sql = f"SELECT Stop_ID FROM Stop_Course WHERE Chunk IN ({database.id_list('chunks')}) AND Departure_time > :time ORDER BY SC_ID"
+
+    assert(database.simple_type_mapping(sql, int, {"chunks": database.id_list_value([7, 8]), "time": 480}) == [102, 102])
+    assert(database.simple_type_mapping(sql, int, {"chunks": database.id_list_value([]), "time": 0}) == [])
+    assert(database.execute("SELECT COUNT(*) FROM Stop WHERE STOP_COMPLEX_ID = :id", {"id": 1}).fetchone() == (2, ))
+
+
+def test_iter_rows(tmp_path):
+    database = build_small_database(tmp_path / "database.sqlite")
+    sql = "SELECT Course_ID, Stop_ID, Departure_time FROM Stop_Course ORDER BY SC_ID"
+
+    rows = database.iter_rows(sql, arraysize=3)
+    assert(next(rows) == (1, 101, 480))
+    assert(list(rows) == [(1, 102, 485), (2, 102, 490), (2, 101, 495)])
+    assert(list(database.iter_rows(sql, map_to=lambda course, stop, time: time, arraysize=1)) == [480, 485, 490, 495])
+    assert(database.simple_type_mapping(sql, lambda *row: row[1]) == [101, 102, 102, 101])
+
+
+def test_backend_must_implement_abstract_methods():
+    class ConnectOnlyBackend(DatabaseBackend):
+        def connect(self):
+            return None
+
+    with pytest.raises(TypeError):
+        ConnectOnlyBackend()
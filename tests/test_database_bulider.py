@@ -0,0 +1,64 @@
+import os
+from dataclasses import replace
+from experiments.synthetic_wtp_file import WtpFileConfig, generate_wtp_file
+from src.core.database import Database
+from src.core.database_backends import SQLiteBackend
+from src.core.database_bulider import build_whole_database, insert_in_batches, read_dataset_version, update_database
+from src.core.parsed_data_cache import DATABASE_STATE_FILE_PREFIX, get_database_state_file_path
+
+SMALL_WTP_FILE = WtpFileConfig(stop_complexes=20, stops_per_complex=2, towns=2, lines=3, basic_variants_per_line=2,
+                               special_variants_per_line=1, stops_per_variant=5, courses_per_day_type=3, days=3,
+                               departure_tables=False)
+STOPS_QUERY = """SELECT S.Stop_ID, S.Stop_Number, S.Stop_Complex_ID, S.Latitude, S.Longitude, P.Place_Name
+FROM Stop S LEFT JOIN Place P ON P.Place_ID = S.Street ORDER BY S.Stop_ID"""
+
+
+def test_insert_in_batches():
+    inserted_batches = []
+    def mock_insert(cursor, rows):
+        inserted_batches.append(rows)
+
+    rows = ([index, index * 2] for index in range(25))
+    assert(insert_in_batches(None, mock_insert, rows, 10) == 25)
+    assert([len(batch) for batch in inserted_batches] == [10, 10, 5])
+    assert(sum(inserted_batches, []) == [[index, index * 2] for index in range(25)])
+
+    inserted_batches.clear()
+    assert(insert_in_batches(None, mock_insert, [], 10) == 0)
+    assert(inserted_batches == [])
+
+
+def count_rows(database: Database, table_name: str) -> int:
+    return database.simple_type_mapping(f"SELECT COUNT(*) FROM {table_name}", int)[0]
+
+
+def test_update_uses_only_data_saved_for_the_same_database(tmp_path, monkeypatch):
+    cache_folder = str(tmp_path / "parsed_data")
+    first_file, second_file = str(tmp_path / "first.txt"), str(tmp_path / "second.txt")
+    generate_wtp_file(first_file, SMALL_WTP_FILE)
+    generate_wtp_file(second_file, replace(SMALL_WTP_FILE, lines=4, seed=1))
+    database_a = Database(SQLiteBackend(str(tmp_path / "a.sqlite")))
+    database_b = Database(SQLiteBackend(str(tmp_path / "b.sqlite")))
+
+    build_whole_database(database_a.cursor, first_file, cache_folder=cache_folder)
+    version_a = read_dataset_version(database_a.cursor)
+    assert(os.listdir(cache_folder).count(f"{DATABASE_STATE_FILE_PREFIX}{version_a}.pickle") == 1)
+
+    # Data saved after building database A does not describe database B, so B is built instead of updated
+    def forbidden_diff(cursor, database_diff):
+        raise AssertionError("Differences were applied to database of unknown data")
+    with monkeypatch.context() as patch:
+        patch.setattr("src.core.database_bulider.apply_database_diff", forbidden_diff)
+        update_database(database_b.cursor, second_file, cache_folder=cache_folder)
+    version_b = read_dataset_version(database_b.cursor)
+    assert(version_b not in (None, version_a))
+    assert(count_rows(database_b, "Line") == 4)
+
+    # Each database is updated by differences from its own data
+    update_database(database_a.cursor, second_file, cache_folder=cache_folder)
+    assert(read_dataset_version(database_a.cursor) not in (version_a, version_b))
+    assert(not os.path.exists(get_database_state_file_path(version_a, cache_folder)))
+    for table_name in ["Line", "Variant", "Stop", "Stop_Variant", "Course", "Stop_Course", "Day_Line"]:
+        assert(count_rows(database_a, table_name) == count_rows(database_b, table_name))
+    # Updated database keeps IDs of places, so stops are compared by names of places
+    assert(database_a.simple_type_mapping(STOPS_QUERY, lambda *row: row) == database_b.simple_type_mapping(STOPS_QUERY, lambda *row: row))
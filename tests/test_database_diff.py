@@ -0,0 +1,92 @@
+from src.core.database_diff import *
+import copy
+
+
+def make_parsed_data() -> ParsedDatabaseData:
+    return ParsedDatabaseData(
+        place_data=[(1, "Grochowska"), (2, "Gocławek"), (3, "Annopol")],
+        town_data=[["--", "WARSZAWA"]],
+        day_type_data=[["DP", "DZIEŃ POWSZEDNI"], ["SB", "SOBOTA"]],
+        stop_complex_data=[[1001, "Marysin", "--"], [1002, "Kondratowicza", "--"]],
+        stop_data=[[100101, "01", 1001, 52.2, 21.1, 1, 2], [100201, "01", 1002, 52.3, 21.0, 1, 2]],
+        line_type_data=[[1, "LINIA TRAMWAJOWA"]],
+        line_data=[["1", 1], ["2", 1]],
+        variant_data=[["1", "TP-ANN", "A", 0, 3, 1], ["2", "TP-MAR", "A", 0, 3, 1]],
+        stop_neighbour_data=[(100101, 100201, 12000.5), (100201, 100101, 12000.5)],
+        stop_variant_data=[["1", "TP-ANN", 1, 100101, None, None], ["1", "TP-ANN", 2, 100201, None, None],
+                           ["2", "TP-MAR", 1, 100201, None, None]],
+        course_data=[["1", "TP-ANN", "DP", 369], ["1", "TP-ANN", "DP", 400], ["2", "TP-MAR", "DP", 500]],
+        stop_course_data=[[1, 100101, 369, 20960], [1, 100201, 375, 20960], [2, 100101, 400, 20961], [3, 100201, 500, 20962]],
+        day_line_data=[["2022-11-21", "1", "DP"], ["2022-11-21", "2", "DP"]]
+    )
+
+def test_no_changes():
+    assert(get_database_diff(make_parsed_data(), make_parsed_data()).is_empty())
+
+def test_changed_line():
+    old_data = make_parsed_data()
+    new_data = make_parsed_data()
+    new_data.course_data[0][3] = 370
+    new_data.stop_course_data[0][2] = 370
+
+    database_diff = get_database_diff(old_data, new_data)
+    assert(database_diff.changed_lines == ["1"])
+    assert(database_diff.course_data == [["1", "TP-ANN", "DP", 370], ["1", "TP-ANN", "DP", 400]])
+    assert(database_diff.stop_course_data == [[1, 100101, 370, 20960], [1, 100201, 375, 20960], [2, 100101, 400, 20961]])
+    assert(len(database_diff.stop_variant_data) == 2)
+    assert(database_diff.variant.is_empty())
+    assert(database_diff.changed_neighbour_stops == [])
+
+def test_line_courses_do_not_depend_on_other_lines():
+    old_data = make_parsed_data()
+    new_data = make_parsed_data()
+    new_data.course_data.insert(2, ["1", "TP-ANN", "DP", 450])
+    new_data.stop_course_data = [[1, 100101, 369, 20960], [1, 100201, 375, 20960], [2, 100101, 400, 20961],
+                                 [3, 100101, 450, 20961], [4, 100201, 500, 20962]]
+
+    database_diff = get_database_diff(old_data, new_data)
+    assert(database_diff.changed_lines == ["1"])
+    assert(database_diff.stop_course_data[-1] == [3, 100101, 450, 20961])
+
+def test_removed_line_and_moved_stop():
+    old_data = make_parsed_data()
+    new_data = make_parsed_data()
+    new_data.line_data.pop()
+    new_data.variant_data.pop()
+    new_data.stop_variant_data.pop()
+    new_data.course_data.pop()
+    new_data.stop_course_data.pop()
+    new_data.day_line_data.pop()
+    new_data.stop_data[1][3] = 52.25
+    new_data.stop_neighbour_data = [(100101, 100201, 6000.25), (100201, 100101, 6000.25)]
+
+    database_diff = get_database_diff(old_data, new_data)
+    assert(database_diff.changed_lines == ["2"])
+    assert(database_diff.course_data == [])
+    assert(database_diff.line.deleted == [("2", )])
+    assert(database_diff.variant.deleted == [("2", "TP-MAR")])
+    assert(database_diff.day_line.deleted == [("2022-11-21", "2", "DP")])
+    assert(database_diff.stop.updated == [[100201, "01", 1002, 52.25, 21.0, 1, 2]])
+    assert(database_diff.changed_neighbour_stops == [100101, 100201])
+    assert(database_diff.stop_neighbour_data == new_data.stop_neighbour_data)
+
+def test_align_place_ids():
+    old_data = make_parsed_data()
+    new_data = make_parsed_data()
+    new_data.place_data = [(1, "Annopol"), (2, "Grochowska"), (3, "Wiatraczna")]
+    new_data.stop_data[0][6] = 3
+    new_data.variant_data[0][4] = 1
+    new_data.variant_data[1][4] = 1
+    for stop in new_data.stop_data:
+        stop[5] = 2
+
+    new_data = align_place_ids(copy.deepcopy(old_data), new_data)
+    assert(new_data.place_data == [(1, "Grochowska"), (3, "Annopol"), (4, "Wiatraczna")])
+    assert(new_data.stop_data[0][5:] == [1, 4])
+    assert(new_data.variant_data[0][4] == 3)
+
+    database_diff = get_database_diff(old_data, new_data)
+    assert(database_diff.place.inserted == [(4, "Wiatraczna")])
+    assert(database_diff.place.deleted == [(2, )])
+    assert(database_diff.variant.is_empty())
+    assert(database_diff.changed_lines == [])
@@ -75,6 +75,258 @@ def test_get_raw_lines_of_text():
         _ = get_raw_lines_of_text("ST", mock_file, start_index=9)
 
 
+MOCK_LL_SECTION = """
+*LL 332
+   Linia:   1  - LINIA TRAMWAJOWA
+      *TR  5
+         TP-ANN  ,       Banacha,                        --  ==>  Annopol,                        --       Kier. A   Poz. 0
+            *LW
+                                               r 201404  Gocławek,                       -- 04      | 0| 0|
+                                               r 201407  Gocławek,                       -- 07  NŻ  | 0| 0|
+            #LW
+      #TR
+      *WK 12604
+         TP-ANN/DP/06.09__  201404 DP  6.09
+         TP-ANN/DP/06.09__  201407 DP  6.13
+         TD-4TAKB/DP/07.15  201407 DP  7.15
+         TD-4TAKB/DP/07.15  201404 DP  7.20
+      #WK
+   Linia: L10  - LINIA STREFOWA
+      *TR  5
+         TZ-TAK4B,       Banacha,                        --  ==>  Annopol,                        --       Kier. B   Poz. 1
+            *LW
+                                               r 201407  Gocławek,                       -- 07      | 0| 0|
+            #LW
+      #TR
+      *WK 12604
+         TZ-TAK4B/SB/18.07  201407 SB 18.07
+         TZ-TAK4B/DP/18.03  201407 DP 18.03
+      #WK
+#LL
+"""
+
+MOCK_LL_STOPS = [[201404, '04', 2014, 52.2, 21.1, "Grochowska", "Gocławek"],
+                 [201407, '07', 2014, 52.3, 21.0, "Grochowska", "Gocławek"]]
+
+def test_iter_line_blocks(monkeypatch):
+    mock_file = io.StringIO(MOCK_LL_SECTION)
+    mock_file.name = ""
+    class mock:
+        def __init__(self) -> None:
+            self.st_size = 100
+    def mock_size(a):
+        return mock()
+    monkeypatch.setattr('os.stat', mock_size)
+
+    blocks = list(iter_line_blocks(mock_file, 0))
+    assert(len(blocks) == 2)
+    assert(blocks[0][0].split()[1] == '1')
+    assert(blocks[1][0].split()[1] == 'L10')
+    assert(mock_file.tell() == len(MOCK_LL_SECTION))
+
+    line_header, variants, course_lines = split_line_block(blocks[0])
+    assert(line_header == blocks[0][0])
+    assert(len(variants) == 1)
+    assert(len(variants[0][1]) == 2)
+    assert(len(course_lines) == 4)
+
+    with pytest.raises(SectionNotFoundError):
+        split_line_block(blocks[1][:-2])
+
+    no_ll_file = io.StringIO("*ZA\n#ZA\n")
+    no_ll_file.name = ""
+    with pytest.raises(SectionNotFoundError):
+        list(iter_line_blocks(no_ll_file, 0))
+
+def test_get_stop_course_columns_of_block():
+    lines = MOCK_LL_SECTION.splitlines(keepends=True)
+    block_starts = [index for index, line in enumerate(lines) if line.lstrip().startswith("Linia:")]
+    line_block = lines[block_starts[0]:block_starts[1]]
+    sections = split_line_block(line_block)
+    courses = get_course_data_of_block(sections)
+    course_dict = get_dict_for_stop_course(courses)
+    stop_dict = get_dict_of_stop_locations(MOCK_LL_STOPS)
+
+    course_ids, stop_ids, times, chunks = get_stop_course_columns_of_block(sections, course_dict, stop_dict)
+    assert(stop_ids.tolist() == [201404, 201407, 201407, 201404])
+    assert(times.tolist() == [369, 373, 435, 440])
+    assert(course_ids.tolist() == [course_dict[('1', 'TP-ANN/DP/06.09__')]] * 2 + [course_dict[('1', 'TD-4TAKB/DP/07.15')]] * 2)
+    assert(chunks.tolist() == [NavDataModel.get_chunk_from_location_and_time(stop_dict[stop_id], time*60) for stop_id, time in zip(stop_ids.tolist(), times.tolist())])
+    assert(get_stop_course_data_of_block(sections, course_dict, stop_dict) == stop_course_columns_to_rows((course_ids, stop_ids, times, chunks)))
+
+    header, variants, course_lines = sections
+    with pytest.raises(NumericTypeExpectedError):
+        get_stop_course_columns_of_block((header, variants, [course_lines[0].replace("201404", "2014A4")]), course_dict, stop_dict)
+    with pytest.raises(NumericTypeExpectedError):
+        get_stop_course_columns_of_block((header, variants, [course_lines[0].replace(" 6.09", " 6 09")]), course_dict, stop_dict)
+
+    # Course calls at a stop which has no coordinates in data file, parsed by get_raw_data_stop() as None
+    stops_without_location = [MOCK_LL_STOPS[0], [201407, '07', 2014, None, None, "Grochowska", "Gocławek"]]
+    with pytest.raises(StopLocationNotFoundError, match="201407"):
+        get_stop_course_columns_of_block(sections, course_dict, get_dict_of_stop_locations(stops_without_location))
+
+def test_get_raw_data_of_lines(monkeypatch):
+    def mock_file():
+        mock_file = io.StringIO(MOCK_LL_SECTION)
+        mock_file.name = ""
+        return mock_file
+    class mock:
+        def __init__(self) -> None:
+            self.st_size = 100
+    def mock_size(a):
+        return mock()
+    monkeypatch.setattr('os.stat', mock_size)
+
+    variants, lines, stop_variants, courses, course_dict, stop_courses, _ = get_raw_data_of_lines(mock_file(), 0, MOCK_LL_STOPS)
+
+    expected_variants, expected_lines, _ = get_raw_variant_and_line_data(mock_file(), 0)
+    sv_stops, sv_variants = get_foreign_keys_for_stop_variant(MOCK_LL_STOPS, expected_variants)
+    expected_stop_variants, _ = get_raw_data_stop_variant(mock_file(), sv_stops, sv_variants, 0)
+    expected_courses, _ = get_raw_data_course(mock_file(), 0)
+    expected_course_dict = get_dict_for_stop_course(expected_courses)
+    expected_stop_courses, _ = get_raw_data_stop_course(mock_file(), 0, expected_course_dict, MOCK_LL_STOPS)
+
+    assert(variants == expected_variants)
+    assert(lines == expected_lines == [['1', 'LINIA TRAMWAJOWA'], ['L10', 'LINIA STREFOWA']])
+    assert(stop_variants == expected_stop_variants)
+    assert(['1', 'TP-ANN', 2, 201407, 1, 1] in stop_variants)
+    assert(['1', 'TD-4TAKB', 2, 201404, None, None] in stop_variants)
+    assert(courses == expected_courses)
+    assert(course_dict == expected_course_dict)
+    assert(sorted(course_dict.values()) == [1, 2, 3, 4])
+    assert(stop_courses == expected_stop_courses)
+    assert(len(stop_courses) == 6)
+
+def test_iter_rows_of_lines(monkeypatch):
+    def mock_file():
+        mock_file = io.StringIO(MOCK_LL_SECTION)
+        mock_file.name = ""
+        return mock_file
+    class mock:
+        def __init__(self) -> None:
+            self.st_size = 100
+    def mock_size(a):
+        return mock()
+    monkeypatch.setattr('os.stat', mock_size)
+
+    variants, _, _ = get_raw_variant_and_line_data(mock_file(), 0)
+    sv_stops, sv_variants = get_foreign_keys_for_stop_variant(MOCK_LL_STOPS, variants)
+    courses, _ = get_raw_data_course(mock_file(), 0)
+    course_dict = get_dict_for_stop_course(courses)
+
+    stop_variant_rows = iter_stop_variant_rows(mock_file(), sv_stops, sv_variants, 0)
+    assert(not isinstance(stop_variant_rows, list))
+    assert(list(stop_variant_rows) == get_raw_data_stop_variant(mock_file(), sv_stops, sv_variants, 0)[0])
+    assert(list(iter_course_rows(mock_file(), 0)) == courses)
+    assert(list(iter_stop_course_rows(mock_file(), 0, course_dict, MOCK_LL_STOPS)) == get_raw_data_stop_course(mock_file(), 0, course_dict, MOCK_LL_STOPS)[0])
+
+def test_get_raw_data_of_lines_in_parallel(tmp_path):
+    data_file = tmp_path / "data.txt"
+    data_file.write_text(MOCK_LL_SECTION, encoding="cp1250")
+
+    with open(data_file, "r", encoding="cp1250") as handle:
+        sequential_data = get_raw_data_of_lines(handle, 0, MOCK_LL_STOPS)
+    with open(data_file, "r", encoding="cp1250") as handle:
+        parallel_data = get_raw_data_of_lines(handle, 0, MOCK_LL_STOPS, workers=2)
+
+    assert(parallel_data == sequential_data)
+    assert(len(parallel_data[5]) == 6)
+
+def test_map_data_file(tmp_path):
+    departure_tables = """            *RP  1
+               201404   Gocławek,                        --
+               *TD  1
+                  DP  DZIEŃ POWSZEDNI
+                  *OD  1
+                      6.09  Kurs do: Annopol
+                  #OD
+               #TD
+            #RP
+"""
+    data_file = tmp_path / "data.txt"
+    data_file.write_bytes(("""*SM 2
+   AL   ALEKSANDRÓW
+   ŁM   ŁOMIANKI
+#SM
+""" + MOCK_LL_SECTION.replace("            #LW\n      #TR\n", "            #LW\n" + departure_tables + "      #TR\n"))
+                          .replace("\n", "\r\n").encode("cp1250"))
+    data_file_path = str(data_file)
+    section_index = build_section_index(data_file_path)
+
+    with open(data_file_path, "r", encoding="cp1250") as handle, map_data_file(data_file_path) as data_map:
+        assert(get_raw_data_town(data_map, 0) == get_raw_data_town(handle, 0))
+        assert(get_raw_data_town(data_map, 0, section_index) == get_raw_data_town(handle, 0, section_index))
+        assert(data_map.tell() == handle.tell())
+
+        line_blocks = list(iter_line_blocks(data_map, 0, section_index))
+        assert(len(line_blocks) == 2)
+        assert(not any("RP" in line or "OD" in line for line in line_blocks[0]))
+        assert([split_line_block(block) for block in line_blocks] == [split_line_block(block) for block in iter_line_blocks(handle, 0)])
+        assert(data_map.tell() == handle.tell())
+        assert(get_raw_data_of_lines(data_map, 0, MOCK_LL_STOPS) == get_raw_data_of_lines(handle, 0, MOCK_LL_STOPS))
+        assert(get_raw_lines_of_handle("LW", data_map, 0) == get_raw_lines_of_handle("LW", handle, 0))
+
+        assert(get_raw_lines_of_handle("TY", data_map, 0) is None)
+        with pytest.raises(WorkingIndexOutOfRange):
+            get_raw_lines_of_handle("SM", data_map, len(data_map) + 1)
+
+def test_section_index(tmp_path):
+    data_file = tmp_path / "data.txt"
+    data_file.write_bytes(("""*TY  2
+   D1   PONIEDZIAŁEK
+   D2   WTOREK
+#TY
+*SM 2
+   AL   ALEKSANDRÓW
+   ŁM   ŁOMIANKI
+#SM
+""" + MOCK_LL_SECTION).encode("cp1250"))
+    data_file_path = str(data_file)
+
+    section_index = build_section_index(data_file_path)
+    assert(sorted(section_index.keys()) == ['LL', 'LW', 'SM', 'TR', 'TY', 'WK'])
+    assert(section_index['TY'] == [(0, 47)])
+    assert(len(section_index['LW']) == 2)
+    assert(len(section_index['WK']) == 2)
+    assert(get_section_start(section_index, 'SM', 0) == 47)
+    assert(get_section_start(section_index, 'SM', 48) is None)
+    assert(get_section_start(section_index, 'WK', section_index['WK'][0][0] + 1) == section_index['WK'][1][0])
+
+    with open(data_file_path, "r", encoding="cp1250") as handle:
+        towns, end_index = get_raw_data_town(handle, 0, section_index)
+        assert(towns == [['--', 'WARSZAWA'], ['AL', 'ALEKSANDRÓW'], ['ŁM', 'ŁOMIANKI']])
+        assert(end_index == section_index['SM'][0][1])
+        assert(get_raw_data_day_type(handle, 0, section_index) == get_raw_data_day_type(handle, 0))
+        assert(get_raw_data_course(handle, 0, section_index) == get_raw_data_course(handle, 0))
+        assert(get_raw_lines_of_handle("ZA", handle, 0, section_index=section_index) is None)
+
+    assert(load_section_index(data_file_path) == section_index)
+    assert(os.path.exists(data_file_path + SECTION_INDEX_EXTENSION))
+    assert(load_section_index(data_file_path) == section_index)
+
+    data_file.write_bytes(b"*TY  0\n#TY\n")
+    assert(load_section_index(data_file_path) == {'TY': [(0, 11)]})
+
+def test_iter_subsections():
+    mock_file =[
+    "*TE",
+    "*ST",
+    "Line1",
+    "#ST",
+    "Line2",
+    "*ST",
+    "#ST",
+    "#TE"
+    ]
+
+    assert(list(iter_subsections("ST", mock_file)) == [(2, 3), (6, 6)])
+    assert(list(iter_subsections("ST", mock_file, start_index=3)) == [(6, 6)])
+    assert(list(iter_subsections("TE", mock_file)) == [(1, 7)])
+    assert(list(iter_subsections("TT", mock_file)) == [])
+
+    with pytest.raises(SectionNotFoundError):
+        list(iter_subsections("ST", mock_file[:-2]))
+
 def test_raw_data_stop_complex(monkeypatch):
     mock_file = io.StringIO("""
 *ZA 5
@@ -343,6 +595,23 @@ def test_stop_neighbour():
     assert(count_stops.count(100101) == 6)
     assert(count_stops.count(100108) == 5)
 
+def test_stop_neighbour_approximated_location():
+    stop_parsed_data = [
+        [100101, '01', 1001, 10, 10],
+        [100102, '02', 1001, 10.0002, 10.0002],
+        [100201, '01', 1002, None, None],
+        [100301, '01', 1003, 0, 0],
+        [100401, '01', 1004, 10.0001, 10.0001]
+    ]
+    assert(get_stop_locations_for_neighbours(stop_parsed_data) == [(10, 10), (10.0002, 10.0002), (10.0001, 10.0001), (0, 0), (10.0001, 10.0001)])
+    neighbours = get_stop_neighbours(stop_parsed_data, min_neighbours=2)
+    assert((100201, 100101, 15.60697) in neighbours)
+    assert((100201, 100401, 0) in neighbours)
+    assert([row for row in neighbours if row[0] == 100301] == [(100301, 100101, 1568520.556799), (100301, 100201, 1568536.161312)])
+
+    with pytest.raises(StopIDOutOfRange):
+        get_stop_locations_for_neighbours([[100, '00', 0, None, None]])
+
 def test_get_raw_data_stop_variant(monkeypatch):
     mock_file = io.StringIO("""
 *LL 332
@@ -652,6 +921,17 @@ def test_reduce_stop_course_data():
     new_stop_course_data = reduce_stop_course_data(stop_course_data, course_data, course_dict, lines_list)
     expected_result = [[1, 606105, 10], [2, 150701, 1080]]
     assert(new_stop_course_data == expected_result)
+    assert(get_courses_in_most_common_day_type(course_data, course_dict, lines_list) == {1, 2})
+
+def test_stop_course_reduction_report():
+    course_data = [['1', 'TP-A', 'DP', 300], ['1', 'TP-A', 'SB', 320], ['1', 'TP-B', 'DP', 400],
+                   ['2', 'TP-A', 'SB', 300], ['2', 'TP-A', 'NI', 300], ['3', 'TP-A', 'DP', 10]]
+    lines_list = ['2', '1']
+    assert(count_courses_per_day_type(course_data, lines_list) == {'2': {'SB': 1, 'NI': 1}, '1': {'DP': 2, 'SB': 1}})
+    assert(get_most_common_day_types(count_courses_per_day_type(course_data, lines_list)) == {'2': 'NI', '1': 'DP'})
+    assert(get_stop_course_reduction_report(course_data, lines_list) == [['2', 'NI', 1, True], ['2', 'SB', 1, False],
+                                                                         ['1', 'DP', 2, True], ['1', 'SB', 1, False]])
+    assert(list(filter_stop_course_rows(iter([[1, 101, 5], [2, 102, 6], [3, 103, 7]]), {1, 3})) == [[1, 101, 5], [3, 103, 7]])
 
 def test_if_var_is_integer():
     assert(not check_if_var_is_integer('0'))
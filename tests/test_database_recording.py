@@ -0,0 +1,34 @@
+import time
+import pytest
+from src.core.database import Database
+from src.core.database_backends import SQLiteBackend
+from src.core.database_recording import QueryNotRecordedError, RecordingBackend, ReplayBackend
+
+
+def run_queries(database: Database):
+    ids = database.id_list_value([3, 1])
+    return [database.simple_type_mapping("SELECT 1, 'one' UNION ALL SELECT 2, 'two'", lambda *row: row),
+            list(database.iter_rows("SELECT :value * 10", {"value": 4}, lambda value: value, arraysize=1)),
+            database.simple_type_mapping(f"SELECT * FROM ({database.id_list('ids')}) ORDER BY 1", lambda value: value,
+                                         {"ids": ids})]
+
+
+def test_record_and_replay(tmp_path):
+    recording_file = str(tmp_path / "recording.pickle.gz")
+    recording_backend = RecordingBackend(SQLiteBackend(str(tmp_path / "database.sqlite")), recording_file)
+    recorded = run_queries(Database(recording_backend))
+    assert(recorded == [[(1, "one"), (2, "two")], [40], [1, 3]])
+    assert(recording_backend.query_count == 3)
+    recording_backend.save()
+
+    replay_backend = ReplayBackend(recording_file)
+    database = Database(replay_backend)
+    assert(run_queries(database) == recorded)
+    with pytest.raises(QueryNotRecordedError):
+        database.simple_type_mapping("SELECT :value * 10", lambda value: value, {"value": 5})
+
+    # Execute and every fetch wait for simulated round trip
+    replay_backend.latency = 0.02
+    start_time = time.perf_counter()
+    database.simple_type_mapping("SELECT 1, 'one' UNION ALL SELECT 2, 'two'", lambda *row: row)
+    assert(time.perf_counter() - start_time >= 0.04)
@@ -0,0 +1,45 @@
+from src.models.departure_model import DepartureIndex, download_departures
+from tests.test_database_backends import build_small_database
+
+
+def test_departures_from_index(tmp_path):
+    database = build_small_database(tmp_path / "database.sqlite")
+    cursor = database.cursor
+    cursor.execute("INSERT INTO Course VALUES(3, 1, 'SB', 470)")
+    cursor.execute("INSERT INTO Course VALUES(4, 1, 'DP', 450)")
+    cursor.executemany("INSERT INTO Stop_Course(Course_ID, Stop_ID, Departure_time, Chunk) VALUES(:1, :2, :3, 7)",
+                       [(3, 101, 470), (4, 101, 450), (4, 102, None)])
+    cursor.connection.commit()
+
+    loaded_stop_ids = []
+
+    def load(stop_ids):
+        loaded_stop_ids.append(sorted(stop_ids))
+        return download_departures(database, stop_ids)
+
+    index = DepartureIndex(load, capacity=2)
+    assert(index.get_departures(101, 1) == [450, 470, 480])
+    assert(index.get_departures(101, 1, "DP") == [450, 480])
+    assert(index.get_departures(101, 2, "SB") == [])
+    assert(index.get_next_departures(101, 470, 10) == [(470, 1), (480, 1), (495, 2)])
+    assert(index.get_next_departures(101, 471, 2, "DP") == [(480, 1), (495, 2)])
+    assert(index.get_next_departures(101, 500, 3) == [])
+    assert(index.get_next_departures(103, 0, 3) == [])
+    assert(loaded_stop_ids == [[101], [103]])
+
+    # Preloaded stops are downloaded at once, the least recently used stop is dropped
+    index.get_departures(101, 1)
+    index.preload([101, 102, 102])
+    assert(loaded_stop_ids[2:] == [[102]])
+    assert(len(index) == 2)
+    assert(index.get_departures(102, 1) == [485])
+    index.get_departures(103, 1)
+    assert(loaded_stop_ids[3:] == [[103]])
+    assert(index.get_next_departures(101, 0, 1, "SB") == [(470, 1)])
+    assert(loaded_stop_ids[4:] == [[101]])
+
+
+def test_download_departures_of_many_stops(tmp_path):
+    database = build_small_database(tmp_path / "database.sqlite")
+    assert(download_departures(database, [102, 101]) == {101: {(1, "DP"): [480], (2, "DP"): [495]},
+                                                         102: {(1, "DP"): [485], (2, "DP"): [490]}})
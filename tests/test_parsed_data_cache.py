@@ -0,0 +1,57 @@
+from src.core.parsed_data_cache import *
+import src.core.parsed_data_cache
+
+
+def make_parsed_data(stop_course_data) -> ParsedDatabaseData:
+    return ParsedDatabaseData(
+        place_data=[[1, "Grochowska"]],
+        town_data=[["--", "WARSZAWA"]],
+        day_type_data=[["D1", "PONIEDZIAŁEK"]],
+        stop_complex_data=[[1001, "Marysin", "--"]],
+        stop_data=[[100101, "01", 1001, 52.2, 21.1, 1, 1]],
+        line_type_data=[[1, "LINIA TRAMWAJOWA"]],
+        line_data=[["1", 1]],
+        variant_data=[["1", "TP-ANN", "A", 0, 1, 1]],
+        stop_neighbour_data=[],
+        stop_variant_data=[["1", "TP-ANN", 1, 100101, 1, 1]],
+        course_data=[["1", "TP-ANN", "DP", 369]],
+        stop_course_data=stop_course_data,
+        day_line_data=[["2022-11-21", "1", "DP"]]
+    )
+
+def test_file_hash(tmp_path):
+    data_file = tmp_path / "data.txt"
+    data_file.write_bytes(b"*TY 0\n#TY\n")
+    first_hash = get_file_hash(str(data_file))
+    assert(first_hash == get_file_hash(str(data_file)))
+    data_file.write_bytes(b"*TY 0\n#TY \n")
+    assert(first_hash != get_file_hash(str(data_file)))
+
+def test_save_and_load_parsed_data(tmp_path, monkeypatch):
+    cache_folder = str(tmp_path / "parsed_data")
+    parsed_data = make_parsed_data([[1, 100101, 369, 20960]])
+
+    assert(load_parsed_data("abc", cache_folder) is None)
+    save_parsed_data("abc", parsed_data, cache_folder)
+    assert(load_parsed_data("abc", cache_folder) == parsed_data)
+    assert(load_parsed_data("abd", cache_folder) is None)
+
+    monkeypatch.setattr(src.core.parsed_data_cache, "PARSER_VERSION", PARSER_VERSION + 1)
+    assert(load_parsed_data("abc", cache_folder) is None)
+
+def test_load_corrupted_parsed_data(tmp_path):
+    cache_folder = str(tmp_path)
+    with open(get_cache_file_path("abc", cache_folder), "wb") as stream:
+        stream.write(b"not a pickle")
+    assert(load_parsed_data("abc", cache_folder) is None)
+
+def test_save_parsed_data_failure(tmp_path, monkeypatch):
+    cache_folder = str(tmp_path)
+    def dump_partially(obj, stream, protocol=None):
+        stream.write(b"partial")
+        raise OSError(28, "No space left on device")
+    monkeypatch.setattr(src.core.parsed_data_cache.pickle, "dump", dump_partially)
+
+    save_parsed_data("abc", make_parsed_data([]), cache_folder)
+    assert(os.listdir(cache_folder) == [])
+    assert(load_parsed_data("abc", cache_folder) is None)
@@ -0,0 +1,58 @@
+from src.core.database import Database
+from src.core.database_backends import SQLiteBackend
+from src.core.query_statistics import *
+
+
+def test_normalize_query():
+    assert(normalize_query("""select NAME from STOP_COMPLEX -- one complex
+        where STOP_COMPLEX_ID = 7001 and NAME = 'Centrum'""") ==
+           "select NAME from STOP_COMPLEX where STOP_COMPLEX_ID = ? and NAME = ?")
+    assert(normalize_query("select * from STOP_COURSE where CHUNK in (1, 2, -3) and X = 1.5") ==
+           normalize_query("select * from STOP_COURSE where CHUNK in (4) and X = 2"))
+    assert(normalize_query("select * from STOP where STOP_ID = :stop_id and STOP_NUMBER = ?1") ==
+           "select * from STOP where STOP_ID = :stop_id and STOP_NUMBER = ?1")
+
+
+def test_query_statistics_and_slow_query_log(tmp_path):
+    reset_query_statistics()
+    log_file = tmp_path / "slow_queries.log"
+    set_slow_query_log(0.0, str(log_file))
+    try:
+        database = Database(SQLiteBackend(str(tmp_path / "database.sqlite")))
+        with measure_database_time() as database_time:
+            for number in range(3):
+                database.simple_type_mapping(f"SELECT {number} UNION ALL SELECT 'text'", lambda value: value)
+    finally:
+        set_slow_query_log()
+
+    statistics, = get_query_statistics()
+    assert(statistics.shape == "SELECT ? UNION ALL SELECT ?")
+    assert((statistics.count, statistics.rows, statistics.bytes) == (3, 6, 3 * (8 + 4)))
+    assert(statistics.callers == {f"{__name__}.test_query_statistics_and_slow_query_log": 3})
+    assert((database_time.query_count, database_time.rows) == (3, 6))
+    assert(database_time.seconds == statistics.total_seconds)
+    assert(len(log_file.read_text(encoding="utf-8").splitlines()) == 3)
+    reset_query_statistics()
+
+
+def test_statistics_of_cursors(tmp_path):
+    reset_query_statistics()
+    database = Database(SQLiteBackend(str(tmp_path / "database.sqlite")))
+    cursor = database.cursor
+    cursor.execute("CREATE TABLE Numbers(Value INTEGER)")
+    cursor.executemany("INSERT INTO Numbers VALUES(:1)", [(number, ) for number in range(5)])
+    # Cursor which is dropped before all rows are fetched is recorded too
+    assert(database.execute("SELECT Value FROM Numbers WHERE Value >= :low", {"low": 1}).fetchone() == (1, ))
+    cursor.execute("SELECT Value, 'ab' FROM Numbers")
+    assert(len(cursor.fetchall()) == 5)
+    cursor.close()
+
+    statistics = {s.shape: s for s in get_query_statistics()}
+    assert(len(statistics) == 4)
+    select_one = statistics["SELECT Value FROM Numbers WHERE Value >= :low"]
+    assert((select_one.count, select_one.rows, select_one.bytes) == (1, 1, 8))
+    select_all = statistics["SELECT Value, ? FROM Numbers"]
+    assert((select_all.count, select_all.rows, select_all.bytes) == (1, 5, 5 * (8 + 2)))
+    assert(statistics["INSERT INTO Numbers VALUES(:1)"].count == 1)
+    assert(all(s.callers == {f"{__name__}.test_statistics_of_cursors": 1} for s in statistics.values()))
+    reset_query_statistics()
@@ -0,0 +1,40 @@
+from src.core.database_bulider import write_dataset_version
+from src.core.reference_data_cache import cached_query, get_cache_file_path, set_reference_data_folder
+from tests.test_database_backends import build_small_database
+
+STOP_COMPLEXES_QUERY = "SELECT STOP_COMPLEX_ID, NAME FROM Stop_Complex"
+
+
+def rename_stop_complex(database, name: str) -> None:
+    cursor = database.cursor
+    cursor.execute("UPDATE Stop_Complex SET NAME = :1", [name])
+    cursor.connection.commit()
+
+
+def test_reference_data_is_cached_until_dataset_version_changes(tmp_path):
+    database = build_small_database(tmp_path / "database.sqlite")
+    cache_folder = str(tmp_path / "reference_data")
+    set_reference_data_folder(cache_folder)
+    try:
+        # Database without version stamp is always queried
+        assert(cached_query(database, "stop_complexes", STOP_COMPLEXES_QUERY) == [(1, "Centrum")])
+        rename_stop_complex(database, "Dworzec")
+        assert(cached_query(database, "stop_complexes", STOP_COMPLEXES_QUERY) == [(1, "Dworzec")])
+
+        write_dataset_version(database.cursor)
+        database.cursor.connection.commit()
+        assert(cached_query(database, "stop_complexes", STOP_COMPLEXES_QUERY, lambda *row: row) == [(1, "Dworzec")])
+        rename_stop_complex(database, "Centrum")
+        assert(cached_query(database, "stop_complexes", STOP_COMPLEXES_QUERY) == [(1, "Dworzec")])
+        # Changed query is not answered with rows of the old one
+        assert(cached_query(database, "stop_complexes", STOP_COMPLEXES_QUERY + " WHERE 1 = 1") == [(1, "Centrum")])
+
+        write_dataset_version(database.cursor)
+        database.cursor.connection.commit()
+        assert(cached_query(database, "stop_complexes", STOP_COMPLEXES_QUERY) == [(1, "Centrum")])
+
+        with open(get_cache_file_path("stop_complexes", cache_folder), "wb") as stream:
+            stream.write(b"corrupted")
+        assert(cached_query(database, "stop_complexes", STOP_COMPLEXES_QUERY) == [(1, "Centrum")])
+    finally:
+        set_reference_data_folder()
@@ -0,0 +1,89 @@
+import random
+import pytest
+from pytest import approx
+from src.lib.geodesic import ground_distance, ground_distances, planar_distance
+from src.models.stop_model import Stop, StopComplex, StopModel
+
+
+def create_stop_model(stops, complexes=()) -> StopModel:
+    model = object.__new__(StopModel)
+    model.get_all_stops = lambda: stops
+    model.get_complexes = lambda: list(complexes)
+    return model
+
+
+def test_closest_stops_and_stops_within_radius():
+    generator = random.Random(7)
+    stops = [Stop(stop_id, "01", 1, 52.2 + generator.random() * 0.1, 20.9 + generator.random() * 0.2, None, None, "", "")
+             for stop_id in generator.sample(range(1000, 9999), 300)]
+    # Stops without location are never returned
+    stops.append(Stop(1, "01", 1, None, None, None, None, "", ""))
+    model = create_stop_model(stops)
+    latitudes = [stop.latitude for stop in stops[:-1]]
+    longitudes = [stop.longitude for stop in stops[:-1]]
+
+    for _ in range(20):
+        geopoint = (52.2 + generator.random() * 0.1, 20.9 + generator.random() * 0.2)
+        all_distances = sorted(zip(ground_distances(geopoint, latitudes, longitudes).tolist(), [stop.stop_id for stop in stops[:-1]]))
+        assert(model.get_n_closest_stops(5, geopoint) == all_distances[:5])
+        assert(model.get_stops_within(800.0, geopoint) == [distance for distance in all_distances if distance[0] <= 800.0])
+
+    assert(len(model.get_n_closest_stops(1000, (52.25, 21.0))) == 300)
+    assert(model.get_n_closest_stops(0, (52.25, 21.0)) == [])
+    assert(create_stop_model([stops[-1]]).get_n_closest_stops(3, (52.25, 21.0)) == [])
+
+
+def test_complexes_and_their_stops_from_memory():
+    complexes = [StopComplex(1, "Centrum", "Warszawa"), StopComplex(2, "Dworzec", "Warszawa"), StopComplex(3, "Rynek", "Piaseczno")]
+    stops = [Stop(12, "02", 1, 52.23, 21.01, None, None, "Centrum", "Warszawa"),
+             Stop(11, "01", 1, 52.23, 21.01, None, None, "Centrum", "Warszawa"),
+             Stop(31, "01", 3, None, None, None, None, "Rynek", "Piaseczno")]
+    model = create_stop_model(stops, complexes)
+
+    assert(model.get_stops_of_stop_complex(1) == [stops[0], stops[1]])
+    assert(model.get_stops_of_stop_complex(2) == [])
+    assert(model.get_complex_by_stop_id(31) is complexes[2])
+    assert(model.get_complex_by_id(2) is complexes[1])
+    assert(model.get_complexes_of_town("Warszawa") == complexes[:2])
+    assert(model.get_complexes_of_town("Radom") == [])
+    with pytest.raises(ValueError):
+        model.get_complex_by_stop_id(99)
+    with pytest.raises(ValueError):
+        model.get_complex_by_id(99)
+
+
+def test_stops_projected_on_plane():
+    generator = random.Random(3)
+    stops = [Stop(stop_id, "01", 1, 52.0 + generator.random() * 0.5, 20.6 + generator.random() * 0.8, None, None, "", "")
+             for stop_id in range(200)]
+    stops.append(Stop(200, "01", 1, None, None, None, None, "", ""))
+    projection = StopModel._project_stops(stops)
+
+    assert(stops[-1].x is None and stops[-1].y is None)
+    assert(projection.project_point(projection.origin) == approx((0.0, 0.0), abs=1e-6))
+    for stop_a, stop_b in zip(stops[:100], stops[100:200]):
+        assert(planar_distance((stop_a.x, stop_a.y), (stop_b.x, stop_b.y)) ==
+               approx(ground_distance(stop_a.get_location(), stop_b.get_location()), rel=1e-4))
+
+    # Stops of half of the continent do not fit on one plane
+    stops.append(Stop(201, "01", 1, 40.4, -3.7, None, None, "", ""))
+    for stop in stops:
+        stop.x, stop.y = None, None
+    assert(StopModel._project_stops(stops) is None)
+    assert(all(stop.x is None for stop in stops))
+
+
+def test_search_stops_and_complexes():
+    complexes = [StopComplex(1, "Świętokrzyska", "Warszawa"), StopComplex(2, "Metro Świętokrzyska", "Warszawa")]
+    stops = [Stop(22, "02", 2, None, None, "Marszałkowska", None, "Metro Świętokrzyska", "Warszawa"),
+             Stop(12, "02", 1, None, None, "Świętokrzyska", None, "Świętokrzyska", "Warszawa"),
+             Stop(11, "01", 1, None, None, None, None, "Świętokrzyska", "Warszawa")]
+    model = create_stop_model(stops, complexes)
+
+    # Complex is found before its stops, and shorter names before longer ones
+    assert(model.search("swietokrz") == [complexes[0].readable_identifier, stops[2].readable_identifier,
+                                         stops[1].readable_identifier, complexes[1].readable_identifier,
+                                         stops[0].readable_identifier])
+    assert(model.search("swietokrz", with_complexes=False, limit=2) == [stops[2].readable_identifier, stops[1].readable_identifier])
+    assert(model.search("marsz") == [stops[0].readable_identifier])
+    assert(model.search("krakow") == [])
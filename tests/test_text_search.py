@@ -0,0 +1,31 @@
+from src.lib.text_search import NgramSearchIndex, fold_diacritics
+
+NAMES = ["Centrum", "Świętokrzyska", "Metro Świętokrzyska", "Rondo ONZ", "Dworzec Centralny", "Łódzka"]
+DETAILS = ["Marszałkowska Warszawa", "Warszawa", "Warszawa", "Świętokrzyska Warszawa", "Warszawa", "Ząbki"]
+
+
+def test_fold_diacritics():
+    assert(fold_diacritics("ŚWIĘTOKRZYSKA") == "swietokrzyska")
+    assert(fold_diacritics("ąćęłńóśźż ĄĆĘŁŃÓŚŹŻ") == "acelnoszz acelnoszz")
+
+
+def test_search_ranks_names_before_other_texts():
+    index = NgramSearchIndex(NAMES, DETAILS)
+    # Beginnings of name words, beginnings of any words, then parts of words
+    assert(index.search("swietokrz", 10) == [1, 2, 3])
+    assert(index.search("centr", 10) == [0, 4])
+    assert(index.search("tokrz", 10) == [1, 2, 3])
+    assert(index.search("Metro ŚWIĘTO", 10) == [2])
+    assert(index.search("lodz", 10) == [5])
+    assert(index.search("zabki lodzka", 10) == [5])
+    assert(index.search("war", 10) == [0, 1, 2, 3, 4])
+    assert(index.search("war", 2) == [0, 1])
+    # Short words match only beginnings of words
+    assert(index.search("o", 10) == [3])
+    assert(index.search("ro", 10) == [3])
+    assert(index.search("entrum", 10) == [0])
+
+    assert(index.search("warszawa lodz", 10) == [])
+    assert(index.search("krzyz", 10) == [])
+    assert(index.search("  ", 10) == [])
+    assert(index.search("centrum", 0) == [])